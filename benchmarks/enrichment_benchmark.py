@@ -0,0 +1,62 @@
+"""
+Measure enrichment throughput against a mock Wikipedia server as enrichment concurrency scales.
+
+    poetry run python -m benchmarks.enrichment_benchmark --concurrencies 1 4 16 --latency-s 0.02
+"""
+
+import argparse
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.mock_wikimedia_server import mock_wikimedia_server
+from tap_wikipedia.tap import TapWikipedia
+
+
+def _enriched_record_count(
+    *, dump_url: str, working_directory_path: Path, max_concurrency: int
+) -> int:
+    # The HTTP cache lives in the working directory, so each run starts cold.
+    os.chdir(working_directory_path)
+    tap = TapWikipedia(
+        config={
+            "abstracts-dump-url": dump_url,
+            "cache-directory-path": str(working_directory_path / "abstracts"),
+            "enrichments": ["Category"],
+            "enrichment-max-concurrency": max_concurrency,
+        }
+    )
+    return sum(1 for _ in tap.streams["abstracts"].get_records(None))
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--doc-count", type=int, default=200)
+    argument_parser.add_argument("--latency-s", type=float, default=0.02)
+    argument_parser.add_argument(
+        "--concurrencies", type=int, nargs="+", default=[1, 2, 4, 8, 16]
+    )
+    arguments = argument_parser.parse_args()
+
+    initial_working_directory_path = Path.cwd()
+    with mock_wikimedia_server(
+        doc_count=arguments.doc_count, latency_s=arguments.latency_s
+    ) as server:
+        for max_concurrency in arguments.concurrencies:
+            with TemporaryDirectory() as working_directory:
+                started_at = perf_counter()
+                record_count = _enriched_record_count(
+                    dump_url=server.dump_url,
+                    working_directory_path=Path(working_directory),
+                    max_concurrency=max_concurrency,
+                )
+                elapsed_s = perf_counter() - started_at
+                os.chdir(initial_working_directory_path)
+            print(  # noqa: T201
+                f"concurrency {max_concurrency}: {record_count} records in {elapsed_s:.2f}s ({record_count / elapsed_s:.1f} records/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare the time the HTML parser backends take to extract page enrichments from article pages.
+
+    poetry run python -m benchmarks.html_extraction_benchmark path/to/article.html --repeat 100
+
+Without an article page, a synthetic page the size of a typical article is used.
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter
+
+from tap_wikipedia.models.types import HtmlParserBackend
+from tap_wikipedia.utils import wikipedia_page_extractor
+
+from .mock_wikimedia_server import ARTICLE_HTML
+
+# Paragraphs added to the synthetic page to bring it to the size of a typical article page.
+SYNTHETIC_PARAGRAPH_COUNT = 2000
+
+
+def _synthetic_article_html() -> str:
+    paragraphs = "".join(
+        f'<p>Paragraph {paragraph_index} links to <a href="/wiki/Article_{paragraph_index}">an article</a>.</p>\n'
+        for paragraph_index in range(SYNTHETIC_PARAGRAPH_COUNT)
+    )
+    image = '<figure><a href="/wiki/File:Image.jpg" class="mw-file-description"><img src="//upload.wikimedia.org/image.jpg"></a></figure>\n'
+    return ARTICLE_HTML.format(title="Article").replace(
+        '<div id="content">', '<div id="content">' + image + paragraphs
+    )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("article_html_path", type=Path, nargs="?")
+    argument_parser.add_argument("--repeat", type=int, default=100)
+    arguments = argument_parser.parse_args()
+
+    html = (
+        arguments.article_html_path.read_text()
+        if arguments.article_html_path is not None
+        else _synthetic_article_html()
+    )
+
+    baseline_s = None
+    for backend in HtmlParserBackend:
+        started_at = perf_counter()
+        for _ in range(arguments.repeat):
+            page_extractor = wikipedia_page_extractor(html, backend=backend)
+            image_link = page_extractor.image_link
+            category_links = page_extractor.category_links
+        elapsed_s = (perf_counter() - started_at) / arguments.repeat
+        baseline_s = baseline_s or elapsed_s
+        print(  # noqa: T201
+            f"{backend.value}: {elapsed_s * 1000:.2f}ms per page ({baseline_s / elapsed_s:.1f}x), image link {image_link}, {len(category_links)} category links"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+A local stand-in for the Wikimedia dumps server, Wikipedia article pages, the MediaWiki API, the Featured articles
+page and the Wikimedia Commons file API.
+"""
+
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import Random
+from threading import Lock, Thread
+from time import sleep
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from benchmarks.synthetic_abstracts_dump import abstracts_dump
+
+DUMP_PATH = "/enwiki/latest/enwiki-latest-abstract.xml.gz"
+
+MEDIA_WIKI_API_PATH = "/w/api.php"
+
+FEATURED_ARTICLES_PATH = "/wiki/Wikipedia:Featured_articles"
+
+COMMONS_FILE_API_PATH = "/core/v1/commons/file/"
+
+# One in every `FEATURED_ARTICLE_INTERVAL` articles is listed on the Featured articles page.
+FEATURED_ARTICLE_INTERVAL = 10
+
+# Articles linked from the page of each article, as returned by the MediaWiki API.
+LINKED_ARTICLE_COUNT = 5
+
+ARTICLE_HTML = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+<div id="content"><p>{title} is an article.</p>
+<figure><a href="/wiki/File:{title}.jpg" class="mw-file-description"><img src="//upload.wikimedia.org/{title}.jpg"></a></figure>
+</div>
+<div id="catlinks" class="catlinks">
+<div id="mw-normal-catlinks" class="mw-normal-catlinks"><a href="/wiki/Help:Category" title="Help:Category">Categories</a>: <ul>
+<li><a href="/wiki/Category:Articles" title="Category:Articles">Articles</a></li>
+<li><a href="/wiki/Category:{title}" title="Category:{title}">{title}</a></li>
+</ul></div>
+</div>
+</body></html>
+"""
+
+
+def _linked_titles(title: str) -> list[str]:
+    return [f"{title} link {link_index}" for link_index in range(LINKED_ARTICLE_COUNT)]
+
+
+class MockWikimediaRequestHandler(BaseHTTPRequestHandler):
+    """Serve an abstracts dump and the Wikimedia APIs and pages the enrichments use, after an artificial latency."""
+
+    server: "MockWikimediaServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        sleep(self.server.latency_s)
+
+        if path == DUMP_PATH:
+            self.__send(self.server.abstracts_dump, "application/octet-stream")
+            return
+
+        if self.server.should_fail():
+            self.send_response(HTTPStatus.SERVICE_UNAVAILABLE)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if path == FEATURED_ARTICLES_PATH:
+            self.__send(self.__featured_articles_html(), "text/html; charset=UTF-8")
+        elif path.startswith("/wiki/"):
+            title = path.removeprefix("/wiki/")
+            self.__send(
+                ARTICLE_HTML.format(title=title).encode(), "text/html; charset=UTF-8"
+            )
+        elif path == MEDIA_WIKI_API_PATH:
+            self.__send_json(self.__media_wiki_api_response(parse_qs(url.query)))
+        elif path.startswith(COMMONS_FILE_API_PATH):
+            self.__send_json(
+                self.__commons_file_response(path.removeprefix(COMMONS_FILE_API_PATH))
+            )
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def log_message(self, *args) -> None:  # noqa: ANN002
+        pass
+
+    def __commons_file_response(self, file_title: str) -> dict:
+        file_url = f"{self.server.base_url}/upload/{file_title}"
+        return {
+            "title": file_title,
+            "preferred": {"url": file_url, "width": 800},
+            "original": {"url": file_url, "width": 1600},
+        }
+
+    def __featured_articles_html(self) -> bytes:
+        links = "".join(
+            f'<li><a href="/wiki/Article_{doc_index}">Article {doc_index}</a></li>\n'
+            for doc_index in range(0, self.server.doc_count, FEATURED_ARTICLE_INTERVAL)
+        )
+        return (
+            f"<!DOCTYPE html>\n<html><body><ul>\n{links}</ul></body></html>\n".encode()
+        )
+
+    def __media_wiki_api_response(self, parameters: dict[str, list[str]]) -> dict:
+        action = parameters.get("action", [""])[0]
+        if action == "parse":
+            title = parameters.get("page", [""])[0]
+            return {
+                "parse": {
+                    "title": title,
+                    "links": [
+                        {"ns": 0, "exists": "", "*": linked_title}
+                        for linked_title in _linked_titles(title)
+                    ],
+                }
+            }
+
+        properties = parameters.get("prop", [""])[0].split("|")
+        pages = []
+        for title in parameters.get("titles", [""])[0].split("|"):
+            page: dict = {"ns": 0, "title": title}
+            if "pageimages" in properties:
+                page["original"] = {
+                    "source": f"{self.server.base_url}/upload/{title.replace(' ', '_')}.jpg"
+                }
+            if "categories" in properties:
+                page["categories"] = [
+                    {"ns": 14, "title": "Category:Articles"},
+                    {"ns": 14, "title": f"Category:{title}"},
+                ]
+            if "links" in properties:
+                page["links"] = [
+                    {"ns": 0, "title": linked_title}
+                    for linked_title in _linked_titles(title)
+                ]
+            pages.append(page)
+        return {"batchcomplete": True, "query": {"pages": pages}}
+
+    def __send(self, body: bytes, content_type: str) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __send_json(self, response: dict) -> None:
+        self.__send(json.dumps(response).encode(), "application/json; charset=utf-8")
+
+
+class MockWikimediaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        *,
+        doc_count: int,
+        latency_s: float,
+        error_rate: float = 0.0,
+        sublinks_per_doc: int = 1,
+        seed: int = 0,
+    ):
+        """
+        :param doc_count: number of documents in the abstracts dump
+        :param latency_s: seconds every response is delayed by
+        :param error_rate: fraction of the responses, other than the dump, that fail with 503 Service Unavailable
+        :param sublinks_per_doc: number of sublinks of each document in the abstracts dump
+        :param seed: seed of the random failures, so that runs fail the same requests
+        """
+        super().__init__(("127.0.0.1", 0), MockWikimediaRequestHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_port}"
+        self.abstracts_dump = abstracts_dump(
+            self.base_url, doc_count, sublinks_per_doc=sublinks_per_doc
+        )
+        self.doc_count = doc_count
+        self.latency_s = latency_s
+        self.__error_rate = error_rate
+        self.__random = Random(seed)  # noqa: S311
+        self.__random_lock = Lock()
+
+    @property
+    def commons_file_api_url(self) -> str:
+        return self.base_url + COMMONS_FILE_API_PATH
+
+    @property
+    def dump_url(self) -> str:
+        return self.base_url + DUMP_PATH
+
+    @property
+    def featured_articles_url(self) -> str:
+        return self.base_url + FEATURED_ARTICLES_PATH
+
+    def should_fail(self) -> bool:
+        """Return whether to fail the current request, as `error_rate` of the requests are."""
+
+        with self.__random_lock:
+            return self.__random.random() < self.__error_rate
+
+
+@contextmanager
+def mock_wikimedia_server(
+    *,
+    doc_count: int,
+    latency_s: float = 0.0,
+    error_rate: float = 0.0,
+    sublinks_per_doc: int = 1,
+) -> Iterator[MockWikimediaServer]:
+    """Run a mock Wikimedia server in a background thread."""
+
+    server = MockWikimediaServer(
+        doc_count=doc_count,
+        latency_s=latency_s,
+        error_rate=error_rate,
+        sublinks_per_doc=sublinks_per_doc,
+    )
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,66 @@
+"""
+Compare the throughput of the single-process and parallel abstracts parsers.
+
+    poetry run python -m benchmarks.parse_benchmark path/to/abstracts.xml --worker-counts 2 4 8
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter
+
+from tap_wikipedia.utils import (
+    ParallelWikipediaAbstractsParser,
+    WikipediaAbstractsParser,
+)
+from tap_wikipedia.utils.parallel_wikipedia_abstracts_parser import DEFAULT_SHARD_SIZE
+
+
+def _single_process_record_count(abstracts_file_path: Path) -> int:
+    with abstracts_file_path.open("rb") as abstracts_file:
+        return sum(1 for _ in WikipediaAbstractsParser().parse(abstracts_file))
+
+
+def _parallel_record_count(
+    abstracts_file_path: Path, *, worker_count: int, ordered: bool, shard_size: int
+) -> int:
+    return sum(
+        1
+        for _ in ParallelWikipediaAbstractsParser(
+            worker_count=worker_count, ordered=ordered, shard_size=shard_size
+        ).parse(abstracts_file_path)
+    )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("abstracts_file_path", type=Path)
+    argument_parser.add_argument(
+        "--worker-counts", type=int, nargs="+", default=[2, 4, 8]
+    )
+    argument_parser.add_argument("--unordered", action="store_true")
+    argument_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    arguments = argument_parser.parse_args()
+
+    started_at = perf_counter()
+    record_count = _single_process_record_count(arguments.abstracts_file_path)
+    baseline_s = perf_counter() - started_at
+    print(  # noqa: T201
+        f"single process: {record_count} records in {baseline_s:.2f}s ({record_count / baseline_s:.0f} records/s)"
+    )
+
+    for worker_count in arguments.worker_counts:
+        started_at = perf_counter()
+        record_count = _parallel_record_count(
+            arguments.abstracts_file_path,
+            worker_count=worker_count,
+            ordered=not arguments.unordered,
+            shard_size=arguments.shard_size,
+        )
+        elapsed_s = perf_counter() - started_at
+        print(  # noqa: T201
+            f"{worker_count} workers: {record_count} records in {elapsed_s:.2f}s ({record_count / elapsed_s:.0f} records/s, {baseline_s / elapsed_s:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure how long the tap takes to start, by importing it and running `--discover` in fresh processes, and list the
+heavy modules that discovery imports.
+
+    poetry run python -m benchmarks.startup --runs 10 --output startup.json --baseline previous-startup.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from benchmarks.suite import git_commit
+
+# Modules that only a sync needs, which discovery should not import.
+SYNC_ONLY_MODULES = ("bs4", "lxml", "pyarrow", "requests_cache")
+
+# Prints the sync-only modules imported by a discovery, run in a fresh process.
+DISCOVERY_IMPORTS_SCRIPT = """
+import json, sys
+from tap_wikipedia.tap import TapWikipedia
+
+TapWikipedia(config=json.loads(sys.argv[1])).run_discovery()
+print(json.dumps([module for module in json.loads(sys.argv[2]) if module in sys.modules]))
+"""
+
+
+def _median_run_s(arguments: list[str], *, runs: int) -> float:
+    run_durations_s = []
+    for _ in range(runs):
+        started_at = perf_counter()
+        subprocess.run(  # noqa: S603
+            [sys.executable, *arguments],
+            capture_output=True,
+            check=True,
+        )
+        run_durations_s.append(perf_counter() - started_at)
+    return median(run_durations_s)
+
+
+def discovery_imports(config: dict) -> list[str]:
+    """Return the modules of `SYNC_ONLY_MODULES` that a discovery with `config` imports, in a fresh process."""
+
+    completed_process = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            DISCOVERY_IMPORTS_SCRIPT,
+            json.dumps(config),
+            json.dumps(SYNC_ONLY_MODULES),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # The catalog that discovery writes to stdout comes before the modules.
+    imported_modules: list[str] = json.loads(completed_process.stdout.splitlines()[-1])
+    return imported_modules
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--runs", type=int, default=5)
+    argument_parser.add_argument("--output", type=Path)
+    argument_parser.add_argument("--baseline", type=Path)
+    arguments = argument_parser.parse_args()
+
+    with TemporaryDirectory() as working_directory:
+        config = {
+            "abstracts-dump-url": "https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz",
+            "cache-directory-path": str(Path(working_directory) / "cache"),
+        }
+        config_file_path = Path(working_directory) / "config.json"
+        config_file_path.write_text(json.dumps(config))
+
+        results = {
+            "import_s": _median_run_s(
+                ["-c", "import tap_wikipedia.tap"], runs=arguments.runs
+            ),
+            "discover_s": _median_run_s(
+                [
+                    "-m",
+                    "tap_wikipedia.tap",
+                    "--config",
+                    str(config_file_path),
+                    "--discover",
+                ],
+                runs=arguments.runs,
+            ),
+            "discovery_sync_only_imports": discovery_imports(config),
+        }
+
+    for name, result in results.items():
+        print(f"{name}: {result}")  # noqa: T201
+
+    if arguments.output is not None:
+        arguments.output.write_text(
+            json.dumps(
+                {
+                    "git_commit": git_commit(),
+                    "runs": arguments.runs,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+
+    if arguments.baseline is not None:
+        baseline_results = json.loads(arguments.baseline.read_text())["results"]
+        for name in ("import_s", "discover_s"):
+            print(  # noqa: T201
+                f"{name}: {results[name] / baseline_results[name]:.2f}x vs. baseline"
+            )
+
+
+if __name__ == "__main__":
+    main()
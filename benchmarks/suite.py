@@ -0,0 +1,280 @@
+"""
+Run the benchmark suite against a mock Wikimedia server and write the results as JSON, to compare them across commits.
+
+    poetry run python -m benchmarks.suite --doc-count 5000 --output results.json --baseline previous-results.json
+
+Each benchmark runs in a fresh process, which reports the records it yielded per second, the seconds it took to yield
+the first record and its peak resident set size.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from itertools import repeat
+from multiprocessing import get_context
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, NamedTuple
+from unittest.mock import patch
+
+from benchmarks.mock_wikimedia_server import mock_wikimedia_server
+from tap_wikipedia.models.types import (
+    EnrichmentBackend,
+    EnrichmentType,
+    SubsetSpecification,
+)
+from tap_wikipedia.tap import TapWikipedia
+from tap_wikipedia.utils import FileCache, WikipediaAbstractsParser
+from tap_wikipedia.wikipedia_abstracts_stream import WikipediaAbstractsStream
+
+
+class _BenchmarkContext(NamedTuple):
+    """What a benchmark runs against: the mock server and a working directory of its own."""
+
+    dump_url: str
+    commons_file_api_url: str
+    featured_articles_url: str
+    doc_count: int
+    enrichment_max_concurrency: int
+    working_directory_path: Path
+
+
+def _tap_config(
+    context: _BenchmarkContext,
+    **config: Any,  # noqa: ANN401
+) -> dict[str, Any]:
+    return {
+        "abstracts-dump-url": context.dump_url,
+        "cache-directory-path": str(context.working_directory_path / "cache"),
+        "enrichment-max-concurrency": context.enrichment_max_concurrency,
+        **config,
+    }
+
+
+def _records(tap: TapWikipedia) -> Iterator[dict]:
+    stream = tap.streams["abstracts"]
+    assert isinstance(stream, WikipediaAbstractsStream)
+    return iter(stream.get_records(None))
+
+
+def _cached_dump_records(
+    context: _BenchmarkContext,
+    **config: Any,  # noqa: ANN401
+) -> Iterator[dict]:
+    """Download the dump into the cache directory, and return the records of a sync of it with `config`."""
+
+    for _ in _records(TapWikipedia(config=_tap_config(context))):
+        pass
+    return _records(TapWikipedia(config=_tap_config(context, **config)))
+
+
+def _end_to_end_records(context: _BenchmarkContext) -> Iterator[dict]:
+    return _records(TapWikipedia(config=_tap_config(context)))
+
+
+def _enriched_records(
+    context: _BenchmarkContext,
+    *,
+    backend: EnrichmentBackend,
+    enrichment: EnrichmentType,
+) -> Iterator[dict]:
+    return _cached_dump_records(
+        context,
+        **{"enrichments": [enrichment.value], "enrichment-backend": backend.value},
+    )
+
+
+def _featured_subset_records(context: _BenchmarkContext) -> Iterator[dict]:
+    return _cached_dump_records(
+        context, **{"subset-specifications": [SubsetSpecification.FEATURED.value]}
+    )
+
+
+def _file_cache_records(context: _BenchmarkContext) -> Iterator[Path]:
+    def records() -> Iterator[Path]:
+        cached_file_path = FileCache(
+            cache_dir_path=context.working_directory_path / "cache"
+        ).get_file(context.dump_url)
+        # The records of the dump are available once the whole dump is cached.
+        yield from repeat(cached_file_path, context.doc_count)
+
+    return records()
+
+
+def _parsed_records(context: _BenchmarkContext) -> Iterator[object]:
+    cached_file_path = FileCache(
+        cache_dir_path=context.working_directory_path / "cache"
+    ).get_file(context.dump_url)
+
+    def records() -> Iterator[object]:
+        with cached_file_path.open("rb") as abstracts_file:
+            yield from WikipediaAbstractsParser().parse(abstracts_file)
+
+    return records()
+
+
+BENCHMARKS: dict[str, Callable[[_BenchmarkContext], Iterator[object]]] = {
+    "file_cache.get_file": _file_cache_records,
+    "parser": _parsed_records,
+    **{
+        f"enrichment.{backend.value}.{enrichment.value}": partial(
+            _enriched_records, backend=backend, enrichment=enrichment
+        )
+        for backend in (EnrichmentBackend.PAGE, EnrichmentBackend.QUERY_API)
+        for enrichment in EnrichmentType
+    },
+    "get_records": _end_to_end_records,
+    "get_records.featured_subset": _featured_subset_records,
+}
+
+
+def _peak_rss_bytes() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # `ru_maxrss` is in bytes on macOS, and in kibibytes elsewhere.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _run_benchmark(name: str, context: _BenchmarkContext) -> dict[str, Any]:
+    """Run a benchmark in the current process, with the Wikimedia URLs the tap hard-codes pointed at the mock server."""
+
+    with (
+        patch(
+            "tap_wikipedia.wikipedia_abstracts_stream.COMMONS_FILE_API_URL",
+            context.commons_file_api_url,
+        ),
+        patch.dict(
+            "tap_wikipedia.wikipedia_abstracts_stream.SUBSET_ARTICLES_URLS",
+            {SubsetSpecification.FEATURED: context.featured_articles_url},
+        ),
+    ):
+        records = BENCHMARKS[name](context)
+        started_at = perf_counter()
+        time_to_first_record_s = None
+        record_count = 0
+        for _ in records:
+            if time_to_first_record_s is None:
+                time_to_first_record_s = perf_counter() - started_at
+            record_count += 1
+        elapsed_s = perf_counter() - started_at
+
+    return {
+        "record_count": record_count,
+        "elapsed_s": elapsed_s,
+        "records_per_s": record_count / elapsed_s if elapsed_s else None,
+        "time_to_first_record_s": time_to_first_record_s,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _format_result(result: dict[str, Any]) -> str:
+    formatted_result = f"{result['record_count']} records in {result['elapsed_s']:.2f}s"
+    if result["time_to_first_record_s"] is not None:
+        formatted_result += (
+            f" ({result['records_per_s']:.0f} records/s,"
+            f" first record after {result['time_to_first_record_s']:.3f}s)"
+        )
+    return formatted_result + f", peak RSS {result['peak_rss_bytes'] / 2**20:.0f} MiB"
+
+
+def git_commit() -> str | None:
+    completed_process = subprocess.run(  # noqa: S603
+        ["git", "rev-parse", "HEAD"],  # noqa: S607
+        capture_output=True,
+        check=False,
+        cwd=Path(__file__).parent,
+        text=True,
+    )
+    return completed_process.stdout.strip() or None
+
+
+def _print_comparison(
+    results: dict[str, dict[str, Any]], baseline_results: dict[str, dict[str, Any]]
+) -> None:
+    for name, result in results.items():
+        baseline_result = baseline_results.get(name)
+        if baseline_result is None or not baseline_result["records_per_s"]:
+            continue
+        print(  # noqa: T201
+            f"{name}: {result['records_per_s'] / baseline_result['records_per_s']:.2f}x records/s, "
+            f"{result['peak_rss_bytes'] / baseline_result['peak_rss_bytes']:.2f}x peak RSS vs. baseline"
+        )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--doc-count", type=int, default=2000)
+    argument_parser.add_argument("--sublinks-per-doc", type=int, default=1)
+    argument_parser.add_argument("--latency-s", type=float, default=0.0)
+    argument_parser.add_argument("--error-rate", type=float, default=0.0)
+    argument_parser.add_argument("--enrichment-max-concurrency", type=int, default=8)
+    argument_parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+    )
+    argument_parser.add_argument("--output", type=Path)
+    argument_parser.add_argument("--baseline", type=Path)
+    arguments = argument_parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    with mock_wikimedia_server(
+        doc_count=arguments.doc_count,
+        latency_s=arguments.latency_s,
+        error_rate=arguments.error_rate,
+        sublinks_per_doc=arguments.sublinks_per_doc,
+    ) as server:
+        for name in arguments.benchmarks:
+            with (
+                TemporaryDirectory() as working_directory,
+                ProcessPoolExecutor(
+                    max_workers=1, mp_context=get_context("spawn")
+                ) as executor,
+            ):
+                results[name] = executor.submit(
+                    _run_benchmark,
+                    name,
+                    _BenchmarkContext(
+                        dump_url=server.dump_url,
+                        commons_file_api_url=server.commons_file_api_url,
+                        featured_articles_url=server.featured_articles_url,
+                        doc_count=arguments.doc_count,
+                        enrichment_max_concurrency=arguments.enrichment_max_concurrency,
+                        working_directory_path=Path(working_directory),
+                    ),
+                ).result()
+            print(f"{name}: {_format_result(results[name])}")  # noqa: T201
+
+    report = {
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),  # noqa: UP017
+        "git_commit": git_commit(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "doc_count": arguments.doc_count,
+            "sublinks_per_doc": arguments.sublinks_per_doc,
+            "latency_s": arguments.latency_s,
+            "error_rate": arguments.error_rate,
+            "enrichment_max_concurrency": arguments.enrichment_max_concurrency,
+        },
+        "results": results,
+    }
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if arguments.baseline is not None:
+        _print_comparison(
+            results, json.loads(arguments.baseline.read_text())["results"]
+        )
+
+
+if __name__ == "__main__":
+    main()
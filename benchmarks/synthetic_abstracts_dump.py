@@ -0,0 +1,103 @@
+"""
+Generate a synthetic Wikipedia abstracts dump of a given size and sublink density.
+
+    poetry run python -m benchmarks.synthetic_abstracts_dump abstracts.xml.gz --doc-count 100000 --sublinks-per-doc 5
+"""
+
+import argparse
+import gzip
+from collections.abc import Iterator
+from pathlib import Path
+
+DEFAULT_BASE_URL = "https://en.wikipedia.org"
+
+# Sentences in the abstract of each document, which make it roughly the length of a real abstract.
+ABSTRACT_SENTENCE_COUNT = 3
+
+
+def abstracts_dump_docs(
+    base_url: str,
+    doc_count: int,
+    *,
+    sublinks_per_doc: int = 1,
+) -> Iterator[bytes]:
+    """Yield the `<feed>` tags and each `<doc>` element of a synthetic abstracts dump whose URLs point at `base_url`."""
+
+    yield b"<feed>\n"
+    for doc_index in range(doc_count):
+        url = f"{base_url}/wiki/Article_{doc_index}"
+        abstract = " ".join(
+            f"Sentence {sentence_index} of the abstract of article {doc_index}."
+            for sentence_index in range(ABSTRACT_SENTENCE_COUNT)
+        )
+        sublinks = "".join(
+            f'<sublink linktype="nav"><anchor>Section {sublink_index}</anchor><link>{url}#Section_{sublink_index}</link></sublink>\n'
+            for sublink_index in range(sublinks_per_doc)
+        )
+        yield f"""<doc>
+<title>Wikipedia: Article {doc_index}</title>
+<url>{url}</url>
+<abstract>{abstract}</abstract>
+<links>
+{sublinks}</links>
+</doc>
+""".encode()
+    yield b"</feed>\n"
+
+
+def abstracts_dump(
+    base_url: str,
+    doc_count: int,
+    *,
+    sublinks_per_doc: int = 1,
+    compress: bool = True,
+) -> bytes:
+    """Return a synthetic abstracts dump whose article URLs point at `base_url`, gzipped unless `compress` is False."""
+
+    dump = b"".join(
+        abstracts_dump_docs(base_url, doc_count, sublinks_per_doc=sublinks_per_doc)
+    )
+    return gzip.compress(dump) if compress else dump
+
+
+def write_abstracts_dump(
+    dump_file_path: Path,
+    *,
+    base_url: str = DEFAULT_BASE_URL,
+    doc_count: int,
+    sublinks_per_doc: int = 1,
+) -> None:
+    """Write a synthetic abstracts dump to a file, gzipped if its name ends with `.gz`, one document at a time."""
+
+    with (
+        gzip.open(dump_file_path, "wb")
+        if dump_file_path.suffix == ".gz"
+        else dump_file_path.open("wb")
+    ) as dump_file:
+        for doc in abstracts_dump_docs(
+            base_url, doc_count, sublinks_per_doc=sublinks_per_doc
+        ):
+            dump_file.write(doc)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("dump_file_path", type=Path)
+    argument_parser.add_argument("--doc-count", type=int, default=10000)
+    argument_parser.add_argument("--sublinks-per-doc", type=int, default=1)
+    argument_parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    arguments = argument_parser.parse_args()
+
+    write_abstracts_dump(
+        arguments.dump_file_path,
+        base_url=arguments.base_url,
+        doc_count=arguments.doc_count,
+        sublinks_per_doc=arguments.sublinks_per_doc,
+    )
+    print(  # noqa: T201
+        f"wrote {arguments.doc_count} docs to {arguments.dump_file_path} ({arguments.dump_file_path.stat().st_size} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 WIKI_SUBDIRECTORY = "/wiki/"
 
 
+MEDIA_WIKI_API_PATH = "/w/api.php"
+
+
 WIKIPEDIA_TITLE_PREFIX = "Wikipedia:"
 
 
@@ -9,6 +12,7 @@ class WikipediaUrl:
 
     BASE_URL = "https://en.wikipedia.org"
 
-    MEDIA_WIKI_API = BASE_URL + "/w/api.php"
+    MEDIA_WIKI_API = BASE_URL + MEDIA_WIKI_API_PATH
     WIKI_SUBDIRECTORY_URL = BASE_URL + WIKI_SUBDIRECTORY
     FEATURED_ARTICLES_URL = WIKI_SUBDIRECTORY_URL + "Wikipedia:Featured_articles"
+    GOOD_ARTICLES_URL = WIKI_SUBDIRECTORY_URL + "Wikipedia:Good_articles/all"
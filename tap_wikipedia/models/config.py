@@ -1,11 +1,29 @@
+import re
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
 from appdirs import user_cache_dir
-from pydantic import Field, field_validator
+from pydantic import AliasChoices, Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
 
-from tap_wikipedia.models.types import EnrichmentType, SubsetSpecification
+from tap_wikipedia.models.types import (
+    BatchFormat,
+    CacheStorageMode,
+    EnrichmentBackend,
+    EnrichmentType,
+    HtmlParserBackend,
+    Profiler,
+    SubsetSpecification,
+)
+from tap_wikipedia.utils.url_patterns import expand_url_pattern
+
+# File name of the dump of a wiki, whose database name precedes the first hyphen, such as `dewiki` in
+# `dewiki-latest-abstract.xml.gz`.
+WIKI_DUMP_FILE_NAME_PATTERN = re.compile(r"(?P<wiki>[a-z_]+wiki)-[^/]*$")
+
+# Wiki whose articles the Featured and Good subsets are scraped from.
+SUBSET_ARTICLES_WIKI = "enwiki"
 
 
 class Config(BaseSettings):
@@ -19,6 +37,23 @@ class Config(BaseSettings):
             validation_alias="abstracts-dump-url",
         ),
     ]
+    abstracts_dump_urls: Annotated[
+        tuple[str, ...] | None,
+        Field(min_length=1, validation_alias="abstracts-dump-urls"),
+    ] = None
+    batch_config: dict[str, Any] | None = None
+    batch_directory_path: Annotated[
+        Path | None,
+        Field(validation_alias="batch-directory-path"),
+    ] = None
+    batch_format: Annotated[
+        BatchFormat | None,
+        Field(validation_alias="batch-format"),
+    ] = None
+    batch_size: Annotated[
+        int,
+        Field(ge=1, validation_alias="batch-size"),
+    ] = 10000
     cache_directory_path: Annotated[
         Path,
         Field(
@@ -26,14 +61,208 @@ class Config(BaseSettings):
             validation_alias="cache-directory-path",
         ),
     ]
+    cache_max_age_s: Annotated[
+        float | None,
+        Field(ge=0, validation_alias="cache-max-age-s"),
+    ] = None
+    cache_storage_mode: Annotated[
+        CacheStorageMode,
+        Field(validation_alias="cache-storage-mode"),
+    ] = CacheStorageMode.DECOMPRESSED
+    change_data_capture: Annotated[
+        bool,
+        Field(validation_alias="change-data-capture"),
+    ] = False
+    change_data_capture_tombstones: Annotated[
+        bool,
+        Field(validation_alias="change-data-capture-tombstones"),
+    ] = False
+    dump_title_index: Annotated[
+        bool,
+        Field(validation_alias="dump-title-index"),
+    ] = True
     enrichments: tuple[EnrichmentType, ...] | None = None
+    enrichment_backend: Annotated[
+        EnrichmentBackend,
+        Field(validation_alias="enrichment-backend"),
+    ] = EnrichmentBackend.PAGE
+    enrichment_cache: Annotated[
+        bool,
+        Field(validation_alias="enrichment-cache"),
+    ] = True
+    enrichment_cache_max_age_s: Annotated[
+        float | None,
+        Field(
+            default=7 * 24 * 60 * 60,
+            ge=0,
+            validation_alias="enrichment-cache-max-age-s",
+        ),
+    ]
+    enrichment_cache_max_size_bytes: Annotated[
+        int | None,
+        Field(
+            default=1024 * 1024 * 1024,
+            ge=0,
+            validation_alias="enrichment-cache-max-size-bytes",
+        ),
+    ]
+    enrichment_deferred_retries: Annotated[
+        int,
+        Field(ge=0, validation_alias="enrichment-deferred-retries"),
+    ] = 1
+    enrichment_deferred_retry_delay_s: Annotated[
+        float,
+        Field(ge=0, validation_alias="enrichment-deferred-retry-delay-s"),
+    ] = 30
+    enrichment_in_order: Annotated[
+        bool,
+        Field(validation_alias="enrichment-in-order"),
+    ] = True
+    enrichment_max_concurrency: Annotated[
+        int,
+        Field(ge=1, validation_alias="enrichment-max-concurrency"),
+    ] = 1
+    enrichment_max_concurrency_per_host: Annotated[
+        int | None,
+        Field(ge=1, validation_alias="enrichment-max-concurrency-per-host"),
+    ] = None
+    enrichment_max_request_attempts: Annotated[
+        int,
+        Field(ge=1, validation_alias="enrichment-max-request-attempts"),
+    ] = 4
+    enrichment_max_requests_per_second_per_host: Annotated[
+        float | None,
+        Field(gt=0, validation_alias="enrichment-max-requests-per-second-per-host"),
+    ] = None
+    html_parser_backend: Annotated[
+        HtmlParserBackend,
+        Field(validation_alias="html-parser-backend"),
+    ] = HtmlParserBackend.BEAUTIFUL_SOUP
+    offline_enrichment_dumps_url_prefix: Annotated[
+        str | None,
+        Field(min_length=1, validation_alias="offline-enrichment-dumps-url-prefix"),
+    ] = None
+    record_validation_sample_rate: Annotated[
+        float,
+        Field(ge=0, le=1, validation_alias="record-validation-sample-rate"),
+    ] = 0.01
+    state_message_frequency: Annotated[
+        int,
+        Field(ge=1, validation_alias="state-message-frequency"),
+    ] = 10000
+    subset_snapshot_max_age_s: Annotated[
+        float | None,
+        Field(default=24 * 60 * 60, ge=0, validation_alias="subset-snapshot-max-age-s"),
+    ]
     subset_specifications: Annotated[
         tuple[SubsetSpecification, ...] | None,
         Field(validation_alias="subset-specifications"),
     ] = None
+    subset_title_allowlist_path: Annotated[
+        Path | None,
+        Field(validation_alias="subset-title-allowlist-path"),
+    ] = None
     clean_wikipedia_title: bool = True
+    parse_worker_count: Annotated[
+        int,
+        Field(ge=1, validation_alias="parse-worker-count"),
+    ] = 1
+    parse_in_dump_order: Annotated[
+        bool,
+        Field(validation_alias="parse-in-dump-order"),
+    ] = True
+    partition_max_buffered_records: Annotated[
+        int,
+        Field(ge=1, validation_alias="partition-max-buffered-records"),
+    ] = 1000
+    partition_max_concurrency: Annotated[
+        int,
+        Field(ge=1, validation_alias="partition-max-concurrency"),
+    ] = 1
+    pipeline_metrics: Annotated[
+        bool,
+        Field(validation_alias="pipeline-metrics"),
+    ] = False
+    pipeline_metrics_text_file_path: Annotated[
+        Path | None,
+        Field(validation_alias="pipeline-metrics-text-file-path"),
+    ] = None
+    profile_directory_path: Annotated[
+        Path | None,
+        Field(validation_alias="profile-directory-path"),
+    ] = None
+    profiler: Annotated[
+        Profiler | None,
+        Field(validation_alias=AliasChoices("profiler", "TAP_WIKIPEDIA_PROFILER")),
+    ] = None
+    profiler_sampling_interval_s: Annotated[
+        float,
+        Field(gt=0, validation_alias="profiler-sampling-interval-s"),
+    ] = 0.005
+    tracemalloc_snapshot_interval_s: Annotated[
+        float | None,
+        Field(
+            gt=0,
+            validation_alias=AliasChoices(
+                "tracemalloc-snapshot-interval-s",
+                "TAP_WIKIPEDIA_TRACEMALLOC_SNAPSHOT_INTERVAL_S",
+            ),
+        ),
+    ] = None
 
     @field_validator("cache_directory_path", mode="before")
     @classmethod
     def convert_to_path(cls, cache_directory_str: str) -> Path:
         return Path(cache_directory_str)
+
+    @field_validator("abstracts_dump_urls", mode="after")
+    @classmethod
+    def expand_abstracts_dump_url_patterns(
+        cls, abstracts_dump_urls: tuple[str, ...] | None
+    ) -> tuple[str, ...] | None:
+        if abstracts_dump_urls is None:
+            return None
+        return tuple(
+            dict.fromkeys(
+                url
+                for url_pattern in abstracts_dump_urls
+                for url in expand_url_pattern(url_pattern)
+            )
+        )
+
+    @model_validator(mode="after")
+    def check_parquet_batch_format_dependency(self) -> "Config":
+        if self.batch_format == BatchFormat.PARQUET and find_spec("pyarrow") is None:
+            msg = "the Parquet batch format requires pyarrow, installed with the parquet extra of tap-wikipedia"
+            raise ValueError(msg)
+        return self
+
+    @model_validator(mode="after")
+    def check_subset_specification_wikis(self) -> "Config":
+        scraped_subsets = sorted(
+            subset_specification.value
+            for subset_specification in self.subset_specifications or ()
+            if subset_specification != SubsetSpecification.TITLE_ALLOWLIST
+        )
+        if not scraped_subsets:
+            return self
+        for dump_url in self.abstracts_dump_urls or (self.abstracts_dump_url,):
+            match = WIKI_DUMP_FILE_NAME_PATTERN.search(dump_url)
+            if match is not None and match["wiki"] != SUBSET_ARTICLES_WIKI:
+                msg = (
+                    f"the {' and '.join(scraped_subsets)} subsets are only available for "
+                    f"{SUBSET_ARTICLES_WIKI} dumps, not {match['wiki']} dumps: use the TitleAllowlist subset instead"
+                )
+                raise ValueError(msg)
+        return self
+
+    @model_validator(mode="after")
+    def check_subset_title_allowlist_path(self) -> "Config":
+        if (
+            self.subset_specifications
+            and SubsetSpecification.TITLE_ALLOWLIST in self.subset_specifications
+            and self.subset_title_allowlist_path is None
+        ):
+            msg = "subset-title-allowlist-path is required by the TitleAllowlist subset"
+            raise ValueError(msg)
+        return self
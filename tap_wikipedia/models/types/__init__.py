@@ -1,4 +1,9 @@
+from .batch_format import BatchFormat as BatchFormat
+from .cache_storage_mode import CacheStorageMode as CacheStorageMode
+from .enrichment_backend import EnrichmentBackend as EnrichmentBackend
 from .enrichment_type import EnrichmentType as EnrichmentType
+from .html_parser_backend import HtmlParserBackend as HtmlParserBackend
 from .non_blank_string import NonBlankString as NonBlankString
+from .profiler import Profiler as Profiler
 from .stripped_string import StrippedString as StrippedString
 from .subset_specification import SubsetSpecification as SubsetSpecification
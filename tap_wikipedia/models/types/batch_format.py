@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class BatchFormat(Enum):
+    """An enum of the formats of the files that records are written to when the stream emits BATCH messages."""
+
+    JSON_LINES = "JsonLines"
+    PARQUET = "Parquet"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class CacheStorageMode(Enum):
+    """An enum of the ways a downloaded dump can be stored in the cache."""
+
+    DECOMPRESSED = "Decompressed"
+    COMPRESSED = "Compressed"
+    COMPRESSED_WITH_SEEK_INDEX = "CompressedWithSeekIndex"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class EnrichmentBackend(Enum):
+    """An enum of the sources that enrichments of Wikipedia records are retrieved from."""
+
+    OFFLINE = "Offline"
+    PAGE = "Page"
+    QUERY_API = "QueryApi"
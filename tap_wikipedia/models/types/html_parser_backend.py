@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class HtmlParserBackend(Enum):
+    """An enum of the parsers that extract enrichments from the HTML of Wikipedia article pages."""
+
+    BEAUTIFUL_SOUP = "BeautifulSoup"
+    STREAMING = "Streaming"
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class Profiler(Enum):
+    """An enum of the profilers that a sync can be run under."""
+
+    DETERMINISTIC = "Deterministic"
+    SAMPLING = "Sampling"
@@ -6,3 +6,4 @@ class SubsetSpecification(Enum):
 
     FEATURED = "Featured"
     GOOD = "Good"
+    TITLE_ALLOWLIST = "TitleAllowlist"
@@ -4,3 +4,8 @@ from .external_link import ExternalLink as ExternalLink
 from .sublink import Sublink as Sublink
 
 from .record import Record as Record  # isort:skip
+from .sublink_record import SublinkRecord as SublinkRecord  # isort:skip
+from .compact_record import CompactCategory as CompactCategory  # isort:skip
+from .compact_record import CompactExternalLink as CompactExternalLink  # isort:skip
+from .compact_record import CompactRecord as CompactRecord  # isort:skip
+from .compact_record import CompactSublink as CompactSublink  # isort:skip
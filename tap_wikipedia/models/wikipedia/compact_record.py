@@ -0,0 +1,119 @@
+import re
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+from pydantic import AnyUrl
+
+from tap_wikipedia.models.wikipedia import Record, SublinkRecord
+
+# URLs that `AnyUrl` leaves unchanged: an HTTP(S) URL with a lower-case host that does not end in a number, without
+# a port, followed by a path without dot segments, a query and a fragment of characters that need no percent-encoding.
+NORMALIZED_URL_PATTERN = re.compile(
+    r"https?://(?:[a-z0-9-]*\.)*[a-z][a-z0-9-]*"
+    r"(?:/(?!\.|%2[eE])[A-Za-z0-9\-._~:\[\]@!$&'()*+,;=%|^]*)+"
+    r"(?:\?[A-Za-z0-9\-._~:/?\[\]@!$&()*+,;=%|^]*)?"
+    r"(?:#[A-Za-z0-9\-._~:/?#\[\]@!$&'()*+,;=%|^]*)?"
+)
+
+
+def normalize_url(url: str) -> str:
+    """Return a URL as `AnyUrl` serializes it, skipping the parse for URLs that are already normalized."""
+
+    if NORMALIZED_URL_PATTERN.fullmatch(url):
+        return url
+    return str(AnyUrl(url))
+
+
+class CompactSublink(NamedTuple):
+    """A sublink of a Wikipedia article."""
+
+    anchor: str | None
+    link: str | None
+
+
+class CompactCategory(NamedTuple):
+    """A category of a Wikipedia article."""
+
+    text: str | None
+    link: str | None
+
+
+class CompactExternalLink(NamedTuple):
+    """An external link of a Wikipedia article."""
+
+    title: str | None
+    link: str | None
+
+
+@dataclass(slots=True)
+class CompactRecord:
+    """
+    A lightweight, unvalidated Wikipedia record passed between the parser and the stages of the stream.
+
+    It is converted to the dict of the published `Record` schema when the record is emitted, and its sublinks to the
+    dicts of the published `SublinkRecord` schema.
+    """
+
+    title: str
+    url: str
+    abstract: str
+    sublinks: tuple[CompactSublink, ...] | None = None
+    image_url: str | None = None
+    categories: tuple[CompactCategory, ...] | None = None
+    external_links: tuple[CompactExternalLink, ...] | None = None
+    # Byte offset of the record's `<doc>` element in the uncompressed dump.
+    dump_offset: int | None = None
+    # Length in bytes of the record's `<doc>` element, up to the end of its `</doc>` tag.
+    dump_length: int | None = None
+    # Whether the record is emitted without its enrichments because retrieving them failed.
+    enrichment_failed: bool = False
+    # Whether the record's enrichments were read from the enrichment cache, so that the enrichment stages skip it.
+    enrichment_cached: bool = False
+
+    def to_record(self) -> Record:
+        """Validate the record against the published `Record` schema."""
+
+        return Record.model_validate(self.to_singer_dict())
+
+    def to_singer_dict(self) -> dict[str, Any]:
+        """Return the record as the dict that `Record.model_dump()` would return, with URLs serialized to strings."""
+
+        return {
+            "abstract_info": {
+                "title": self.title,
+                "url": normalize_url(self.url),
+                "abstract": self.abstract,
+                "imageUrl": (
+                    normalize_url(self.image_url)
+                    if self.image_url is not None
+                    else None
+                ),
+            },
+            "categories": (
+                tuple(category._asdict() for category in self.categories)
+                if self.categories is not None
+                else None
+            ),
+            "external_links": (
+                tuple(external_link._asdict() for external_link in self.external_links)
+                if self.external_links is not None
+                else None
+            ),
+        }
+
+    def to_sublink_records(self) -> tuple[SublinkRecord, ...]:
+        """Validate the sublinks of the record against the published `SublinkRecord` schema."""
+
+        return tuple(
+            SublinkRecord.model_validate(sublink_dict)
+            for sublink_dict in self.to_sublink_singer_dicts()
+        )
+
+    def to_sublink_singer_dicts(self) -> tuple[dict[str, Any], ...]:
+        """Return the sublinks of the record as the dicts that `SublinkRecord.model_dump()` would return."""
+
+        url = normalize_url(self.url)
+        return tuple(
+            {"anchor": sublink.anchor, "link": sublink.link, "url": url}
+            for sublink in self.sublinks or ()
+        )
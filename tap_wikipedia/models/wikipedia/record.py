@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 
-from tap_wikipedia.models.wikipedia import AbstractInfo, Category, ExternalLink, Sublink
+from tap_wikipedia.models.wikipedia import AbstractInfo, Category, ExternalLink
 
 
 class Record(BaseModel):
@@ -9,4 +9,3 @@ class Record(BaseModel):
     abstract_info: AbstractInfo
     categories: tuple[Category, ...] | None = None
     external_links: tuple[ExternalLink, ...] | None = None
-    sublinks: tuple[Sublink, ...] | None = None
@@ -0,0 +1,9 @@
+from pydantic import AnyUrl
+
+from tap_wikipedia.models.wikipedia import Sublink
+
+
+class SublinkRecord(Sublink):
+    """Pydantic Model to hold a sublink of a Wikipedia article, keyed by the URL of the article."""
+
+    url: AnyUrl
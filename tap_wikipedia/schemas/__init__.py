@@ -0,0 +1,47 @@
+"""
+JSON schemas of the tap's configuration and streams, generated from the Pydantic models and shipped with the package,
+so that discovery does not import the models to generate them.
+
+Regenerate them after changing the models with:
+
+    poetry run python -m tap_wikipedia.schemas
+"""
+
+import json
+from importlib.resources import files
+from pathlib import Path
+from typing import Any
+
+
+def generate_schemas() -> dict[str, dict[str, Any]]:
+    """Return the JSON schemas generated from the Pydantic models, by the name they are shipped under."""
+
+    from tap_wikipedia.models import Config, wikipedia
+
+    config_schema = Config.model_json_schema()
+    # The default cache directory depends on the user and platform, so it is left to `Config` to resolve.
+    del config_schema["properties"]["cache-directory-path"]["default"]
+
+    return {
+        "config": config_schema,
+        "abstracts": wikipedia.Record.model_json_schema(),
+        "sublinks": wikipedia.SublinkRecord.model_json_schema(),
+    }
+
+
+def load_schema(name: str) -> dict[str, Any]:
+    """Return a JSON schema shipped with the package."""
+
+    schema: dict[str, Any] = json.loads(
+        files(__name__).joinpath(f"{name}.json").read_text()
+    )
+    return schema
+
+
+def write_schemas() -> None:
+    """Write the JSON schemas generated from the Pydantic models to the package."""
+
+    for name, schema in generate_schemas().items():
+        (Path(__file__).parent / f"{name}.json").write_text(
+            json.dumps(schema, indent=2) + "\n"
+        )
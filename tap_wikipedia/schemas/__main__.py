@@ -0,0 +1,3 @@
+from tap_wikipedia.schemas import write_schemas
+
+write_schemas()
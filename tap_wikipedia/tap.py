@@ -2,23 +2,30 @@
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from singer_sdk import Tap
 
-from tap_wikipedia.models import Config
-from tap_wikipedia.wikipedia_abstracts_stream import WikipediaAbstractsStream
+from tap_wikipedia.schemas import load_schema
 
 if TYPE_CHECKING:
+    from tap_wikipedia.models import Config
     from tap_wikipedia.wikipedia_stream import WikipediaStream
 
+# Directory in the cache directory that holds a directory of profiling results per sync, unless
+# `profile_directory_path` is configured.
+PROFILES_DIRECTORY_NAME = "profiles"
+
 
 class TapWikipedia(Tap):
     """Singer Tap for Wikipedia data."""
 
     name = "tap-wikipedia"
 
-    config_json_schema = Config.model_json_schema()
+    # The models, and the streams that import them, are only imported once the configuration is read, so that
+    # `--about` does not wait for them.
+    config_json_schema = load_schema("config")
 
     def get_config(self) -> Config:
         """Return the contents of Tap configuration
@@ -27,6 +34,8 @@ class TapWikipedia(Tap):
             A Config object that contains configuration values for tap-wikipedia
         """
 
+        from tap_wikipedia.models import Config
+
         return Config(**self.config)
 
     def discover_streams(self) -> list[WikipediaStream]:
@@ -35,7 +44,53 @@ class TapWikipedia(Tap):
         Returns:
             A list of discovered streams.
         """
-        return [WikipediaAbstractsStream(tap=self, wikipedia_config=self.get_config())]
+        from tap_wikipedia.wikipedia_abstracts_stream import WikipediaAbstractsStream
+        from tap_wikipedia.wikipedia_sublinks_stream import WikipediaSublinksStream
+
+        wikipedia_config = self.get_config()
+        abstracts_stream = WikipediaAbstractsStream(
+            tap=self, wikipedia_config=wikipedia_config
+        )
+        return [
+            abstracts_stream,
+            WikipediaSublinksStream(
+                tap=self,
+                wikipedia_config=wikipedia_config,
+                abstracts_stream=abstracts_stream,
+            ),
+        ]
+
+    def sync_all(self) -> None:  # type: ignore[misc]
+        """Sync all streams, under the configured profiler and with `tracemalloc` snapshots, if either is enabled.
+
+        The results of each profiled sync are written to a directory of their own, named after the time the sync
+        started, in `profile_directory_path`. Profiling is switched on by settings, or by the
+        `TAP_WIKIPEDIA_PROFILER` and `TAP_WIKIPEDIA_TRACEMALLOC_SNAPSHOT_INTERVAL_S` environment variables, so that
+        the tap is invoked the same way whether it is profiled or not.
+        """
+
+        wikipedia_config = self.get_config()
+        if (
+            wikipedia_config.profiler is None
+            and wikipedia_config.tracemalloc_snapshot_interval_s is None
+        ):
+            super().sync_all()
+            return
+
+        started_at = datetime.now(tz=timezone.utc)  # noqa: UP017
+        profile_directory_path = (
+            wikipedia_config.profile_directory_path
+            or wikipedia_config.cache_directory_path / PROFILES_DIRECTORY_NAME
+        ) / started_at.strftime("%Y%m%dT%H%M%S%fZ")
+        from tap_wikipedia.utils import SyncProfiler
+
+        with SyncProfiler(
+            profile_directory_path=profile_directory_path,
+            profiler=wikipedia_config.profiler,
+            sampling_interval_s=wikipedia_config.profiler_sampling_interval_s,
+            tracemalloc_snapshot_interval_s=wikipedia_config.tracemalloc_snapshot_interval_s,
+        ):
+            super().sync_all()
 
 
 if __name__ == "__main__":
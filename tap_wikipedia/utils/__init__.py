@@ -1,4 +1,39 @@
+from .batched import batched as batched
+from .concurrent_map import concurrent_map as concurrent_map
+from .dump_title_index import DumpTitleIndex as DumpTitleIndex
+from .enrichment_cache import EnrichmentCache as EnrichmentCache
+from .enrichment_cache import record_enrichments as record_enrichments
+from .enrichment_cache import set_record_enrichments as set_record_enrichments
 from .file_cache import FileCache as FileCache
+from .http_client import HttpClient as HttpClient
+from .media_wiki_query_client import MediaWikiQueryClient as MediaWikiQueryClient
+from .offline_enrichment_index import (
+    OfflineEnrichmentIndex as OfflineEnrichmentIndex,
+)
+from .parallel_wikipedia_abstracts_parser import (
+    ParallelWikipediaAbstractsParser as ParallelWikipediaAbstractsParser,
+)
+from .parquet_batcher import ParquetBatcher as ParquetBatcher
+from .parquet_batcher import ParquetEncoding as ParquetEncoding
+from .parquet_batcher import arrow_schema as arrow_schema
+from .partition_prefetcher import PartitionPrefetcher as PartitionPrefetcher
+from .pipeline_metrics import PipelineMetrics as PipelineMetrics
+from .record_digest_index import RecordDigestIndex as RecordDigestIndex
+from .record_digest_index import record_digest as record_digest
+from .sql_dump_reader import SqlDumpReader as SqlDumpReader
+from .sync_profiler import SyncProfiler as SyncProfiler
+from .title_set_snapshot import TitleSetSnapshot as TitleSetSnapshot
+from .url_patterns import expand_url_pattern as expand_url_pattern
 from .wikipedia_abstracts_parser import (
     WikipediaAbstractsParser as WikipediaAbstractsParser,
 )
+from .wikipedia_page_extractor import (
+    WikipediaPageExtractor as WikipediaPageExtractor,
+)
+from .wikipedia_page_extractor import (
+    wikipedia_page_extractor as wikipedia_page_extractor,
+)
+from .wikipedia_titles import normalize_wikipedia_title as normalize_wikipedia_title
+from .wikipedia_titles import wikipedia_title_from_url as wikipedia_title_from_url
+from .wikipedia_titles import read_wikipedia_titles as read_wikipedia_titles
+from .wikipedia_titles import wikipedia_base_url as wikipedia_base_url
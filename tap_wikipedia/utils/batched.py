@@ -0,0 +1,13 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def batched(items: Iterable[T], batch_size: int) -> Iterator[tuple[T, ...]]:
+    """Lazily split `items` into tuples of `batch_size` items; the last tuple may be shorter."""
+
+    items_iterator = iter(items)
+    while batch := tuple(islice(items_iterator, batch_size)):
+        yield batch
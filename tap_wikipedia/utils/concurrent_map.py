@@ -0,0 +1,50 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def concurrent_map(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_concurrency: int,
+    ordered: bool = True,
+) -> Iterator[R]:
+    """
+    Apply `function` to `items` in a pool of threads and yield the results.
+
+    At most `max_concurrency` calls are in flight at a time, and `items` is consumed lazily,
+    so a long stream of items is never buffered in memory.
+    Results are yielded in the order of `items`, or as soon as they are ready if `ordered` is False.
+    """
+
+    if max_concurrency <= 1:
+        yield from map(function, items)
+        return
+
+    items_iterator = iter(items)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        def submit(item_count: int) -> Iterator[Future[R]]:
+            for item in islice(items_iterator, item_count):
+                yield executor.submit(function, item)
+
+        if ordered:
+            ordered_futures = deque(submit(max_concurrency))
+            while ordered_futures:
+                result = ordered_futures.popleft().result()
+                ordered_futures.extend(submit(1))
+                yield result
+        else:
+            futures = set(submit(max_concurrency))
+            while futures:
+                done_futures, futures = wait(futures, return_when=FIRST_COMPLETED)
+                futures.update(submit(len(done_futures)))
+                for done_future in done_futures:
+                    yield done_future.result()
@@ -0,0 +1,260 @@
+import mmap
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Collection, Generator, Iterable, Iterator
+from io import BytesIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO, NamedTuple
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.utils.gzip_seek_index import (
+    SeekPoint,
+    open_at_seek_point,
+    read_seek_index,
+)
+from tap_wikipedia.utils.wikipedia_abstracts_parser import WikipediaAbstractsParser
+from tap_wikipedia.utils.wikipedia_titles import wikipedia_title_from_url
+
+# Number of index entries inserted at a time while the index is built.
+INSERT_BATCH_SIZE = 10000
+
+# Maximum number of titles looked up in the index per query, below SQLite's limit on query parameters.
+MAX_TITLES_PER_LOOKUP = 500
+
+FEED_END_TAG = b"</feed>"
+
+
+class DocRange(NamedTuple):
+    """The byte range of a `<doc>` element in the uncompressed dump."""
+
+    offset: int
+    length: int
+
+
+def title_index_path(dump_file_path: Path) -> Path:
+    """Return the path of the title index stored beside a cached abstracts dump."""
+
+    return dump_file_path.with_name(dump_file_path.name + ".title-index.sqlite")
+
+
+class DumpTitleIndex:
+    """
+    An on-disk index from the normalized title of each article of a cached abstracts dump to the byte range of its
+    `<doc>` element in the uncompressed dump, so that the records of a few articles can be parsed without scanning the
+    whole dump.
+
+    The index is built while the whole dump is parsed, and stored beside it once every record has been parsed.
+    """
+
+    def __init__(self, dump_file_path: Path):
+        """
+        :param dump_file_path: path to a cached abstracts dump that has a title index
+        """
+        self.__connection = sqlite3.connect(
+            f"{title_index_path(dump_file_path).as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+
+    def __enter__(self) -> "DumpTitleIndex":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @staticmethod
+    def build(
+        dump_file_path: Path, records: Iterable[wikipedia.CompactRecord]
+    ) -> Generator[wikipedia.CompactRecord, None, None]:
+        """
+        Yield the records parsed from the whole of a cached abstracts dump, indexing their titles.
+
+        The index is written to a temporary file, which replaces the title index of the dump once every record has
+        been yielded. It is discarded if the records are not all consumed before the generator is closed.
+        """
+
+        index_file_path = title_index_path(dump_file_path)
+        # A file of its own, since a cancelled sync may still be building the index of the same dump in another thread.
+        with NamedTemporaryFile(
+            dir=index_file_path.parent,
+            prefix=f"{index_file_path.name}.",
+            suffix=".tmp",
+            delete=False,
+        ) as temporary_file:
+            temporary_file_path = Path(temporary_file.name)
+        # The records may be consumed from another thread than the one that started the build.
+        connection = sqlite3.connect(temporary_file_path, check_same_thread=False)
+        try:
+            # The temporary file is discarded if the build fails, so it needs no journal.
+            connection.executescript(
+                """
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                CREATE TABLE doc_range (
+                    title TEXT PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                """
+            )
+            rows: list[tuple[str, int, int]] = []
+            for record in records:
+                title = wikipedia_title_from_url(record.url)
+                if (
+                    title is not None
+                    and record.dump_offset is not None
+                    and record.dump_length is not None
+                ):
+                    rows.append((title, record.dump_offset, record.dump_length))
+                    if len(rows) >= INSERT_BATCH_SIZE:
+                        DumpTitleIndex.__insert_rows(connection, rows)
+                        rows = []
+                yield record
+            DumpTitleIndex.__insert_rows(connection, rows)
+        except BaseException:
+            connection.close()
+            temporary_file_path.unlink(missing_ok=True)
+            raise
+
+        connection.close()
+        temporary_file_path.replace(index_file_path)
+
+    @staticmethod
+    def __insert_rows(
+        connection: sqlite3.Connection, rows: list[tuple[str, int, int]]
+    ) -> None:
+        # The first `<doc>` of a title is the one that a full parse emits first.
+        connection.executemany(
+            "INSERT OR IGNORE INTO doc_range (title, offset, length) VALUES (?, ?, ?)",
+            rows,
+        )
+        connection.commit()
+
+    def close(self) -> None:
+        """Close the index."""
+
+        self.__connection.close()
+
+    @staticmethod
+    def exists(dump_file_path: Path) -> bool:
+        """Return whether a cached abstracts dump has a title index."""
+
+        return title_index_path(dump_file_path).is_file()
+
+    def get_doc_ranges(self, titles: Collection[str]) -> list[DocRange]:
+        """
+        Return the byte ranges of the `<doc>` elements of the articles with the given normalized titles, in dump order.
+
+        Titles that are not in the dump are left out.
+        """
+
+        ordered_titles = list(titles)
+        doc_ranges: list[DocRange] = []
+        for start in range(0, len(ordered_titles), MAX_TITLES_PER_LOOKUP):
+            title_batch = ordered_titles[start : start + MAX_TITLES_PER_LOOKUP]
+            doc_ranges.extend(
+                DocRange(*row)
+                for row in self.__connection.execute(
+                    f"SELECT offset, length FROM doc_range WHERE title IN ({', '.join('?' * len(title_batch))})",  # noqa: S608
+                    title_batch,
+                )
+            )
+        return sorted(doc_ranges)
+
+
+class _DumpReader(ABC):
+    """Reads the bytes of `<doc>` elements from a cached abstracts dump."""
+
+    def __enter__(self) -> "_DumpReader":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @abstractmethod
+    def __call__(self, doc_range: DocRange) -> bytes:
+        """Return the bytes of the `<doc>` element at a byte range of the uncompressed dump."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the dump."""
+
+
+class _MappedDumpReader(_DumpReader):
+    def __init__(self, dump_file_path: Path):
+        with dump_file_path.open("rb") as dump_file:
+            self.__dump_map = mmap.mmap(dump_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __call__(self, doc_range: DocRange) -> bytes:
+        return self.__dump_map[doc_range.offset : doc_range.offset + doc_range.length]
+
+    def close(self) -> None:
+        self.__dump_map.close()
+
+
+class _GzipDumpReader(_DumpReader):
+    def __init__(self, dump_file_path: Path):
+        self.__dump_file_path = dump_file_path
+        self.__seek_points = read_seek_index(dump_file_path) or (
+            SeekPoint(compressed_offset=0, uncompressed_offset=0),
+        )
+        self.__seek_point: SeekPoint | None = None
+        self.__uncompressed_file: BinaryIO | None = None
+
+    def __call__(self, doc_range: DocRange) -> bytes:
+        seek_point = max(
+            (
+                seek_point
+                for seek_point in self.__seek_points
+                if seek_point.uncompressed_offset <= doc_range.offset
+            ),
+            default=self.__seek_points[0],
+        )
+        position = doc_range.offset - seek_point.uncompressed_offset
+        # Keep decompressing the current member forward, rather than from its start again.
+        if (
+            self.__uncompressed_file is None
+            or seek_point != self.__seek_point
+            or self.__uncompressed_file.tell() > position
+        ):
+            self.close()
+            self.__uncompressed_file = open_at_seek_point(
+                self.__dump_file_path, seek_point
+            )
+            self.__seek_point = seek_point
+        self.__uncompressed_file.seek(position)
+        return self.__uncompressed_file.read(doc_range.length)
+
+    def close(self) -> None:
+        if self.__uncompressed_file is not None:
+            self.__uncompressed_file.close()
+            self.__uncompressed_file = None
+
+
+def parse_doc_ranges(
+    dump_file_path: Path,
+    doc_ranges: Iterable[DocRange],
+    *,
+    parse_sublinks: bool = True,
+) -> Iterator[wikipedia.CompactRecord]:
+    """
+    Parse the `<doc>` elements at the given byte ranges of a cached abstracts dump, in the given order, and yield their
+    records.
+
+    A decompressed dump is memory-mapped and each range is sliced out of it. A gzip dump is decompressed from the last
+    seek point before each range, or from its start if it has no seek index, skipping the bytes between ranges without
+    parsing them.
+    """
+
+    dump_reader: _DumpReader = (
+        _GzipDumpReader(dump_file_path)
+        if dump_file_path.suffix == ".gz"
+        else _MappedDumpReader(dump_file_path)
+    )
+    with dump_reader:
+        for doc_range in doc_ranges:
+            yield from WikipediaAbstractsParser(parse_sublinks=parse_sublinks).parse(
+                BytesIO(dump_reader(doc_range) + FEED_END_TAG),
+                doc_offset=doc_range.offset,
+            )
@@ -0,0 +1,235 @@
+import json
+import sqlite3
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from time import time
+from typing import Any
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.models.types import EnrichmentType
+
+# Number of cache updates made between two commits.
+COMMIT_INTERVAL = 1000
+
+# Maximum number of titles looked up in one query.
+MAX_TITLES_PER_LOOKUP = 500
+
+# Fraction of `max_size_bytes` that eviction reduces the cache to, so that it does not run on every store.
+EVICTION_TARGET_RATIO = 0.9
+
+
+def record_enrichments(
+    record: wikipedia.CompactRecord, enrichments: Iterable[EnrichmentType]
+) -> dict[str, Any]:
+    """Return the enrichments of a record as a JSON-serializable dict, keyed by enrichment type."""
+
+    record_enrichments: dict[str, Any] = {}
+    for enrichment in enrichments:
+        if enrichment == EnrichmentType.IMAGE_URL:
+            record_enrichments[enrichment.value] = record.image_url
+        elif enrichment == EnrichmentType.CATEGORY:
+            record_enrichments[enrichment.value] = record.categories
+        elif enrichment == EnrichmentType.EXTERNAL_LINK:
+            record_enrichments[enrichment.value] = record.external_links
+    return record_enrichments
+
+
+def set_record_enrichments(
+    record: wikipedia.CompactRecord, record_enrichments: dict[str, Any]
+) -> None:
+    """Set the enrichments of a record from a dict returned by `record_enrichments`."""
+
+    if EnrichmentType.IMAGE_URL.value in record_enrichments:
+        record.image_url = record_enrichments[EnrichmentType.IMAGE_URL.value]
+    if EnrichmentType.CATEGORY.value in record_enrichments:
+        categories = record_enrichments[EnrichmentType.CATEGORY.value]
+        record.categories = (
+            tuple(wikipedia.CompactCategory(*category) for category in categories)
+            if categories is not None
+            else None
+        )
+    if EnrichmentType.EXTERNAL_LINK.value in record_enrichments:
+        external_links = record_enrichments[EnrichmentType.EXTERNAL_LINK.value]
+        record.external_links = (
+            tuple(
+                wikipedia.CompactExternalLink(*external_link)
+                for external_link in external_links
+            )
+            if external_links is not None
+            else None
+        )
+
+
+class EnrichmentCache:
+    """
+    A persistent cache of the enrichments of Wikipedia articles, keyed by title.
+
+    Entries expire `max_age_s` seconds after they are stored. Once the stored enrichments take up more than
+    `max_size_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_file_path: Path,
+        *,
+        namespace: str,
+        max_age_s: float | None = None,
+        max_size_bytes: int | None = None,
+    ):
+        """
+        :param cache_file_path: path to the SQLite database of the cache, created if it does not exist
+        :param namespace: namespace of the entries, such as the backend the enrichments were retrieved from
+        :param max_age_s: seconds after which an entry expires, or None for entries to never expire
+        :param max_size_bytes: size of the stored enrichments above which entries are evicted, or None for no limit
+        """
+        cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.__connection = sqlite3.connect(cache_file_path)
+        # The total size of the entries is kept in the database, by triggers, so that every connection to the cache
+        # evicts entries by the size of all of them, stored through any connection.
+        self.__connection.executescript(
+            """
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS enrichment (
+                namespace TEXT NOT NULL,
+                title TEXT NOT NULL,
+                enrichments TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, title)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS enrichment_accessed_at ON enrichment (accessed_at);
+            CREATE TABLE IF NOT EXISTS enrichment_size (size INTEGER NOT NULL);
+            INSERT INTO enrichment_size (size)
+            SELECT COALESCE(SUM(size), 0) FROM enrichment WHERE NOT EXISTS (SELECT * FROM enrichment_size);
+            CREATE TRIGGER IF NOT EXISTS enrichment_inserted AFTER INSERT ON enrichment BEGIN
+                UPDATE enrichment_size SET size = size + NEW.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS enrichment_updated AFTER UPDATE OF size ON enrichment BEGIN
+                UPDATE enrichment_size SET size = size - OLD.size + NEW.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS enrichment_deleted AFTER DELETE ON enrichment BEGIN
+                UPDATE enrichment_size SET size = size - OLD.size;
+            END;
+            COMMIT;
+            """
+        )
+        self.__namespace = namespace
+        self.__max_age_s = max_age_s
+        self.__max_size_bytes = max_size_bytes
+        if max_age_s is not None:
+            self.__connection.execute(
+                "DELETE FROM enrichment WHERE stored_at < ?", (time() - max_age_s,)
+            )
+            self.__connection.commit()
+        self.__uncommitted_update_count = 0
+
+    def __enter__(self) -> "EnrichmentCache":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit the updates made to the cache and close it."""
+
+        self.__connection.commit()
+        self.__connection.close()
+
+    def commit(self) -> None:
+        """Commit the updates made to the cache, so that they stop locking out the other connections to it."""
+
+        self.__connection.commit()
+        self.__uncommitted_update_count = 0
+
+    def __count_updates(self, update_count: int) -> None:
+        self.__uncommitted_update_count += update_count
+        if self.__uncommitted_update_count >= COMMIT_INTERVAL:
+            self.commit()
+
+    def __evict(self) -> None:
+        """Evict the least recently used entries until the cache is back under its target size."""
+
+        assert self.__max_size_bytes is not None
+        target_size_bytes = self.__max_size_bytes * EVICTION_TARGET_RATIO
+        size_bytes = self.__get_size_bytes()
+        evicted_keys = []
+        for namespace, title, size in self.__connection.execute(
+            "SELECT namespace, title, size FROM enrichment ORDER BY accessed_at"
+        ):
+            if size_bytes <= target_size_bytes:
+                break
+            evicted_keys.append((namespace, title))
+            size_bytes -= size
+
+        self.__connection.executemany(
+            "DELETE FROM enrichment WHERE namespace = ? AND title = ?", evicted_keys
+        )
+        self.__count_updates(len(evicted_keys))
+
+    def __get_size_bytes(self) -> int:
+        """Return the total size of the entries, stored through any connection to the cache."""
+
+        size_bytes: int = self.__connection.execute(
+            "SELECT size FROM enrichment_size"
+        ).fetchone()[0]
+        return size_bytes
+
+    def get(self, titles: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """
+        Look up the enrichments of articles, and mark the entries found as recently used.
+
+        :return the enrichments of each title that has an unexpired entry, as passed to `put`
+        """
+
+        now = time()
+        min_stored_at = now - self.__max_age_s if self.__max_age_s is not None else 0
+        cached_enrichments: dict[str, dict[str, Any]] = {}
+        for lookup_start in range(0, len(titles), MAX_TITLES_PER_LOOKUP):
+            lookup_titles = titles[lookup_start : lookup_start + MAX_TITLES_PER_LOOKUP]
+            cached_enrichments.update(
+                (title, json.loads(enrichments))
+                for title, enrichments in self.__connection.execute(
+                    f"""
+                    SELECT title, enrichments FROM enrichment
+                    WHERE namespace = ? AND stored_at >= ? AND title IN ({", ".join("?" * len(lookup_titles))})
+                    """,  # noqa: S608
+                    (self.__namespace, min_stored_at, *lookup_titles),
+                )
+            )
+
+        self.__connection.executemany(
+            "UPDATE enrichment SET accessed_at = ? WHERE namespace = ? AND title = ?",
+            ((now, self.__namespace, title) for title in cached_enrichments),
+        )
+        self.__count_updates(len(cached_enrichments))
+        return cached_enrichments
+
+    def put(self, title: str, enrichments: dict[str, Any]) -> None:
+        """Store the enrichments of an article, evicting the least recently used entries if the cache is full."""
+
+        enrichments_json = json.dumps(enrichments, separators=(",", ":"))
+        size = len(enrichments_json.encode())
+        now = time()
+        # An upsert rather than a replace, which would delete the previous entry without firing the trigger that
+        # keeps the size.
+        self.__connection.execute(
+            """
+            INSERT INTO enrichment (namespace, title, enrichments, size, stored_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (namespace, title) DO UPDATE SET
+                enrichments = excluded.enrichments,
+                size = excluded.size,
+                stored_at = excluded.stored_at,
+                accessed_at = excluded.accessed_at
+            """,
+            (self.__namespace, title, enrichments_json, size, now, now),
+        )
+
+        # The size is read in the write transaction of the update, so no other connection changes it meanwhile.
+        if (
+            self.__max_size_bytes is not None
+            and self.__get_size_bytes() > self.__max_size_bytes
+        ):
+            self.__evict()
+        self.__count_updates(1)
@@ -3,31 +3,73 @@ import json
 import logging
 import mimetypes
 import os
+import shutil
+from email.message import Message
+from http import HTTPStatus
+from http.client import HTTPException, IncompleteRead
 from pathlib import Path
 from ssl import SSLContext
-from time import sleep
+from tempfile import NamedTemporaryFile
+from time import sleep, time
 from typing import Any
-from urllib.request import urlopen
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
 from pathvalidate import sanitize_filename
 
+from tap_wikipedia.models.types import CacheStorageMode
+from tap_wikipedia.utils.dump_title_index import title_index_path
+from tap_wikipedia.utils.gzip_seek_index import (
+    copy_seekable_gzip,
+    read_seek_index,
+    seek_index_path,
+    write_seek_index,
+)
+from tap_wikipedia.utils.pipeline_metrics import PipelineMetrics
+
+# Number of bytes read from the network or a compressed file at a time.
+CHUNK_SIZE = 1024 * 1024
+
+# Name of the file holding the compressed bytes of an unfinished download.
+DOWNLOAD_FILE_NAME = "download.part"
+
+# Name of the file holding the headers of an unfinished download, which replace the headers of the cached file once
+# the download is stored.
+DOWNLOAD_HEADERS_FILE_NAME = "download-headers.json"
+
 
 class FileCache:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         *,
-        # atomic_download: bool = False,
         cache_dir_path: Path,
+        cached_file_stem: str = "abstracts",
+        storage_mode: CacheStorageMode = CacheStorageMode.DECOMPRESSED,
+        max_age_s: float | None = None,
+        max_download_attempts: int = 3,
         sleep_s_after_download: float | None = None,
         ssl_context: SSLContext | None = None,
+        metrics: PipelineMetrics | None = None,
     ):
         """
         :param cache_dir_path: directory where files from URLs can be cached
+        :param cached_file_stem: name of cached files, before their extension
+        :param storage_mode: whether downloaded files are stored decompressed, compressed, or compressed with a seek index
+        :param max_age_s: seconds after which a cached file is revalidated with a conditional request, or None to never revalidate
+        :param max_download_attempts: number of times an interrupted download is resumed before giving up
+        :param metrics: metrics that the hits, revalidations and misses of `get_file` are counted in
         """
-        # self.__atomic_download = atomic_download
         self.__cache_dir_path = cache_dir_path
         self.__cache_dir_path.mkdir(exist_ok=True, parents=True)
+        self.__cached_file_stem = cached_file_stem
+        self.__compressed = storage_mode != CacheStorageMode.DECOMPRESSED
+        self.__build_seek_index = (
+            storage_mode == CacheStorageMode.COMPRESSED_WITH_SEEK_INDEX
+        )
         self.__logger = logging.getLogger(self.__class__.__name__)
+        self.__max_age_s = max_age_s
+        self.__max_download_attempts = max_download_attempts
+        self.__metrics = metrics
         self.__sleep_s_after_download = sleep_s_after_download
         self.__ssl_context = ssl_context
 
@@ -67,9 +109,300 @@ class FileCache:
 
         raise ValueError(f"unable to guess file extension for {file_url}")
 
+    def __cached_file_path(
+        self,
+        *,
+        file_url: str,
+        file_extension: str | None,
+        headers_dict: dict[str, Any],
+    ) -> Path:
+        file_cache_dir_path = self.__file_cache_dir_path(file_url=file_url)
+        if file_extension is not None:
+            return file_cache_dir_path / (
+                self.__cached_file_stem
+                + ("." if not file_extension.startswith(".") else "")
+                + file_extension
+            )
+
+        headers_dict_lower = {key.lower(): value for key, value in headers_dict.items()}
+        content_type_header_value = headers_dict_lower.get("content-type")
+        if content_type_header_value:
+            file_mime_type = content_type_header_value.split(";", 1)[0]
+        else:
+            file_mime_type = None
+        cached_file_extension = self.__cached_file_extension(
+            file_mime_type=file_mime_type, file_url=file_url
+        )
+        return file_cache_dir_path / (self.__cached_file_stem + cached_file_extension)
+
+    def __compress_seekable_file(
+        self, *, compressed_file_path: Path, file_path: Path
+    ) -> None:
+        """Recompress a gzip file into a seekable gzip file, then atomically move it and its seek index to `file_path`."""
+
+        with NamedTemporaryFile(
+            dir=file_path.parent, prefix="compressing-", delete=False
+        ) as temporary_file:
+            pass
+
+        try:
+            seek_points = copy_seekable_gzip(
+                compressed_file_path, Path(temporary_file.name)
+            )
+        except BaseException:
+            Path(temporary_file.name).unlink()
+            raise
+
+        Path(temporary_file.name).replace(file_path)
+        write_seek_index(file_path, seek_points)
+
+    def __conditional_request_headers(
+        self, headers_json_file_path: Path
+    ) -> dict[str, str]:
+        """Return the headers of a request that only downloads a file again if it changed since it was cached."""
+
+        headers_dict = self.__read_headers(headers_json_file_path) or {}
+        conditional_request_headers = {}
+        if headers_dict.get("etag"):
+            conditional_request_headers["If-None-Match"] = headers_dict["etag"]
+        if headers_dict.get("last-modified"):
+            conditional_request_headers["If-Modified-Since"] = headers_dict[
+                "last-modified"
+            ]
+        return conditional_request_headers
+
+    def __count_lookup(self, result: str) -> None:
+        if self.__metrics is not None:
+            self.__metrics.count_cache_lookup("file", result)
+
+    def __decompress_file(self, *, compressed_file_path: Path, file_path: Path) -> None:
+        """Decompress a gzip file in chunks to a temporary file, then atomically move it to `file_path`."""
+
+        with NamedTemporaryFile(
+            dir=file_path.parent, prefix="decompressing-", delete=False
+        ) as temporary_file:
+            try:
+                with gzip.open(compressed_file_path, "rb") as compressed_file:
+                    shutil.copyfileobj(compressed_file, temporary_file, CHUNK_SIZE)
+            except BaseException:
+                Path(temporary_file.name).unlink()
+                raise
+
+        Path(temporary_file.name).replace(file_path)
+
+    def __download_file(
+        self,
+        *,
+        file_url: str,
+        download_file_path: Path,
+        download_headers_json_file_path: Path,
+        conditional_request_headers: dict[str, str],
+    ) -> dict[str, Any]:
+        """
+        Download a file to `download_file_path`, resuming the download if the connection drops.
+
+        The headers of the file are written to `download_headers_json_file_path` when the download starts.
+
+        :raise HTTPError with status 304 if the conditional request headers show the cached file is up to date
+
+        :return the headers of the complete file
+        """
+
+        for download_attempt in range(1, self.__max_download_attempts):
+            try:
+                return self.__resume_download(
+                    file_url=file_url,
+                    download_file_path=download_file_path,
+                    download_headers_json_file_path=download_headers_json_file_path,
+                    conditional_request_headers=conditional_request_headers,
+                )
+            except HTTPError:
+                raise
+            except (HTTPException, OSError):
+                self.__logger.warning(
+                    "download attempt %d of %s interrupted, resuming",
+                    download_attempt,
+                    file_url,
+                    exc_info=True,
+                )
+
+        return self.__resume_download(
+            file_url=file_url,
+            download_file_path=download_file_path,
+            download_headers_json_file_path=download_headers_json_file_path,
+            conditional_request_headers=conditional_request_headers,
+        )
+
+    def __resume_download(
+        self,
+        *,
+        file_url: str,
+        download_file_path: Path,
+        download_headers_json_file_path: Path,
+        conditional_request_headers: dict[str, str],
+    ) -> dict[str, Any]:
+        """
+        Download a file to `download_file_path` in chunks.
+
+        A partial download left by an earlier attempt is resumed with an HTTP Range request,
+        provided the server confirms through `If-Range` that the file has not changed since.
+        Otherwise the conditional request headers are sent, if any.
+
+        :return the headers of the complete file
+        """
+
+        request_headers = conditional_request_headers
+        headers_dict = self.__read_headers(download_headers_json_file_path)
+        downloaded_size = (
+            download_file_path.stat().st_size if download_file_path.is_file() else 0
+        )
+        if downloaded_size > 0 and headers_dict is not None:
+            validator = headers_dict.get("etag") or headers_dict.get("last-modified")
+            if validator:
+                request_headers = {
+                    "Range": f"bytes={downloaded_size}-",
+                    "If-Range": validator,
+                }
+
+        self.__logger.debug("downloading %s", file_url)
+        try:
+            open_file_url = urlopen(  # noqa: S310
+                Request(str(file_url), headers=request_headers),  # noqa: S310
+                context=self.__ssl_context,
+            )
+        except HTTPError as http_error:
+            if (
+                "Range" not in request_headers
+                or http_error.code != HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            ):
+                raise
+            self.__logger.debug(
+                "unable to resume download of %s, starting over", file_url
+            )
+            download_file_path.unlink()
+            return self.__resume_download(
+                file_url=file_url,
+                download_file_path=download_file_path,
+                download_headers_json_file_path=download_headers_json_file_path,
+                conditional_request_headers=conditional_request_headers,
+            )
+
+        with open_file_url:
+            if open_file_url.status == HTTPStatus.PARTIAL_CONTENT:
+                self.__logger.debug(
+                    "resuming download of %s at byte %d", file_url, downloaded_size
+                )
+                download_file_mode = "ab"
+            else:
+                headers_dict = dict(open_file_url.headers.items())
+                with Path.open(
+                    download_headers_json_file_path, "w+", encoding="utf-8"
+                ) as headers_json_file:
+                    json.dump(headers_dict, headers_json_file)
+                    self.__logger.debug(
+                        "wrote %s headers to %s",
+                        file_url,
+                        download_headers_json_file_path,
+                    )
+                download_file_mode = "wb"
+
+            with Path.open(download_file_path, download_file_mode) as download_file:
+                shutil.copyfileobj(open_file_url, download_file, CHUNK_SIZE)
+
+            # A dropped connection shows up as a short read rather than an error.
+            expected_file_size = self.__expected_file_size(open_file_url.headers)
+            downloaded_file_size = download_file_path.stat().st_size
+            if (
+                expected_file_size is not None
+                and downloaded_file_size < expected_file_size
+            ):
+                raise IncompleteRead(b"", expected_file_size - downloaded_file_size)
+
+        assert headers_dict is not None
+        return headers_dict
+
+    def __expected_file_size(self, response_headers: Message) -> int | None:
+        """Return the size of the complete file according to the response headers, if known."""
+
+        content_range = response_headers.get("Content-Range")
+        if content_range is not None:
+            _, _, total_size = content_range.rpartition("/")
+            return int(total_size) if total_size.isdigit() else None
+
+        content_length = response_headers.get("Content-Length")
+        if content_length is not None and content_length.isdigit():
+            return int(content_length)
+
+        return None
+
+    def __get_cached_file(self, *, file_url: str) -> Path | None:
+        """Return the path of the file cached for `file_url` in the current storage mode, if any."""
+
+        file_cache_dir_path = self.__file_cache_dir_path(file_url=file_url)
+        if not file_cache_dir_path.is_dir():
+            return None
+
+        for file_name in os.listdir(file_cache_dir_path):
+            cached_file_path = file_cache_dir_path / file_name
+            if not cached_file_path.is_file():
+                continue
+            if self.__is_cached_file_name(file_name, compressed=self.__compressed):
+                # Cache hit
+                self.__logger.debug(
+                    "cached file %s exists for URL %s and force_download not specified, using cached data",
+                    cached_file_path,
+                    file_url,
+                )
+                if (
+                    self.__build_seek_index
+                    and read_seek_index(cached_file_path) is None
+                ):
+                    self.__logger.debug(
+                        "building seek index for cached file %s", cached_file_path
+                    )
+                    self.__compress_seekable_file(
+                        compressed_file_path=cached_file_path,
+                        file_path=cached_file_path,
+                    )
+                return cached_file_path
+
+        return None
+
+    def __is_stale(self, headers_json_file_path: Path) -> bool:
+        """Return whether a cached file was downloaded or revalidated more than `max_age_s` seconds ago."""
+
+        if self.__max_age_s is None:
+            return False
+        if not headers_json_file_path.is_file():
+            return True
+        return time() - headers_json_file_path.stat().st_mtime > self.__max_age_s
+
+    def __is_cached_file_name(self, file_name: str, *, compressed: bool) -> bool:
+        """Return whether `file_name` is the name of a cached file stored in the given storage mode."""
+
+        file_path = Path(file_name)
+        if compressed:
+            return (
+                file_path.suffix == ".gz"
+                and Path(file_path.stem).stem == self.__cached_file_stem
+            )
+        return file_path.suffix != ".gz" and file_path.stem == self.__cached_file_stem
+
     def __file_cache_dir_path(self, *, file_url: str) -> Path:
         return self.__cache_dir_path / sanitize_filename(str(file_url))
 
+    def __read_headers(self, headers_json_file_path: Path) -> dict[str, Any] | None:
+        """Return the stored headers of a cached file, with lower-case keys."""
+
+        if not headers_json_file_path.is_file():
+            return None
+
+        with Path.open(headers_json_file_path, encoding="utf-8") as headers_json_file:
+            return {
+                key.lower(): value
+                for key, value in json.load(headers_json_file).items()
+            }
+
     def get_file(
         self,
         file_url: str,
@@ -91,68 +424,65 @@ class FileCache:
 
         file_cache_dir_path = self.__file_cache_dir_path(file_url=file_url)
 
-        if not force_download and file_cache_dir_path.is_dir():
-            for file_name in os.listdir(file_cache_dir_path):
-                cached_file_path = file_cache_dir_path / file_name
-                if not cached_file_path.is_file():
-                    continue
-                file_base_name = Path(file_name).stem
-                if file_base_name == "abstracts":
-                    # Cache hit
-                    self.__logger.debug(
-                        "cached file %s exists for URL %s and force_download not specified, using cached data",
-                        cached_file_path,
-                        file_url,
-                    )
+        headers_json_file_path = file_cache_dir_path / "headers.json"
+        stale_cached_file_path = None
+        conditional_request_headers: dict[str, str] = {}
+        if not force_download:
+            cached_file_path = self.__get_cached_file(file_url=file_url)
+            if cached_file_path is not None:
+                if not self.__is_stale(headers_json_file_path):
+                    self.__count_lookup("hit")
                     return cached_file_path
-
-        def get_cached_file_path(headers_dict: dict[str, Any]) -> Path:
-            if file_extension is not None:
-                return file_cache_dir_path / (
-                    "abstracts"
-                    + ("." if not file_extension.startswith(".") else "")
-                    + file_extension
+                stale_cached_file_path = cached_file_path
+                conditional_request_headers = self.__conditional_request_headers(
+                    headers_json_file_path
                 )
 
-            headers_dict_lower = {
-                key.lower(): value for key, value in headers_dict.items()
-            }
-            content_type_header_value = headers_dict_lower.get("content-type")
-            if content_type_header_value:
-                file_mime_type = content_type_header_value.split(";", 1)[0]
-            else:
-                file_mime_type = None
-            cached_file_extension = self.__cached_file_extension(
-                file_mime_type=file_mime_type, file_url=file_url
-            )
-            return file_cache_dir_path / ("abstracts" + cached_file_extension)
-
         # Force download or cache miss
-        self.__logger.debug("downloading %s", file_url)
-        with urlopen(  # noqa: S310
-            str(file_url), context=self.__ssl_context
-        ) as open_file_url:
-            open_file_headers_dict = dict(open_file_url.headers.items())
+        download_file_path = file_cache_dir_path / DOWNLOAD_FILE_NAME
+        download_headers_json_file_path = (
+            file_cache_dir_path / DOWNLOAD_HEADERS_FILE_NAME
+        )
+        file_cache_dir_path.mkdir(exist_ok=True, parents=True)
+        if force_download:
+            download_file_path.unlink(missing_ok=True)
+            download_headers_json_file_path.unlink(missing_ok=True)
 
-            cached_file_path = get_cached_file_path(open_file_headers_dict)
-            cached_file_path.unlink(missing_ok=True)
-            file_cache_dir_path.mkdir(exist_ok=True, parents=True)
-
-            with gzip.GzipFile(fileobj=open_file_url) as uncompressed_file:
-                file_content = uncompressed_file.read()
-
-            with Path.open(cached_file_path, "wb") as cached_file:
-                cached_file.write(file_content)
-                self.__logger.debug("downloaded %s to %s", file_url, cached_file_path)
-
-        headers_json_file_path = file_cache_dir_path / "headers.json"
-        with Path.open(
-            headers_json_file_path, "w+", encoding="utf-8"
-        ) as headers_json_file:
-            json.dump(open_file_headers_dict, headers_json_file)
+        try:
+            open_file_headers_dict = self.__download_file(
+                file_url=file_url,
+                download_file_path=download_file_path,
+                download_headers_json_file_path=download_headers_json_file_path,
+                conditional_request_headers=conditional_request_headers,
+            )
+        except HTTPError as http_error:
+            if (
+                stale_cached_file_path is None
+                or http_error.code != HTTPStatus.NOT_MODIFIED
+            ):
+                raise
             self.__logger.debug(
-                "wrote %s headers to %s", file_url, headers_json_file_path
+                "cached file %s for URL %s has not been modified, using cached data",
+                stale_cached_file_path,
+                file_url,
             )
+            # Restart the max age countdown.
+            headers_json_file_path.touch()
+            self.__count_lookup("revalidated")
+            return stale_cached_file_path
+
+        self.__count_lookup("miss")
+        cached_file_path = self.__store_downloaded_file(
+            download_file_path=download_file_path,
+            cached_file_path=self.__cached_file_path(
+                file_url=file_url,
+                file_extension=file_extension,
+                headers_dict=open_file_headers_dict,
+            ),
+        )
+        # The headers describe the cached file only once the download has replaced it.
+        download_headers_json_file_path.replace(headers_json_file_path)
+        self.__logger.debug("downloaded %s to %s", file_url, cached_file_path)
 
         if self.__sleep_s_after_download is not None:
             self.__logger.debug(
@@ -164,6 +494,60 @@ class FileCache:
 
         return cached_file_path
 
+    def get_file_headers(self, file_url: str) -> dict[str, Any] | None:
+        """
+        Get the response headers stored when the file was downloaded.
+        :return headers with lower-case keys, or None if the file has not been downloaded
+        """
+
+        return self.__read_headers(
+            self.__file_cache_dir_path(file_url=file_url) / "headers.json"
+        )
+
+    def __store_downloaded_file(
+        self, *, download_file_path: Path, cached_file_path: Path
+    ) -> Path:
+        """
+        Move a complete download into the cache in the current storage mode.
+
+        :return path to the file in the cache directory
+        """
+
+        # Indexes of the previous version of the file no longer match it.
+        if not self.__compressed:
+            title_index_path(cached_file_path).unlink(missing_ok=True)
+            self.__decompress_file(
+                compressed_file_path=download_file_path, file_path=cached_file_path
+            )
+            download_file_path.unlink()
+        else:
+            cached_file_path = cached_file_path.with_name(cached_file_path.name + ".gz")
+            seek_index_path(cached_file_path).unlink(missing_ok=True)
+            title_index_path(cached_file_path).unlink(missing_ok=True)
+            if self.__build_seek_index:
+                self.__compress_seekable_file(
+                    compressed_file_path=download_file_path, file_path=cached_file_path
+                )
+                download_file_path.unlink()
+            else:
+                download_file_path.replace(cached_file_path)
+
+        # Remove older versions of the file and files cached in the other storage mode.
+        for file_name in os.listdir(cached_file_path.parent):
+            if file_name != cached_file_path.name and any(
+                self.__is_cached_file_name(file_name, compressed=compressed)
+                for compressed in (False, True)
+            ):
+                (cached_file_path.parent / file_name).unlink()
+                seek_index_path(cached_file_path.parent / file_name).unlink(
+                    missing_ok=True
+                )
+                title_index_path(cached_file_path.parent / file_name).unlink(
+                    missing_ok=True
+                )
+
+        return cached_file_path
+
     def put_file(
         self,
         *,
@@ -0,0 +1,154 @@
+import gzip
+import json
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+# Approximate number of uncompressed bytes between two seek points.
+DEFAULT_SEEK_POINT_SPACING = 16 * 1024 * 1024
+
+# Compression level of the gzip members written to a seekable gzip file.
+COMPRESS_LEVEL = 6
+
+# Every gzip member after the first one starts at this tag.
+DOC_START_TAG = b"<doc>"
+
+
+class SeekPoint(NamedTuple):
+    """A point in a seekable gzip file where decompression can start."""
+
+    compressed_offset: int
+    uncompressed_offset: int
+
+
+def seek_index_path(gzip_file_path: Path) -> Path:
+    """Return the path of the seek index stored beside a gzip file."""
+
+    return gzip_file_path.with_name(gzip_file_path.name + ".seek-index.json")
+
+
+def read_seek_index(gzip_file_path: Path) -> tuple[SeekPoint, ...] | None:
+    """Return the seek points of a seekable gzip file, or None if it has no seek index."""
+
+    index_path = seek_index_path(gzip_file_path)
+    if not index_path.is_file():
+        return None
+
+    with index_path.open(encoding="utf-8") as index_file:
+        return tuple(SeekPoint(*seek_point) for seek_point in json.load(index_file))
+
+
+def write_seek_index(gzip_file_path: Path, seek_points: tuple[SeekPoint, ...]) -> None:
+    """Store the seek points of a seekable gzip file beside it."""
+
+    with seek_index_path(gzip_file_path).open("w", encoding="utf-8") as index_file:
+        json.dump(seek_points, index_file)
+
+
+class _CompressedFileOwningGzipFile(gzip.GzipFile):
+    """A gzip file that closes the compressed file it reads when it is closed, which `GzipFile` leaves open."""
+
+    def __init__(self, compressed_file: BinaryIO):
+        super().__init__(fileobj=compressed_file)
+        self.__compressed_file = compressed_file
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self.__compressed_file.close()
+
+
+def open_at_seek_point(gzip_file_path: Path, seek_point: SeekPoint) -> BinaryIO:
+    """
+    Open a seekable gzip file and return a stream of its uncompressed bytes starting at `seek_point`.
+
+    Closing the stream closes the gzip file.
+    """
+
+    compressed_file = gzip_file_path.open("rb")
+    try:
+        compressed_file.seek(seek_point.compressed_offset)
+        return _CompressedFileOwningGzipFile(compressed_file)  # type: ignore[return-value]
+    except BaseException:
+        compressed_file.close()
+        raise
+
+
+def open_at_uncompressed_offset(
+    gzip_file_path: Path, uncompressed_offset: int
+) -> BinaryIO:
+    """
+    Open a gzip file and return a stream of its uncompressed bytes starting at `uncompressed_offset`.
+
+    If the file has a seek index, decompression starts at the last seek point before the offset instead of at the
+    start of the file.
+    """
+
+    seek_point = max(
+        (
+            seek_point
+            for seek_point in read_seek_index(gzip_file_path) or ()
+            if seek_point.uncompressed_offset <= uncompressed_offset
+        ),
+        default=SeekPoint(compressed_offset=0, uncompressed_offset=0),
+    )
+    uncompressed_file = open_at_seek_point(gzip_file_path, seek_point)
+    uncompressed_file.seek(uncompressed_offset - seek_point.uncompressed_offset)
+    return uncompressed_file
+
+
+def write_seekable_gzip(
+    uncompressed_file: BinaryIO,
+    gzip_file_path: Path,
+    *,
+    seek_point_spacing: int = DEFAULT_SEEK_POINT_SPACING,
+) -> tuple[SeekPoint, ...]:
+    """
+    Compress an abstracts dump into a gzip file made of independent members and return its seek points.
+
+    Python's zlib cannot restore the inflate window of a single gzip member at an arbitrary offset the way zran does,
+    so the dump is instead split into gzip members of roughly `seek_point_spacing` uncompressed bytes,
+    each starting at a `<doc>` tag. Every member start is a seek point. The result is still a valid gzip file.
+    """
+
+    seek_points: list[SeekPoint] = []
+    member_buffer = bytearray()
+    uncompressed_offset = 0
+
+    with gzip_file_path.open("wb") as gzip_file:
+
+        def write_member(member: bytes) -> None:
+            nonlocal uncompressed_offset
+            seek_points.append(SeekPoint(gzip_file.tell(), uncompressed_offset))
+            gzip_file.write(gzip.compress(member, compresslevel=COMPRESS_LEVEL))
+            uncompressed_offset += len(member)
+
+        while chunk := uncompressed_file.read(seek_point_spacing):
+            member_buffer += chunk
+            while len(member_buffer) > seek_point_spacing:
+                member_end = member_buffer.find(DOC_START_TAG, seek_point_spacing)
+                if member_end == -1:
+                    break
+                write_member(bytes(member_buffer[:member_end]))
+                del member_buffer[:member_end]
+
+        if member_buffer or not seek_points:
+            write_member(bytes(member_buffer))
+
+    return tuple(seek_points)
+
+
+def copy_seekable_gzip(
+    source_gzip_file_path: Path,
+    gzip_file_path: Path,
+    *,
+    seek_point_spacing: int = DEFAULT_SEEK_POINT_SPACING,
+) -> tuple[SeekPoint, ...]:
+    """Recompress a gzip file into a seekable gzip file and return its seek points."""
+
+    with gzip.open(source_gzip_file_path, "rb") as uncompressed_file:
+        return write_seekable_gzip(
+            uncompressed_file,  # type: ignore[arg-type]
+            gzip_file_path,
+            seek_point_spacing=seek_point_spacing,
+        )
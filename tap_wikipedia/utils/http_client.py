@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from threading import Condition, Lock
+from time import monotonic, perf_counter, sleep
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from requests import ConnectionError, Response, Timeout
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
+if TYPE_CHECKING:
+    from requests_cache import CachedSession
+
+    from tap_wikipedia.utils.pipeline_metrics import PipelineMetrics
+
+# Statuses of responses to requests that are retried.
+RETRYABLE_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+# Statuses of responses that show a host is overloaded, so that fewer requests are sent to it.
+THROTTLING_STATUSES = frozenset(
+    {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+)
+
+
+def _retry_after_s(response: Response) -> float | None:
+    """Return the number of seconds to wait before retrying a request, according to its `Retry-After` header."""
+
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    if retry_after.strip().isdigit():
+        return float(retry_after)
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(
+        (retry_at - datetime.now(tz=timezone.utc)).total_seconds(),  # noqa: UP017
+        0,
+    )
+
+
+class _HostLimiter:
+    """
+    Limits the requests sent to a host.
+
+    Requests are spaced out by a token bucket, refilled with `max_requests_per_second` tokens per second. The number
+    of requests in flight is limited by an additive-increase/multiplicative-decrease (AIMD) concurrency limit: every
+    `concurrency_limit` successful responses raise it by one, up to `max_concurrency`, and every throttling response
+    halves it. Throttling responses also pause the host until their `Retry-After` delay has passed.
+    """
+
+    def __init__(self, *, max_concurrency: int, max_requests_per_second: float | None):
+        self.__condition = Condition()
+        self.__max_concurrency = max_concurrency
+        self.__concurrency_limit = max_concurrency
+        self.__requests_in_flight = 0
+        self.__successes = 0
+        self.__max_requests_per_second = max_requests_per_second
+        # A burst of up to one second's worth of requests is allowed.
+        self.__tokens = max_requests_per_second or 0.0
+        self.__tokens_refilled_at = monotonic()
+        self.__paused_until = 0.0
+
+    def __enter__(self) -> None:
+        with self.__condition:
+            while self.__requests_in_flight >= self.__concurrency_limit:
+                self.__condition.wait()
+            self.__requests_in_flight += 1
+
+        while (wait_s := self.__reserve_request()) > 0:
+            sleep(wait_s)
+
+    def __exit__(self, *args: object) -> None:
+        with self.__condition:
+            self.__requests_in_flight -= 1
+            self.__condition.notify_all()
+
+    @property
+    def concurrency_limit(self) -> int:
+        return self.__concurrency_limit
+
+    def record_success(self) -> None:
+        with self.__condition:
+            self.__successes += 1
+            if self.__successes >= self.__concurrency_limit:
+                self.__successes = 0
+                if self.__concurrency_limit < self.__max_concurrency:
+                    self.__concurrency_limit += 1
+                    self.__condition.notify_all()
+
+    def record_throttling(self, pause_s: float) -> None:
+        with self.__condition:
+            self.__successes = 0
+            self.__concurrency_limit = max(self.__concurrency_limit // 2, 1)
+            self.__paused_until = max(self.__paused_until, monotonic() + pause_s)
+
+    def __reserve_request(self) -> float:
+        """
+        Take a token for a request if the host is not paused and one is available.
+
+        :return 0 if the request can be sent, otherwise the number of seconds to wait before trying again
+        """
+
+        with self.__condition:
+            now = monotonic()
+            if now < self.__paused_until:
+                return self.__paused_until - now
+
+            if self.__max_requests_per_second is None:
+                return 0
+
+            self.__tokens = min(
+                self.__tokens
+                + (now - self.__tokens_refilled_at) * self.__max_requests_per_second,
+                self.__max_requests_per_second,
+            )
+            self.__tokens_refilled_at = now
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return 0
+            return (1 - self.__tokens) / self.__max_requests_per_second
+
+
+class HttpClient:
+    """
+    A thread-safe wrapper around a `CachedSession` that limits the rate and concurrency of the requests sent to each
+    host, and retries requests that failed or were throttled.
+
+    Responses served from the cache bypass the limits.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        session: CachedSession,
+        max_concurrency: int = 1,
+        max_concurrency_per_host: int | None = None,
+        max_requests_per_second_per_host: float | None = None,
+        max_attempts: int = 4,
+        initial_backoff_s: float = 1.0,
+        max_backoff_s: float = 60.0,
+        metrics: PipelineMetrics | None = None,
+    ):
+        """
+        :param session: session that sends the requests
+        :param max_concurrency: maximum number of requests in flight, used to size the connection pools
+        :param max_concurrency_per_host: maximum number of requests in flight to a single host, or None for
+            `max_concurrency`; the limit is lowered while the host throttles requests
+        :param max_requests_per_second_per_host: maximum average rate of requests to a single host, or None for no limit
+        :param max_attempts: number of times a request is sent before its error is raised
+        :param initial_backoff_s: seconds before the first retry of a request whose response has no `Retry-After`
+            header, doubled for each following retry
+        :param max_backoff_s: maximum number of seconds before a retry, including `Retry-After` delays
+        :param metrics: metrics that the HTTP cache lookups, and the status and latency of the requests sent, are
+            counted in
+        """
+        self.__session = session
+        for url_prefix in ("http://", "https://"):
+            self.__session.mount(
+                url_prefix,
+                HTTPAdapter(pool_maxsize=max(max_concurrency, DEFAULT_POOLSIZE)),
+            )
+        self.__host_limiters: defaultdict[str, _HostLimiter] = defaultdict(
+            lambda: _HostLimiter(
+                max_concurrency=max_concurrency_per_host or max_concurrency,
+                max_requests_per_second=max_requests_per_second_per_host,
+            )
+        )
+        self.__host_limiters_lock = Lock()
+        self.__initial_backoff_s = initial_backoff_s
+        self.__logger = logging.getLogger(self.__class__.__name__)
+        self.__max_attempts = max_attempts
+        self.__max_backoff_s = max_backoff_s
+        self.__metrics = metrics
+
+    def __backoff_s(self, attempt: int) -> float:
+        return float(
+            min(self.__initial_backoff_s * 2 ** (attempt - 1), self.__max_backoff_s)
+        )
+
+    def concurrency_limit(self, url: str) -> int:
+        """Return the current limit on the number of requests in flight to the host of a URL."""
+
+        return self.__host_limiter(url).concurrency_limit
+
+    def __count_cache_lookup(self, result: str) -> None:
+        if self.__metrics is not None:
+            self.__metrics.count_cache_lookup("http", result)
+
+    def __count_request(self, url: str, status: str, *, sent_at: float) -> None:
+        if self.__metrics is not None:
+            self.__metrics.count_http_request(
+                host=urlsplit(url).netloc,
+                status=status,
+                duration_s=perf_counter() - sent_at,
+            )
+
+    def get(self, url: str, **kwargs: Any) -> Response:  # noqa: ANN401
+        """
+        Send a GET request, or return its response from the cache.
+
+        A request that is not cached waits for the rate and concurrency limits of the URL's host. It is retried after
+        a connection error or a response with a `RETRYABLE_STATUSES` status, up to `max_attempts` times.
+
+        :raise HTTPError if the last response still has a `RETRYABLE_STATUSES` status
+        :raise ConnectionError or Timeout if the last attempt failed to connect
+        """
+
+        cached_response = self.__session.get(url, only_if_cached=True, **kwargs)
+        if cached_response.status_code != HTTPStatus.GATEWAY_TIMEOUT:
+            self.__count_cache_lookup("hit")
+            return cached_response
+        self.__count_cache_lookup("miss")
+
+        host_limiter = self.__host_limiter(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with host_limiter:
+                    sent_at = perf_counter()
+                    try:
+                        response = self.__session.get(url, **kwargs)
+                    except (ConnectionError, Timeout):
+                        self.__count_request(url, "error", sent_at=sent_at)
+                        raise
+                    self.__count_request(
+                        url, str(response.status_code), sent_at=sent_at
+                    )
+            except (ConnectionError, Timeout):
+                if attempt == self.__max_attempts:
+                    raise
+                self.__logger.warning(
+                    "attempt %d of GET %s failed to connect, retrying",
+                    attempt,
+                    url,
+                    exc_info=True,
+                )
+                sleep(self.__backoff_s(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUSES:
+                host_limiter.record_success()
+                return response
+
+            retry_after_s = _retry_after_s(response)
+            backoff_s = min(
+                retry_after_s
+                if retry_after_s is not None
+                else self.__backoff_s(attempt),
+                self.__max_backoff_s,
+            )
+            if response.status_code in THROTTLING_STATUSES:
+                # Other requests to the host wait for the pause too.
+                host_limiter.record_throttling(backoff_s)
+            if attempt == self.__max_attempts:
+                response.raise_for_status()
+
+            self.__logger.warning(
+                "attempt %d of GET %s returned status %d, retrying in %.1f seconds",
+                attempt,
+                url,
+                response.status_code,
+                backoff_s,
+            )
+            if response.status_code not in THROTTLING_STATUSES:
+                sleep(backoff_s)
+
+    def __host_limiter(self, url: str) -> _HostLimiter:
+        with self.__host_limiters_lock:
+            return self.__host_limiters[urlsplit(url).netloc]
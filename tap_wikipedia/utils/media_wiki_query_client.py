@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from requests import RequestException
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from tap_wikipedia.utils.http_client import HttpClient
+
+# Maximum number of titles the MediaWiki API accepts in one query.
+MAX_TITLES_PER_QUERY = 50
+
+# List properties of a page that may be split across continued responses.
+CONTINUED_PAGE_PROPERTIES = ("categories", "links")
+
+
+class MediaWikiApiError(RequestException):
+    """An error response of the MediaWiki API, such as `maxlag` or `ratelimited`."""
+
+    def __init__(self, error: dict[str, Any]):
+        """
+        :param error: the `error` object of the response
+        """
+        super().__init__(
+            f"MediaWiki API error {error.get('code')}: {error.get('info')}"
+        )
+        self.code = error.get("code")
+
+
+class MediaWikiQueryClient:
+    """Query properties of many Wikipedia pages at once through the MediaWiki `action=query` API."""
+
+    def __init__(self, *, http_client: HttpClient, api_url: str):
+        """
+        :param http_client: client that sends the API requests
+        :param api_url: URL of the MediaWiki API, e.g. https://en.wikipedia.org/w/api.php
+        """
+        self.__http_client = http_client
+        self.__api_url = api_url
+
+    def query_pages(
+        self, titles: Sequence[str], *, parameters: dict[str, str]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Query up to `MAX_TITLES_PER_QUERY` pages, following `continue` tokens until every property is complete.
+
+        :param titles: titles of the pages
+        :param parameters: `prop` and property-specific parameters of the query, e.g. {"prop": "categories", "cllimit": "max"}
+        :return the JSON object of each page that exists, keyed by the requested title
+        :raise MediaWikiApiError if the API responds with an error, so that the pages are not taken to have no properties
+        """
+
+        assert len(titles) <= MAX_TITLES_PER_QUERY
+
+        parameters = {
+            **parameters,
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "titles": "|".join(titles),
+        }
+
+        pages: dict[str, dict[str, Any]] = {}
+        normalized_titles: dict[str, str] = {}
+        continue_parameters: dict[str, str] = {}
+        while True:
+            response_json = self.__http_client.get(
+                self.__api_url,
+                params={**parameters, **continue_parameters},
+                headers={"User-agent": "Imlapps"},
+            ).json()
+            if "error" in response_json:
+                raise MediaWikiApiError(response_json["error"])
+            query = response_json.get("query", {})
+
+            for normalized_title in query.get("normalized", []):
+                normalized_titles[normalized_title["to"]] = normalized_title["from"]
+
+            for page in query.get("pages", []):
+                if page.get("missing") or page.get("invalid"):
+                    continue
+                merged_page = pages.setdefault(page["title"], {})
+                for key, value in page.items():
+                    if key in CONTINUED_PAGE_PROPERTIES:
+                        merged_page.setdefault(key, []).extend(value)
+                    else:
+                        merged_page[key] = value
+
+            if "continue" not in response_json:
+                break
+            continue_parameters = response_json["continue"]
+
+        return {
+            normalized_titles.get(title, title): page for title, page in pages.items()
+        }
@@ -0,0 +1,359 @@
+import gzip
+import sqlite3
+from collections.abc import Callable, Container, Iterable, Iterator
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TextIO
+
+from tap_wikipedia.utils.sql_dump_reader import SqlDumpReader, SqlValue
+from tap_wikipedia.utils.wikipedia_titles import normalize_wikipedia_title
+
+# Names of the dumped tables the index is built from.
+PAGE_TABLE = "page"
+PAGE_PROPS_TABLE = "page_props"
+CATEGORYLINKS_TABLE = "categorylinks"
+PAGELINKS_TABLE = "pagelinks"
+# Only read when the `categorylinks` or `pagelinks` dump refers to pages by link target ID.
+LINKTARGET_TABLE = "linktarget"
+
+DUMPED_TABLES = (PAGE_TABLE, PAGE_PROPS_TABLE, CATEGORYLINKS_TABLE, PAGELINKS_TABLE)
+
+ARTICLE_NAMESPACE = 0
+CATEGORY_NAMESPACE = 14
+
+# Number of rows inserted into the index at a time while it is built.
+INSERT_BATCH_SIZE = 10000
+
+
+def _open_dump(dump_file_path: Path) -> TextIO:
+    if dump_file_path.suffix == ".gz":
+        return gzip.open(dump_file_path, "rt", encoding="utf-8", errors="replace")
+    return dump_file_path.open(encoding="utf-8", errors="replace")
+
+
+def refers_to_link_targets(dump_file_path: Path) -> bool:
+    """Return whether a `categorylinks` or `pagelinks` dump refers to pages by link target ID, in the `linktarget` dump."""
+
+    with _open_dump(dump_file_path) as dump_file:
+        columns = SqlDumpReader(dump_file).columns
+    return "cl_to" not in columns and "pl_title" not in columns
+
+
+def _batches(rows: Iterable[tuple[SqlValue, ...]]) -> Iterator[list[tuple]]:
+    batch: list[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _OfflineEnrichmentIndexBuilder:
+    """Fills an empty index from the dumps, reading each dump once."""
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        *,
+        get_dump_file_path: Callable[[str], Path],
+        title_allowlist: Container[str] | None,
+    ):
+        self.__connection = connection
+        self.__get_dump_file_path = get_dump_file_path
+        self.__title_allowlist = title_allowlist
+        # IDs of the articles in the allowlist, if any.
+        self.__article_ids: set[int] | None = (
+            set() if title_allowlist is not None else None
+        )
+        self.__has_link_targets = False
+
+    def build(self) -> None:
+        self.__connection.executescript(
+            """
+            CREATE TABLE page (page_id INTEGER PRIMARY KEY, namespace INTEGER NOT NULL, title TEXT NOT NULL);
+            CREATE TABLE hidden_category (page_id INTEGER PRIMARY KEY);
+            CREATE TABLE category (page_id INTEGER NOT NULL, title TEXT NOT NULL);
+            CREATE TABLE link (page_id INTEGER NOT NULL, title TEXT NOT NULL);
+            CREATE TABLE link_target (target_id INTEGER PRIMARY KEY, namespace INTEGER NOT NULL, title TEXT NOT NULL);
+            CREATE TABLE category_target (page_id INTEGER NOT NULL, target_id INTEGER NOT NULL);
+            CREATE TABLE link_target_reference (page_id INTEGER NOT NULL, target_id INTEGER NOT NULL);
+            """
+        )
+        self.__load_pages()
+        self.__load_page_props()
+        self.__load_categorylinks()
+        self.__load_pagelinks()
+        self.__connection.executescript(
+            f"""
+            INSERT INTO category (page_id, title)
+                SELECT category_target.page_id, link_target.title FROM category_target
+                JOIN link_target USING (target_id) WHERE link_target.namespace = {CATEGORY_NAMESPACE};
+            INSERT INTO link (page_id, title)
+                SELECT link_target_reference.page_id, link_target.title FROM link_target_reference
+                JOIN link_target USING (target_id) WHERE link_target.namespace = {ARTICLE_NAMESPACE};
+            DELETE FROM category WHERE title IN (
+                SELECT page.title FROM hidden_category JOIN page USING (page_id)
+                WHERE page.namespace = {CATEGORY_NAMESPACE}
+            );
+            DELETE FROM page WHERE namespace != {ARTICLE_NAMESPACE};
+            DROP TABLE hidden_category;
+            DROP TABLE link_target;
+            DROP TABLE category_target;
+            DROP TABLE link_target_reference;
+            CREATE UNIQUE INDEX page_title ON page (title);
+            CREATE INDEX category_page_id ON category (page_id, title);
+            CREATE INDEX link_page_id ON link (page_id, title);
+            """  # noqa: S608
+        )
+
+    def __insert(self, statement: str, rows: Iterable[tuple[SqlValue, ...]]) -> None:
+        for batch in _batches(rows):
+            self.__connection.executemany(statement, batch)
+
+    def __is_indexed_article(self, page_id: SqlValue) -> bool:
+        return self.__article_ids is None or page_id in self.__article_ids
+
+    def __load_categorylinks(self) -> None:
+        with _open_dump(self.__get_dump_file_path(CATEGORYLINKS_TABLE)) as dump_file:
+            dump = SqlDumpReader(dump_file)
+            from_index = dump.column_index("cl_from")
+            if "cl_to" in dump.columns:
+                to_index = dump.column_index("cl_to")
+                self.__insert(
+                    "INSERT INTO category (page_id, title) VALUES (?, ?)",
+                    (
+                        (row[from_index], row[to_index])
+                        for row in dump.rows()
+                        if self.__is_indexed_article(row[from_index])
+                    ),
+                )
+                return
+
+            target_index = dump.column_index("cl_target_id")
+            self.__load_link_targets()
+            self.__insert(
+                "INSERT INTO category_target (page_id, target_id) VALUES (?, ?)",
+                (
+                    (row[from_index], row[target_index])
+                    for row in dump.rows()
+                    if self.__is_indexed_article(row[from_index])
+                ),
+            )
+
+    def __load_link_targets(self) -> None:
+        """Load the `linktarget` dump, which newer `categorylinks` and `pagelinks` dumps refer to, at most once."""
+
+        if self.__has_link_targets:
+            return
+
+        with _open_dump(self.__get_dump_file_path(LINKTARGET_TABLE)) as dump_file:
+            dump = SqlDumpReader(dump_file)
+            id_index = dump.column_index("lt_id")
+            namespace_index = dump.column_index("lt_namespace")
+            title_index = dump.column_index("lt_title")
+            self.__insert(
+                "INSERT INTO link_target (target_id, namespace, title) VALUES (?, ?, ?)",
+                (
+                    (row[id_index], row[namespace_index], row[title_index])
+                    for row in dump.rows()
+                    if row[namespace_index] in (ARTICLE_NAMESPACE, CATEGORY_NAMESPACE)
+                ),
+            )
+        self.__has_link_targets = True
+
+    def __load_page_props(self) -> None:
+        """Load the IDs of hidden categories, which article pages do not show."""
+
+        with _open_dump(self.__get_dump_file_path(PAGE_PROPS_TABLE)) as dump_file:
+            dump = SqlDumpReader(dump_file)
+            page_index = dump.column_index("pp_page")
+            name_index = dump.column_index("pp_propname")
+            self.__insert(
+                "INSERT OR IGNORE INTO hidden_category (page_id) VALUES (?)",
+                (
+                    (row[page_index],)
+                    for row in dump.rows()
+                    if row[name_index] == "hiddencat"
+                ),
+            )
+
+    def __load_pagelinks(self) -> None:
+        with _open_dump(self.__get_dump_file_path(PAGELINKS_TABLE)) as dump_file:
+            dump = SqlDumpReader(dump_file)
+            from_index = dump.column_index("pl_from")
+            from_namespace_index = dump.column_index("pl_from_namespace")
+            rows = (
+                row
+                for row in dump.rows()
+                if row[from_namespace_index] == ARTICLE_NAMESPACE
+                and self.__is_indexed_article(row[from_index])
+            )
+            if "pl_title" in dump.columns:
+                namespace_index = dump.column_index("pl_namespace")
+                title_index = dump.column_index("pl_title")
+                self.__insert(
+                    "INSERT INTO link (page_id, title) VALUES (?, ?)",
+                    (
+                        (row[from_index], row[title_index])
+                        for row in rows
+                        if row[namespace_index] == ARTICLE_NAMESPACE
+                    ),
+                )
+                return
+
+            target_index = dump.column_index("pl_target_id")
+            self.__load_link_targets()
+            self.__insert(
+                "INSERT INTO link_target_reference (page_id, target_id) VALUES (?, ?)",
+                ((row[from_index], row[target_index]) for row in rows),
+            )
+
+    def __load_pages(self) -> None:
+        """Load the articles, or only those in the allowlist, and the categories."""
+
+        with _open_dump(self.__get_dump_file_path(PAGE_TABLE)) as dump_file:
+            dump = SqlDumpReader(dump_file)
+            id_index = dump.column_index("page_id")
+            namespace_index = dump.column_index("page_namespace")
+            title_index = dump.column_index("page_title")
+
+            def indexed_pages() -> Iterator[tuple[SqlValue, ...]]:
+                for row in dump.rows():
+                    namespace = row[namespace_index]
+                    if namespace == ARTICLE_NAMESPACE:
+                        if self.__title_allowlist is not None:
+                            if (
+                                normalize_wikipedia_title(str(row[title_index]))
+                                not in self.__title_allowlist
+                            ):
+                                continue
+                            self.__article_ids.add(row[id_index])  # type: ignore[union-attr, arg-type]
+                    elif namespace != CATEGORY_NAMESPACE:
+                        continue
+                    yield row[id_index], namespace, row[title_index]
+
+            self.__insert(
+                "INSERT INTO page (page_id, namespace, title) VALUES (?, ?, ?)",
+                indexed_pages(),
+            )
+
+
+class OfflineEnrichmentIndex:
+    """
+    An on-disk index from the title of each article to its categories and the articles it links to, built from the
+    `page`, `page_props`, `categorylinks` and `pagelinks` SQL dumps of a Wikipedia.
+
+    Titles are stored as they are in the dumps, with underscores instead of spaces. Hidden categories, which article
+    pages do not show, are left out.
+    """
+
+    def __init__(self, index_file_path: Path):
+        """
+        :param index_file_path: path to the SQLite database of an index built by `build`
+        """
+        self.__connection = sqlite3.connect(index_file_path)
+
+    def __enter__(self) -> "OfflineEnrichmentIndex":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    @staticmethod
+    def build(
+        index_file_path: Path,
+        *,
+        get_dump_file_path: Callable[[str], Path],
+        source: str,
+        title_allowlist: Container[str] | None = None,
+    ) -> None:
+        """
+        Build an index in one streaming pass over each dump, then atomically move it to `index_file_path`.
+
+        :param get_dump_file_path: return the path to the (optionally gzipped) dump of a table; the `linktarget` dump
+            is only requested if the other dumps refer to it
+        :param source: identity of the dumps the index is built from, returned by `read_source`
+        :param title_allowlist: normalized titles of the articles to index, or None to index every article
+        """
+
+        index_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(
+            dir=index_file_path.parent, prefix="building-", delete=False
+        ) as temporary_file:
+            pass
+
+        try:
+            connection = sqlite3.connect(temporary_file.name)
+            try:
+                connection.execute("PRAGMA journal_mode = OFF")
+                connection.execute("PRAGMA synchronous = OFF")
+                _OfflineEnrichmentIndexBuilder(
+                    connection,
+                    get_dump_file_path=get_dump_file_path,
+                    title_allowlist=title_allowlist,
+                ).build()
+                connection.execute("CREATE TABLE source (source TEXT NOT NULL)")
+                connection.execute("INSERT INTO source (source) VALUES (?)", (source,))
+                connection.commit()
+            finally:
+                connection.close()
+        except BaseException:
+            Path(temporary_file.name).unlink()
+            raise
+
+        Path(temporary_file.name).replace(index_file_path)
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def get_categories(self, title: str) -> tuple[str, ...] | None:
+        """
+        Return the titles of the categories of an article, without the `Category:` prefix.
+
+        :return the titles, or None if the article is not in the index
+        """
+
+        return self.__get_titles("category", title)
+
+    def get_links(self, title: str) -> tuple[str, ...] | None:
+        """
+        Return the titles of the articles an article links to.
+
+        :return the titles, or None if the article is not in the index
+        """
+
+        return self.__get_titles("link", title)
+
+    def __get_titles(self, table: str, title: str) -> tuple[str, ...] | None:
+        page_row = self.__connection.execute(
+            "SELECT page_id FROM page WHERE title = ?",
+            (normalize_wikipedia_title(title).replace(" ", "_"),),
+        ).fetchone()
+        if page_row is None:
+            return None
+
+        return tuple(
+            linked_title
+            for (linked_title,) in self.__connection.execute(
+                f"SELECT title FROM {table} WHERE page_id = ? ORDER BY title",  # noqa: S608
+                page_row,
+            )
+        )
+
+    @staticmethod
+    def read_source(index_file_path: Path) -> str | None:
+        """Return the identity of the dumps an index was built from, or None if there is no complete index."""
+
+        if not index_file_path.is_file():
+            return None
+
+        connection = sqlite3.connect(index_file_path)
+        try:
+            row = connection.execute("SELECT source FROM source").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        finally:
+            connection.close()
+        return str(row[0]) if row is not None else None
@@ -0,0 +1,267 @@
+import gzip
+import multiprocessing
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from io import BytesIO
+from itertools import pairwise
+from pathlib import Path
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.utils.gzip_seek_index import SeekPoint, read_seek_index
+from tap_wikipedia.utils.wikipedia_abstracts_parser import WikipediaAbstractsParser
+
+# Approximate number of bytes of the abstracts file parsed by a worker at a time.
+DEFAULT_SHARD_SIZE = 32 * 1024 * 1024
+
+DOC_START_TAG = b"<doc>"
+DOC_END_TAG = b"</doc>"
+FEED_END_TAG = b"</feed>"
+
+# Number of bytes read at a time while searching for a tag.
+SEARCH_BLOCK_SIZE = 64 * 1024
+
+# Start method of the worker processes. Forking copies the locks of the tap's other threads, such as the producers of
+# partitions, in whatever state they are, so the workers are started by a server process, or spawned where there is none.
+WORKER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _find_tag(abstracts_file_path: Path, tag: bytes, start: int) -> int | None:
+    """Return the offset of the first occurrence of `tag` at or after `start`."""
+
+    with abstracts_file_path.open("rb") as abstracts_file:
+        abstracts_file.seek(start)
+        block_start = start
+        previous_tail = b""
+        while block := abstracts_file.read(SEARCH_BLOCK_SIZE):
+            search_block = previous_tail + block
+            tag_index = search_block.find(tag)
+            if tag_index != -1:
+                return block_start - len(previous_tail) + tag_index
+            previous_tail = search_block[-(len(tag) - 1) :]
+            block_start += len(block)
+    return None
+
+
+def _parse_shard(  # noqa: PLR0913
+    abstracts_file_path: Path,
+    start: int,
+    end: int,
+    uncompressed_start: int,
+    title_allowlist: frozenset[str] | None = None,
+    resume_offset: int = 0,
+    parse_sublinks: bool = True,  # noqa: FBT001, FBT002
+) -> list[wikipedia.CompactRecord]:
+    """
+    Parse the `<doc>` elements found in the byte range [start, end) of an abstracts file.
+
+    The byte range of a seekable gzip file covers whole gzip members, whose data starts at `uncompressed_start`
+    in the uncompressed dump.
+    """
+
+    with abstracts_file_path.open("rb") as abstracts_file:
+        abstracts_file.seek(start)
+        shard = abstracts_file.read(end - start)
+
+    if abstracts_file_path.suffix == ".gz":
+        shard = gzip.decompress(shard)
+
+    # Drop the `<feed>` tags of the first and last shards.
+    docs_start = shard.find(DOC_START_TAG)
+    docs_end = shard.rfind(DOC_END_TAG)
+    if docs_start == -1 or docs_end == -1:
+        return []
+
+    return list(
+        WikipediaAbstractsParser(
+            title_allowlist=title_allowlist,
+            resume_offset=resume_offset,
+            parse_sublinks=parse_sublinks,
+        ).parse(
+            BytesIO(shard[docs_start : docs_end + len(DOC_END_TAG)] + b"</feed>"),
+            doc_offset=uncompressed_start + docs_start,
+        )
+    )
+
+
+def _seekable_gzip_shard_byte_ranges(
+    seek_points: tuple[SeekPoint, ...], *, file_size: int, shard_size: int
+) -> tuple[tuple[int, int], ...]:
+    """Group the gzip members of a seekable gzip file into compressed byte ranges of roughly `shard_size` uncompressed bytes."""
+
+    boundaries = [seek_points[0]]
+    for seek_point in seek_points[1:]:
+        if (
+            seek_point.uncompressed_offset - boundaries[-1].uncompressed_offset
+            >= shard_size
+        ):
+            boundaries.append(seek_point)
+
+    return tuple(
+        pairwise([boundary.compressed_offset for boundary in boundaries] + [file_size])
+    )
+
+
+def shard_byte_ranges(
+    abstracts_file_path: Path, *, shard_size: int = DEFAULT_SHARD_SIZE
+) -> tuple[tuple[int, int], ...]:
+    """
+    Split an abstracts file into byte ranges of roughly `shard_size` uncompressed bytes.
+
+    Every range of an uncompressed file starts at a `<doc>` tag, and every range of a seekable gzip file
+    starts at a seek point, so each range can be parsed independently of the others.
+    """
+
+    file_size = abstracts_file_path.stat().st_size
+
+    if abstracts_file_path.suffix == ".gz":
+        seek_points = read_seek_index(abstracts_file_path)
+        if seek_points is None:
+            raise ValueError(f"{abstracts_file_path} has no seek index")
+        return _seekable_gzip_shard_byte_ranges(
+            seek_points, file_size=file_size, shard_size=shard_size
+        )
+
+    data_start = _find_tag(abstracts_file_path, DOC_START_TAG, 0)
+    if data_start is None:
+        return ()
+
+    data_end = file_size
+    with abstracts_file_path.open("rb") as abstracts_file:
+        tail_start = max(data_start, file_size - SEARCH_BLOCK_SIZE)
+        abstracts_file.seek(tail_start)
+        feed_end_index = abstracts_file.read().rfind(FEED_END_TAG)
+        if feed_end_index != -1:
+            data_end = tail_start + feed_end_index
+
+    boundaries = [data_start]
+    while boundaries[-1] + shard_size < data_end:
+        boundary = _find_tag(
+            abstracts_file_path, DOC_START_TAG, boundaries[-1] + shard_size
+        )
+        if boundary is None or boundary >= data_end:
+            break
+        boundaries.append(boundary)
+    boundaries.append(data_end)
+
+    return tuple(pairwise(boundaries))
+
+
+class ParallelWikipediaAbstractsParser:
+    """Parse a Wikipedia abstracts file in byte-range shards using a pool of worker processes."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        worker_count: int,
+        ordered: bool = True,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        title_allowlist: frozenset[str] | None = None,
+        resume_offset: int = 0,
+        parse_sublinks: bool = True,
+    ):
+        """
+        :param worker_count: number of worker processes
+        :param ordered: yield records in dump order instead of in shard completion order
+        :param shard_size: approximate number of bytes parsed by a worker at a time
+        :param title_allowlist: normalized titles of the articles to parse, or None to parse every article
+        :param resume_offset: byte offset in the uncompressed dump before which `<doc>` elements are skipped
+        :param parse_sublinks: build the sublinks of records
+        """
+        self.__worker_count = worker_count
+        self.__ordered = ordered
+        self.__shard_size = shard_size
+        self.__title_allowlist = title_allowlist
+        self.__resume_offset = resume_offset
+        self.__parse_sublinks = parse_sublinks
+
+    @staticmethod
+    def can_parse(abstracts_file_path: Path) -> bool:
+        """Return whether an abstracts file can be split into shards: it is either uncompressed or a seekable gzip file."""
+
+        return (
+            abstracts_file_path.suffix != ".gz"
+            or read_seek_index(abstracts_file_path) is not None
+        )
+
+    def __resumed_shards(
+        self, abstracts_file_path: Path
+    ) -> tuple[tuple[int, int, int], ...]:
+        """
+        Return the byte ranges of the shards of an abstracts file, with the uncompressed offset at which each starts.
+
+        Shards that end before `resume_offset` are left out.
+        """
+
+        byte_ranges = shard_byte_ranges(
+            abstracts_file_path, shard_size=self.__shard_size
+        )
+        if abstracts_file_path.suffix == ".gz":
+            uncompressed_offsets = {
+                seek_point.compressed_offset: seek_point.uncompressed_offset
+                for seek_point in read_seek_index(abstracts_file_path) or ()
+            }
+            uncompressed_starts = [
+                uncompressed_offsets[start] for start, _ in byte_ranges
+            ]
+        else:
+            uncompressed_starts = [start for start, _ in byte_ranges]
+
+        return tuple(
+            (start, end, uncompressed_start)
+            for (start, end), uncompressed_start, next_uncompressed_start in zip(
+                byte_ranges,
+                uncompressed_starts,
+                [*uncompressed_starts[1:], None],
+                strict=True,
+            )
+            if next_uncompressed_start is None
+            or next_uncompressed_start > self.__resume_offset
+        )
+
+    def parse(self, abstracts_file_path: Path) -> Iterator[wikipedia.CompactRecord]:
+        """
+        Parse an abstracts file and yield its records.
+
+        At most two shards per worker are in flight at a time, so memory stays bounded regardless of the file size.
+        """
+
+        byte_ranges = iter(self.__resumed_shards(abstracts_file_path))
+        max_shards_in_flight = 2 * self.__worker_count
+
+        with ProcessPoolExecutor(
+            max_workers=self.__worker_count,
+            mp_context=multiprocessing.get_context(WORKER_START_METHOD),
+        ) as executor:
+
+            def submit_shards(
+                shards_in_flight: int,
+            ) -> Iterator[Future[list[wikipedia.CompactRecord]]]:
+                for _ in range(max_shards_in_flight - shards_in_flight):
+                    byte_range = next(byte_ranges, None)
+                    if byte_range is None:
+                        return
+                    yield executor.submit(
+                        _parse_shard,
+                        abstracts_file_path,
+                        *byte_range,
+                        self.__title_allowlist,
+                        self.__resume_offset,
+                        self.__parse_sublinks,
+                    )
+
+            if self.__ordered:
+                ordered_futures = deque(submit_shards(0))
+                while ordered_futures:
+                    records = ordered_futures.popleft().result()
+                    ordered_futures.extend(submit_shards(len(ordered_futures)))
+                    yield from records
+            else:
+                futures = set(submit_shards(0))
+                while futures:
+                    done_futures, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    futures.update(submit_shards(len(futures)))
+                    for done_future in done_futures:
+                        yield from done_future.result()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+from singer_sdk.batch import BaseBatcher, lazy_chunked_generator
+from singer_sdk.helpers._batch import BaseBatchFileEncoding
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import pyarrow as pa
+    from singer_sdk.helpers._batch import BatchConfig
+
+# Name of the parquet batch file format, in the encoding of BATCH messages.
+PARQUET_FORMAT = "parquet"
+
+
+@dataclass
+class ParquetEncoding(BaseBatchFileEncoding):
+    """Parquet encoding for batch files, registered with the Singer SDK's batch file encodings."""
+
+    __encoding_format__ = PARQUET_FORMAT
+
+
+def arrow_schema(json_schema: dict[str, Any]) -> pa.Schema:
+    """
+    Return the Arrow schema of the records described by a JSON schema, as generated by Pydantic.
+
+    References to `$defs` are resolved, a nullable `anyOf` becomes its non-null type, and types that have no Arrow
+    equivalent become strings.
+    """
+
+    import pyarrow as pa
+
+    definitions = json_schema.get("$defs", {})
+    json_type_arrow_types = {
+        "boolean": pa.bool_(),
+        "integer": pa.int64(),
+        "number": pa.float64(),
+        "string": pa.string(),
+    }
+
+    def property_arrow_type(property_schema: dict[str, Any]) -> pa.DataType:
+        if "$ref" in property_schema:
+            return property_arrow_type(
+                definitions[property_schema["$ref"].rpartition("/")[2]]
+            )
+
+        if "anyOf" in property_schema:
+            non_null_schemas = [
+                any_of_schema
+                for any_of_schema in property_schema["anyOf"]
+                if any_of_schema.get("type") != "null"
+            ]
+            if len(non_null_schemas) == 1:
+                return property_arrow_type(non_null_schemas[0])
+            return pa.string()
+
+        json_type = str(property_schema.get("type"))
+        if json_type == "object":
+            return pa.struct(
+                [
+                    (name, property_arrow_type(schema))
+                    for name, schema in property_schema.get("properties", {}).items()
+                ]
+            )
+        if json_type == "array":
+            return pa.list_(property_arrow_type(property_schema.get("items", {})))
+        return json_type_arrow_types.get(json_type, pa.string())
+
+    return pa.schema(
+        [
+            (name, property_arrow_type(property_schema))
+            for name, property_schema in json_schema["properties"].items()
+        ]
+    )
+
+
+class ParquetBatcher(BaseBatcher):
+    """Writes batches of records to Parquet files, with columns typed by the JSON schema of the stream."""
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        *,
+        json_schema: dict[str, Any],
+    ):
+        """
+        :param json_schema: JSON schema of the records of the stream
+        """
+        super().__init__(
+            tap_name=tap_name, stream_name=stream_name, batch_config=batch_config
+        )
+        self.__arrow_schema = arrow_schema(json_schema)
+
+    def get_batches(self, records: Iterator[dict]) -> Iterator[list[str]]:
+        """
+        Write up to `batch_size` records at a time to a Parquet file in the storage of the batch config.
+
+        :return the manifest of each batch: a list with the URL of its file
+        """
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
+        prefix = self.batch_config.storage.prefix or ""
+        compression = self.batch_config.encoding.compression or "none"
+
+        for batch_index, batch_records in enumerate(
+            lazy_chunked_generator(records, self.batch_config.batch_size), start=1
+        ):
+            file_name = f"{prefix}{sync_id}-{batch_index}.parquet"
+            table = pa.Table.from_pylist(
+                list(batch_records), schema=self.__arrow_schema
+            )
+            with self.batch_config.storage.fs(create=True) as file_system:
+                with file_system.open(file_name, "wb") as batch_file:
+                    pq.write_table(table, batch_file, compression=compression)
+                file_url = file_system.geturl(file_name)
+            yield [file_url]
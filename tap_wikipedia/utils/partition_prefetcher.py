@@ -0,0 +1,222 @@
+import pickle
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from io import SEEK_END
+from pathlib import Path
+from queue import Queue
+from tempfile import TemporaryFile
+from threading import BoundedSemaphore, Event, Lock, Semaphore, Thread
+from typing import IO, Generic, TypeVar
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+
+class _End:
+    """Marks the end of the items of a partition, with the error that ended it, if any."""
+
+    def __init__(self, error: BaseException | None = None):
+        self.error = error
+
+
+class _Spilled:
+    """Marks that the following items of a partition are spilled to disk, because its buffer was full."""
+
+
+class _Producer(Generic[T]):
+    """
+    Produces the items of a partition in a thread, buffering them in memory, and on disk once the memory is full.
+
+    The producer never waits for its items to be consumed: it runs until the partition is produced or cancelled.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T],
+        *,
+        max_buffered_items: int,
+        semaphore: BoundedSemaphore,
+        spill_directory_path: Path,
+    ):
+        self.__items = items
+        self.__max_buffered_items = max_buffered_items
+        self.__queue: Queue[T | _End | _Spilled] = Queue()
+        self.__semaphore = semaphore
+        self.__spill_directory_path = spill_directory_path
+        self.__spill_file: IO[bytes] | None = None
+        # Guards the spill file and what is known of it, which the producer appends to and the consumer reads from.
+        self.__spill_lock = Lock()
+        self.__spilled_end: _End | None = None
+        self.__spilled_item_count = 0
+        # Released once for each spilled item, and once more for the end of the items once it is spilled.
+        self.__spilled_items = Semaphore(0)
+        self.__produced = False
+        self.__cancelled = Event()
+        Thread(target=self.__produce, daemon=True).start()
+
+    def cancel(self) -> None:
+        with self.__spill_lock:
+            self.__cancelled.set()
+            if self.__produced and self.__spill_file is not None:
+                self.__spill_file.close()
+
+    def consume(self) -> Iterator[T]:
+        try:
+            while True:
+                item = self.__queue.get()
+                if isinstance(item, _Spilled):
+                    break
+                if isinstance(item, _End):
+                    if item.error is not None:
+                        raise item.error
+                    return
+                yield item
+
+            spill_read_offset = 0
+            read_spilled_item_count = 0
+            while True:
+                self.__spilled_items.acquire()
+                with self.__spill_lock:
+                    assert self.__spill_file is not None
+                    end = (
+                        self.__spilled_end
+                        if read_spilled_item_count == self.__spilled_item_count
+                        else None
+                    )
+                    if end is None:
+                        self.__spill_file.seek(spill_read_offset)
+                        spilled_item: T = pickle.load(self.__spill_file)  # noqa: S301
+                        spill_read_offset = self.__spill_file.tell()
+                        read_spilled_item_count += 1
+                if end is not None:
+                    if end.error is not None:
+                        raise end.error
+                    return
+                yield spilled_item
+        finally:
+            self.cancel()
+
+    def __end(self, end: _End) -> None:
+        """Buffer the end of the items after them, in memory unless the items were spilled to disk."""
+
+        if self.__spill_file is None:
+            self.__queue.put(end)
+            return
+        self.__spilled_end = end
+        self.__spilled_items.release()
+
+    def __produce(self) -> None:
+        items = iter(self.__items)
+        with self.__semaphore:
+            try:
+                try:
+                    for item in items:
+                        if self.__cancelled.is_set():
+                            return
+                        self.__put(item)
+                except BaseException as error:  # noqa: BLE001
+                    self.__end(_End(error))
+                    return
+                finally:
+                    # Release the resources of a cancelled generator in the thread that used them.
+                    if isinstance(items, Generator):
+                        items.close()
+                self.__end(_End())
+            finally:
+                with self.__spill_lock:
+                    self.__produced = True
+                    if self.__cancelled.is_set() and self.__spill_file is not None:
+                        self.__spill_file.close()
+
+    def __put(self, item: T) -> None:
+        """Buffer an item in memory while there is room for it, and from then on on disk, to keep the items in order."""
+
+        if (
+            self.__spill_file is None
+            and self.__queue.qsize() < self.__max_buffered_items
+        ):
+            self.__queue.put(item)
+            return
+
+        with self.__spill_lock:
+            if self.__spill_file is None:
+                self.__spill_directory_path.mkdir(parents=True, exist_ok=True)
+                self.__spill_file = TemporaryFile(dir=self.__spill_directory_path)
+                self.__queue.put(_Spilled())
+            self.__spill_file.seek(0, SEEK_END)
+            pickle.dump(item, self.__spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.__spilled_item_count += 1
+        self.__spilled_items.release()
+
+
+class PartitionPrefetcher(Generic[K, T]):
+    """
+    Produces the items of partitions ahead of their consumption.
+
+    Partitions are consumed one at a time, in order, but while one is consumed the items of up to `max_concurrency`
+    partitions, starting with it, are produced in background threads. Each partition buffers up to
+    `max_buffered_items` items in memory, and spills the following ones to a temporary file, so producers run to
+    completion however far ahead of the consumer they get, while memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        partitions: Sequence[K],
+        produce: Callable[[K], Iterable[T]],
+        *,
+        max_concurrency: int,
+        max_buffered_items: int,
+        spill_directory_path: Path,
+    ):
+        """
+        :param partitions: partitions in the order they are consumed
+        :param produce: return the items of a partition; it is called in the consuming thread, but the returned items
+            are iterated in a background thread
+        :param max_concurrency: maximum number of partitions whose items are produced at a time
+        :param max_buffered_items: maximum number of produced items of a partition that wait in memory to be consumed
+        :param spill_directory_path: directory of the temporary files of the items that do not fit in memory, which
+            must be picklable
+        """
+        self.__partitions = partitions
+        self.__produce = produce
+        self.__max_concurrency = max_concurrency
+        self.__max_buffered_items = max_buffered_items
+        self.__spill_directory_path = spill_directory_path
+        self.__semaphore = BoundedSemaphore(max_concurrency)
+        self.__producers: dict[int, _Producer[T]] = {}
+
+    def close(self) -> None:
+        """Cancel the producers of the partitions that have not been consumed."""
+
+        for producer in self.__producers.values():
+            producer.cancel()
+        self.__producers.clear()
+
+    def consume(self, partition: K) -> Iterator[T]:
+        """
+        Yield the items of a partition, and start producing the items of the following partitions.
+
+        Consuming a partition out of order cancels the producers of the partitions before it.
+        """
+
+        partition_index = self.__partitions.index(partition)
+        for started_index in list(self.__producers):
+            if started_index < partition_index:
+                self.__producers.pop(started_index).cancel()
+
+        self.__start_producers(partition_index)
+        yield from self.__producers.pop(partition_index).consume()
+
+    def __start_producers(self, partition_index: int) -> None:
+        """Start the producers of the partitions from `partition_index` up to `max_concurrency` partitions ahead."""
+
+        for start_index in range(
+            partition_index,
+            min(partition_index + self.__max_concurrency, len(self.__partitions)),
+        ):
+            if start_index not in self.__producers:
+                self.__producers[start_index] = _Producer(
+                    self.__produce(self.__partitions[start_index]),
+                    max_buffered_items=self.__max_buffered_items,
+                    semaphore=self.__semaphore,
+                    spill_directory_path=self.__spill_directory_path,
+                )
@@ -0,0 +1,402 @@
+import json
+import logging
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import NamedTuple, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# Upper bounds, in seconds, of the buckets of the HTTP request latency histograms.
+LATENCY_BUCKET_BOUNDS_S = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Prefix of the names of the metrics in Prometheus text files.
+PROMETHEUS_METRIC_NAME_PREFIX = "tap_wikipedia_"
+
+
+@dataclass
+class _StageMetrics:
+    # Whether records go through the stage, or it is only timed.
+    counts_records: bool = True
+    records_in: int = 0
+    records_out: int = 0
+    duration_s: float = 0.0
+
+
+@dataclass
+class _Histogram:
+    bucket_counts: list[int] = field(
+        default_factory=lambda: [0] * len(LATENCY_BUCKET_BOUNDS_S)
+    )
+    count: int = 0
+    sum_s: float = 0.0
+
+    def observe(self, value_s: float) -> None:
+        self.count += 1
+        self.sum_s += value_s
+        for bucket_index, bucket_bound_s in enumerate(LATENCY_BUCKET_BOUNDS_S):
+            if value_s <= bucket_bound_s:
+                self.bucket_counts[bucket_index] += 1
+
+
+class _MetricFamily(NamedTuple):
+    """Samples of a metric, with its Prometheus type and the type of its Singer METRIC messages."""
+
+    name: str
+    prometheus_type: str
+    singer_type: str
+    help: str
+    # Name, labels and value of each sample.
+    samples: list[tuple[str, dict[str, str], float]]
+
+
+def _prometheus_label_value(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PipelineMetrics:
+    """
+    Thread-safe metrics of a sync: the records that go in and out of each stage of the pipeline and the time spent in
+    it, the HTTP requests sent and their latency, and the hits and misses of the HTTP and file caches.
+
+    Counts are accumulated per stage invocation and added to the totals when the invocation ends, so that stages do
+    not contend for a lock per record.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__stages: dict[str, _StageMetrics] = {}
+        self.__http_request_counts: dict[tuple[str, str], int] = {}
+        self.__http_request_durations: dict[str, _Histogram] = {}
+        self.__cache_lookup_counts: dict[tuple[str, str], int] = {}
+
+    def __add_stage_metrics(
+        self,
+        stage: str,
+        *,
+        records_in: int = 0,
+        records_out: int = 0,
+        duration_s: float,
+        counts_records: bool = True,
+    ) -> None:
+        with self.__lock:
+            stage_metrics = self.__stages.setdefault(
+                stage, _StageMetrics(counts_records=counts_records)
+            )
+            stage_metrics.records_in += records_in
+            stage_metrics.records_out += records_out
+            stage_metrics.duration_s += duration_s
+
+    def count_cache_lookup(self, cache: str, result: str) -> None:
+        """
+        Count a lookup in a cache, such as the HTTP cache or the file cache.
+
+        :param result: "hit", "miss", or "revalidated" for a stale entry that the server reported as unmodified
+        """
+
+        with self.__lock:
+            key = (cache, result)
+            self.__cache_lookup_counts[key] = self.__cache_lookup_counts.get(key, 0) + 1
+
+    def count_http_request(self, *, host: str, status: str, duration_s: float) -> None:
+        """Count an HTTP request sent to a host, with the status of its response or "error" if it failed."""
+
+        with self.__lock:
+            key = (host, status)
+            self.__http_request_counts[key] = self.__http_request_counts.get(key, 0) + 1
+            self.__http_request_durations.setdefault(host, _Histogram()).observe(
+                duration_s
+            )
+
+    def __families(self) -> list[_MetricFamily]:
+        with self.__lock:
+            stages = dict(self.__stages)
+            record_stages = {
+                stage: metrics
+                for stage, metrics in stages.items()
+                if metrics.counts_records
+            }
+            http_request_counts = dict(self.__http_request_counts)
+            http_request_durations = dict(self.__http_request_durations)
+            cache_lookup_counts = dict(self.__cache_lookup_counts)
+
+        caches = sorted({cache for cache, _ in cache_lookup_counts})
+        return [
+            _MetricFamily(
+                "stage_records_in_total",
+                "counter",
+                "counter",
+                "Records that went into a stage of the pipeline.",
+                [
+                    ("stage_records_in_total", {"stage": stage}, metrics.records_in)
+                    for stage, metrics in record_stages.items()
+                ],
+            ),
+            _MetricFamily(
+                "stage_records_out_total",
+                "counter",
+                "counter",
+                "Records that came out of a stage of the pipeline.",
+                [
+                    ("stage_records_out_total", {"stage": stage}, metrics.records_out)
+                    for stage, metrics in record_stages.items()
+                ],
+            ),
+            _MetricFamily(
+                "stage_records_dropped_total",
+                "counter",
+                "counter",
+                "Records that went into a stage of the pipeline but did not come out of it.",
+                [
+                    (
+                        "stage_records_dropped_total",
+                        {"stage": stage},
+                        max(metrics.records_in - metrics.records_out, 0),
+                    )
+                    for stage, metrics in record_stages.items()
+                ],
+            ),
+            _MetricFamily(
+                "stage_duration_seconds_total",
+                "counter",
+                "timer",
+                "Wall time spent in a stage of the pipeline, excluding the stages before it.",
+                [
+                    (
+                        "stage_duration_seconds_total",
+                        {"stage": stage},
+                        metrics.duration_s,
+                    )
+                    for stage, metrics in stages.items()
+                ],
+            ),
+            _MetricFamily(
+                "http_requests_total",
+                "counter",
+                "counter",
+                "HTTP requests sent, by host and response status.",
+                [
+                    ("http_requests_total", {"host": host, "status": status}, count)
+                    for (host, status), count in http_request_counts.items()
+                ],
+            ),
+            _MetricFamily(
+                "http_request_duration_seconds",
+                "histogram",
+                "timer",
+                "Latency of the HTTP requests sent, by host.",
+                [
+                    sample
+                    for host, histogram in http_request_durations.items()
+                    for sample in (
+                        *(
+                            (
+                                "http_request_duration_seconds_bucket",
+                                {"host": host, "le": str(bucket_bound_s)},
+                                bucket_count,
+                            )
+                            for bucket_bound_s, bucket_count in zip(
+                                LATENCY_BUCKET_BOUNDS_S,
+                                histogram.bucket_counts,
+                                strict=True,
+                            )
+                        ),
+                        (
+                            "http_request_duration_seconds_bucket",
+                            {"host": host, "le": "+Inf"},
+                            histogram.count,
+                        ),
+                        (
+                            "http_request_duration_seconds_sum",
+                            {"host": host},
+                            histogram.sum_s,
+                        ),
+                        (
+                            "http_request_duration_seconds_count",
+                            {"host": host},
+                            histogram.count,
+                        ),
+                    )
+                ],
+            ),
+            _MetricFamily(
+                "cache_lookups_total",
+                "counter",
+                "counter",
+                "Lookups in the HTTP and file caches, by cache and result.",
+                [
+                    ("cache_lookups_total", {"cache": cache, "result": result}, count)
+                    for (cache, result), count in cache_lookup_counts.items()
+                ],
+            ),
+            _MetricFamily(
+                "cache_hit_ratio",
+                "gauge",
+                "gauge",
+                "Fraction of the lookups in a cache that were served without downloading, including revalidations.",
+                [
+                    (
+                        "cache_hit_ratio",
+                        {"cache": cache},
+                        1
+                        - cache_lookup_counts.get((cache, "miss"), 0)
+                        / sum(
+                            count
+                            for (lookup_cache, _), count in cache_lookup_counts.items()
+                            if lookup_cache == cache
+                        ),
+                    )
+                    for cache in caches
+                ],
+            ),
+        ]
+
+    def instrument_source(self, stage: str, records: Iterable[T]) -> Iterator[T]:
+        """Yield the records of the first stage of the pipeline, counting them and the time spent producing them."""
+
+        records_out = 0
+        duration_s = 0.0
+        records_iterator = iter(records)
+        try:
+            while True:
+                started_at = perf_counter()
+                try:
+                    record = next(records_iterator)
+                finally:
+                    duration_s += perf_counter() - started_at
+                records_out += 1
+                yield record
+        except StopIteration:
+            return
+        finally:
+            self.__add_stage_metrics(
+                stage, records_out=records_out, duration_s=duration_s
+            )
+
+    def instrument_stage(
+        self, stage: str, transform: Callable[[Iterable[T]], Iterable[U]]
+    ) -> Callable[[Iterable[T]], Iterator[U]]:
+        """
+        Return a stage of the pipeline that counts the records going in and out of `transform`, and the time spent in
+        `transform`, excluding the time the stages before it take to produce its records.
+        """
+
+        def instrumented_transform(records: Iterable[T]) -> Iterator[U]:
+            records_in = 0
+            upstream_duration_s = 0.0
+
+            def counted_records() -> Iterator[T]:
+                nonlocal records_in, upstream_duration_s
+                records_iterator = iter(records)
+                while True:
+                    started_at = perf_counter()
+                    try:
+                        record = next(records_iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        upstream_duration_s += perf_counter() - started_at
+                    records_in += 1
+                    yield record
+
+            records_out = 0
+            duration_s = 0.0
+            transformed_records = iter(transform(counted_records()))
+            try:
+                while True:
+                    started_at = perf_counter()
+                    upstream_duration_before_s = upstream_duration_s
+                    try:
+                        record = next(transformed_records)
+                    finally:
+                        duration_s += (perf_counter() - started_at) - (
+                            upstream_duration_s - upstream_duration_before_s
+                        )
+                    records_out += 1
+                    yield record
+            except StopIteration:
+                return
+            finally:
+                self.__add_stage_metrics(
+                    stage,
+                    records_in=records_in,
+                    records_out=records_out,
+                    duration_s=duration_s,
+                )
+
+        return instrumented_transform
+
+    def log(self, logger: logging.Logger, **tags: str) -> None:
+        """Log each sample of the metrics as a Singer METRIC message, with `tags` added to the tags of every sample."""
+
+        for family in self.__families():
+            for sample_name, labels, value in family.samples:
+                logger.info(
+                    "METRIC: %s",
+                    json.dumps(
+                        {
+                            "type": family.singer_type,
+                            "metric": sample_name,
+                            "value": value,
+                            "tags": {**tags, **labels},
+                        }
+                    ),
+                )
+
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        """Add the time spent in the `with` block to a stage of the pipeline that does not yield records."""
+
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.__add_stage_metrics(
+                stage, duration_s=perf_counter() - started_at, counts_records=False
+            )
+
+    def write_prometheus_text_file(self, file_path: Path, **labels: str) -> None:
+        """
+        Write a snapshot of the metrics in the Prometheus text format, with `labels` added to the labels of every
+        sample.
+
+        The snapshot is written next to `file_path` and then renamed to it, so that a collector such as the textfile
+        collector of the node exporter never reads a partial snapshot.
+        """
+
+        lines = []
+        for family in self.__families():
+            if not family.samples:
+                continue
+            metric_name = PROMETHEUS_METRIC_NAME_PREFIX + family.name
+            lines.append(f"# HELP {metric_name} {family.help}")
+            lines.append(f"# TYPE {metric_name} {family.prometheus_type}")
+            for sample_name, sample_labels, value in family.samples:
+                formatted_labels = ",".join(
+                    f'{name}="{_prometheus_label_value(label_value)}"'
+                    for name, label_value in {**labels, **sample_labels}.items()
+                )
+                lines.append(
+                    f"{PROMETHEUS_METRIC_NAME_PREFIX}{sample_name}{{{formatted_labels}}} {value}"
+                )
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file_path = file_path.with_name(file_path.name + ".tmp")
+        temporary_file_path.write_text("\n".join(lines) + "\n")
+        temporary_file_path.replace(file_path)
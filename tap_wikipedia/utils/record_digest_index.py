@@ -0,0 +1,161 @@
+import sqlite3
+from collections.abc import Iterator
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock
+
+from tap_wikipedia.models import wikipedia
+
+# Number of index updates made between two commits.
+COMMIT_INTERVAL = 10000
+
+# Size in bytes of a record digest.
+DIGEST_SIZE = 16
+
+# Separates the fields of a record in the data that is digested.
+FIELD_SEPARATOR = "\x1f"
+
+
+def record_digest(record: wikipedia.CompactRecord) -> bytes:
+    """Return a digest of the content a record is parsed with: its URL, abstract and sublinks."""
+
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    digest.update(
+        FIELD_SEPARATOR.join(
+            (
+                record.url,
+                record.abstract,
+                *(
+                    f"{sublink.anchor}{FIELD_SEPARATOR}{sublink.link}"
+                    for sublink in record.sublinks or ()
+                ),
+            )
+        ).encode()
+    )
+    return digest.digest()
+
+
+class RecordDigestIndex:
+    """
+    An on-disk index from the title of each record emitted by previous syncs to a digest of its content.
+
+    Every sync is a new generation of the index. Titles seen by a sync are moved to its generation, so the titles left
+    in older generations at the end of the sync are the ones that were removed from the dump.
+
+    The index can be used from several threads, such as one that marks the titles parsed from the dump as seen and one
+    that stores the digests of the emitted records. Each of them closes its own reference to the index, returned by
+    `share`, and the index is only closed once all of them have.
+    """
+
+    def __init__(self, index_file_path: Path):
+        """
+        :param index_file_path: path to the SQLite database of the index, created if it does not exist
+        """
+        index_file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.__connection = sqlite3.connect(index_file_path, check_same_thread=False)
+        self.__lock = Lock()
+        self.__connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS record_digest (
+                title TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                digest BLOB,
+                generation INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS generation (generation INTEGER NOT NULL);
+            """
+        )
+        previous_generation = self.__connection.execute(
+            "SELECT MAX(generation) FROM generation"
+        ).fetchone()[0]
+        self.__generation = (previous_generation or 0) + 1
+        self.__connection.execute(
+            "INSERT INTO generation (generation) VALUES (?)", (self.__generation,)
+        )
+        self.__uncommitted_update_count = 0
+        # Number of references to the index that have yet to be closed, counting the one that created it.
+        self.__reference_count = 1
+
+    def __enter__(self) -> "RecordDigestIndex":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __count_update(self) -> None:
+        self.__uncommitted_update_count += 1
+        if self.__uncommitted_update_count >= COMMIT_INTERVAL:
+            self.__connection.commit()
+            self.__uncommitted_update_count = 0
+
+    def close(self) -> None:
+        """Close a reference to the index, and once every reference is closed, commit the updates made to it and close it."""
+
+        with self.__lock:
+            self.__reference_count -= 1
+            if self.__reference_count == 0:
+                self.__connection.commit()
+                self.__connection.close()
+
+    def mark_seen(self, *, title: str, url: str, digest: bytes) -> bool:
+        """
+        Record that a title is in the dump of the current sync.
+
+        The digest of the title is not updated: call `store_digest` once its record has been emitted.
+
+        :return whether the content of the title changed since the last sync that emitted it, or it is new
+        """
+
+        # A separate lookup and update, rather than an upsert returning the stored digest, which needs SQLite 3.35.
+        with self.__lock:
+            stored_row = self.__connection.execute(
+                "SELECT digest FROM record_digest WHERE title = ?", (title,)
+            ).fetchone()
+            if stored_row is None:
+                self.__connection.execute(
+                    "INSERT INTO record_digest (title, url, generation) VALUES (?, ?, ?)",
+                    (title, url, self.__generation),
+                )
+            else:
+                self.__connection.execute(
+                    "UPDATE record_digest SET url = ?, generation = ? WHERE title = ?",
+                    (url, self.__generation, title),
+                )
+            self.__count_update()
+        return stored_row is None or stored_row[0] != digest
+
+    def pop_removed_titles(self) -> Iterator[tuple[str, str]]:
+        """
+        Remove the titles that were not seen by the current sync from the index, and yield each with its URL.
+
+        Only call this after every record of the dump has been seen.
+        """
+
+        with self.__lock:
+            removed_titles = self.__connection.execute(
+                "SELECT title, url FROM record_digest WHERE generation < ?",
+                (self.__generation,),
+            ).fetchall()
+        for title, url in removed_titles:
+            yield title, url
+            with self.__lock:
+                self.__connection.execute(
+                    "DELETE FROM record_digest WHERE title = ?", (title,)
+                )
+                self.__count_update()
+
+    def share(self) -> "RecordDigestIndex":
+        """Return another reference to the index, for another thread to close once it is done with the index."""
+
+        with self.__lock:
+            self.__reference_count += 1
+        return self
+
+    def store_digest(self, *, title: str, digest: bytes) -> None:
+        """Store the digest of a title whose record has been emitted."""
+
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE record_digest SET digest = ? WHERE title = ?", (digest, title)
+            )
+            self.__count_update()
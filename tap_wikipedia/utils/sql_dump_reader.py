@@ -0,0 +1,113 @@
+import re
+from collections.abc import Iterator
+from typing import TextIO
+
+# A column definition in the `CREATE TABLE` statement of a dump.
+COLUMN_DEFINITION_PATTERN = re.compile(r"\s+`(\w+)`")
+
+# A row of the `VALUES` list of an `INSERT` statement, with its values in the first group.
+ROW_PATTERN = re.compile(r"\(((?:'(?:[^'\\]|\\.)*'|[^'()])*)\)")
+
+# A value of a row: a quoted string in the first group, or any other literal in the second group.
+VALUE_PATTERN = re.compile(r"'((?:[^'\\]|\\.)*)'|([^,]+)")
+
+# A backslash escape sequence in a quoted string.
+ESCAPE_PATTERN = re.compile(r"\\(.)")
+
+# Characters of the MySQL escape sequences that do not stand for themselves.
+ESCAPED_CHARACTERS = {
+    "0": "\0",
+    "b": "\b",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "Z": "\x1a",
+}
+
+SqlValue = str | int | float | None
+
+
+def _sql_value(quoted_string: str | None, literal: str | None) -> SqlValue:
+    if quoted_string is not None:
+        if "\\" not in quoted_string:
+            return quoted_string
+        return ESCAPE_PATTERN.sub(
+            lambda match: ESCAPED_CHARACTERS.get(match[1], match[1]), quoted_string
+        )
+
+    assert literal is not None
+    if literal == "NULL":
+        return None
+    try:
+        return int(literal)
+    except ValueError:
+        return float(literal)
+
+
+class SqlDumpReader:
+    """
+    A streaming reader of the rows of a table in a MySQL dump, such as the `page`, `categorylinks` and `pagelinks`
+    dumps of the Wikimedia Foundation.
+
+    The columns of the table are read from its `CREATE TABLE` statement, so that rows can be read by column name
+    whatever the version of the MediaWiki schema the dump was made with.
+    """
+
+    def __init__(self, sql_file: TextIO):
+        """
+        :param sql_file: the dump, positioned at its start
+        """
+        self.__sql_file = sql_file
+        self.__first_insert_line: str | None = None
+        self.columns = self.__read_columns()
+
+    def __read_columns(self) -> tuple[str, ...]:
+        """Read the dump up to its first `INSERT` statement and return the columns of its `CREATE TABLE` statement."""
+
+        columns: list[str] = []
+        in_create_table = False
+        for line in self.__sql_file:
+            if line.startswith("INSERT INTO"):
+                self.__first_insert_line = line
+                break
+            if line.startswith("CREATE TABLE"):
+                in_create_table = True
+            elif in_create_table:
+                column_definition = COLUMN_DEFINITION_PATTERN.match(line)
+                if column_definition is None:
+                    in_create_table = False
+                else:
+                    columns.append(column_definition[1])
+        return tuple(columns)
+
+    def __insert_lines(self) -> Iterator[str]:
+        if self.__first_insert_line is not None:
+            yield self.__first_insert_line
+            self.__first_insert_line = None
+        for line in self.__sql_file:
+            if line.startswith("INSERT INTO"):
+                yield line
+
+    def column_index(self, column: str) -> int:
+        """
+        Return the index of a column in the rows of the dump.
+
+        :raise ValueError if the table has no such column
+        """
+
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            msg = f"the dumped table has no column {column}: {', '.join(self.columns)}"
+            raise ValueError(msg) from None
+
+    def rows(self) -> Iterator[tuple[SqlValue, ...]]:
+        """Yield the rows of the dump, one `INSERT` statement in memory at a time."""
+
+        for insert_line in self.__insert_lines():
+            _, _, values = insert_line.partition(" VALUES ")
+            for row in ROW_PATTERN.finditer(values):
+                yield tuple(
+                    _sql_value(value[1], value[2])
+                    for value in VALUE_PATTERN.finditer(row[1])
+                )
@@ -0,0 +1,193 @@
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from threading import Event, Lock, Thread, get_ident
+from types import FrameType, TracebackType
+from typing import Any
+
+from tap_wikipedia.models.types import Profiler
+
+# File in the profile directory that holds the statistics of the deterministic profiler, readable by `pstats`.
+PSTATS_FILE_NAME = "sync.pstats"
+
+# File in the profile directory that holds the stacks sampled by the sampling profiler, one per line in the collapsed
+# format that flame graph tools such as `flamegraph.pl` and speedscope read.
+COLLAPSED_STACKS_FILE_NAME = "sync.collapsed"
+
+# Number of frames of the traceback stored for each memory allocation traced by `tracemalloc`.
+TRACEMALLOC_FRAME_COUNT = 25
+
+# Number of allocation sites logged with each `tracemalloc` snapshot.
+TRACEMALLOC_TOP_SITE_COUNT = 10
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SyncProfiler:
+    """
+    Runs a sync under a profiler, taking periodic `tracemalloc` snapshots, and writes the results to a directory.
+
+    The deterministic profiler profiles every thread with `cProfile` and writes their merged statistics to
+    `PSTATS_FILE_NAME`. The sampling profiler samples the stacks of every thread every `sampling_interval_s` and
+    writes how often each stack was seen to `COLLAPSED_STACKS_FILE_NAME`, which slows the sync down much less.
+
+    Each `tracemalloc` snapshot is dumped to a numbered `.snapshot` file, readable by `tracemalloc.Snapshot.load`,
+    and the allocation sites that grew the most since the previous snapshot are logged.
+    """
+
+    def __init__(
+        self,
+        *,
+        profile_directory_path: Path,
+        profiler: Profiler | None = None,
+        sampling_interval_s: float = 0.005,
+        tracemalloc_snapshot_interval_s: float | None = None,
+    ):
+        """
+        :param profile_directory_path: directory that the results are written to
+        :param profiler: profiler to run the sync under, or None for no profiler
+        :param sampling_interval_s: seconds between two stack samples of the sampling profiler
+        :param tracemalloc_snapshot_interval_s: seconds between two `tracemalloc` snapshots, or None for no snapshots
+        """
+        self.__collapsed_stacks: Counter[str] = Counter()
+        self.__logger = logging.getLogger(self.__class__.__name__)
+        self.__profile_directory_path = profile_directory_path
+        self.__profiler = profiler
+        self.__profiles: list[cProfile.Profile] = []
+        self.__profiles_lock = Lock()
+        self.__sampling_interval_s = sampling_interval_s
+        self.__stopped = Event()
+        self.__threads: list[Thread] = []
+        self.__tracemalloc_snapshot: tracemalloc.Snapshot | None = None
+        self.__tracemalloc_snapshot_count = 0
+        self.__tracemalloc_snapshot_interval_s = tracemalloc_snapshot_interval_s
+
+    def __enter__(self) -> "SyncProfiler":
+        self.__profile_directory_path.mkdir(parents=True, exist_ok=True)
+        self.__logger.info(
+            "writing the profile of the sync to %s", self.__profile_directory_path
+        )
+
+        if self.__tracemalloc_snapshot_interval_s is not None:
+            tracemalloc.start(TRACEMALLOC_FRAME_COUNT)
+            self.__start_thread(
+                self.__take_tracemalloc_snapshots, "tracemalloc snapshots"
+            )
+
+        if self.__profiler == Profiler.DETERMINISTIC:
+            # Threads started from now on profile themselves with a profiler of their own.
+            threading.setprofile(self.__profile_thread)
+            self.__profile_thread()
+        elif self.__profiler == Profiler.SAMPLING:
+            self.__start_thread(self.__sample_stacks, "stack sampling")
+
+        return self
+
+    def __exit__(
+        self,
+        exception_type: type[BaseException] | None,
+        exception: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.__profiler == Profiler.DETERMINISTIC:
+            threading.setprofile(None)  # type: ignore[arg-type]
+
+        self.__stopped.set()
+        for thread in self.__threads:
+            thread.join()
+
+        if self.__profiler == Profiler.DETERMINISTIC:
+            self.__write_pstats()
+        elif self.__profiler == Profiler.SAMPLING:
+            self.__write_collapsed_stacks()
+
+        if self.__tracemalloc_snapshot_interval_s is not None:
+            self.__take_tracemalloc_snapshot()
+            tracemalloc.stop()
+
+    def __profile_thread(self, *args: Any) -> None:  # noqa: ANN401, ARG002
+        """Start profiling the current thread, replacing the hook that `threading.setprofile` installed in it."""
+
+        profile = cProfile.Profile()
+        with self.__profiles_lock:
+            self.__profiles.append(profile)
+        profile.enable()
+
+    def __sample_stacks(self) -> None:
+        sampling_thread_id = get_ident()
+        while not self.__stopped.wait(self.__sampling_interval_s):
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id == sampling_thread_id:
+                    continue
+                stack: list[str] = []
+                current_frame: FrameType | None = frame
+                while current_frame is not None:
+                    stack.append(_frame_label(current_frame))
+                    current_frame = current_frame.f_back
+                self.__collapsed_stacks[";".join(reversed(stack))] += 1
+
+    def __start_thread(self, target: Any, name: str) -> None:  # noqa: ANN401
+        thread = Thread(target=target, name=name, daemon=True)
+        self.__threads.append(thread)
+        thread.start()
+
+    def __take_tracemalloc_snapshot(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern=tracemalloc.__file__
+                ),
+                tracemalloc.Filter(
+                    inclusive=False, filename_pattern="<frozen importlib._bootstrap>"
+                ),
+            )
+        )
+        self.__tracemalloc_snapshot_count += 1
+        snapshot_file_path = (
+            self.__profile_directory_path
+            / f"tracemalloc-{self.__tracemalloc_snapshot_count:04d}.snapshot"
+        )
+        snapshot.dump(str(snapshot_file_path))
+
+        statistics = (
+            snapshot.compare_to(self.__tracemalloc_snapshot, "lineno")
+            if self.__tracemalloc_snapshot is not None
+            else snapshot.statistics("lineno")
+        )
+        self.__logger.info(
+            "tracemalloc snapshot %s, top allocation sites:\n%s",
+            snapshot_file_path,
+            "\n".join(
+                str(statistic) for statistic in statistics[:TRACEMALLOC_TOP_SITE_COUNT]
+            ),
+        )
+        self.__tracemalloc_snapshot = snapshot
+
+    def __take_tracemalloc_snapshots(self) -> None:
+        assert self.__tracemalloc_snapshot_interval_s is not None
+        while not self.__stopped.wait(self.__tracemalloc_snapshot_interval_s):
+            self.__take_tracemalloc_snapshot()
+
+    def __write_collapsed_stacks(self) -> None:
+        with (self.__profile_directory_path / COLLAPSED_STACKS_FILE_NAME).open(
+            "w"
+        ) as collapsed_stacks_file:
+            for stack, sample_count in self.__collapsed_stacks.most_common():
+                collapsed_stacks_file.write(f"{stack} {sample_count}\n")
+
+    def __write_pstats(self) -> None:
+        with self.__profiles_lock:
+            profiles = list(self.__profiles)
+        for profile in profiles:
+            profile.disable()
+        # Threads that never ran any Python code after starting have no statistics.
+        stats = pstats.Stats(*(profile for profile in profiles if profile.getstats()))
+        stats.dump_stats(self.__profile_directory_path / PSTATS_FILE_NAME)
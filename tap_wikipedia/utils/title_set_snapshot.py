@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from time import time
+
+# Version of the snapshot file format. Snapshots written with another version are ignored.
+SNAPSHOT_VERSION = 1
+
+
+class TitleSetSnapshot:
+    """A set of Wikipedia titles persisted to a JSON file, e.g. the titles of the featured articles."""
+
+    def __init__(self, snapshot_file_path: Path, *, max_age_s: float | None = None):
+        """
+        :param snapshot_file_path: path to the snapshot file
+        :param max_age_s: age in seconds after which the snapshot is stale, or None if it never goes stale
+        """
+        self.__snapshot_file_path = snapshot_file_path
+        self.__max_age_s = max_age_s
+        self.__logger = logging.getLogger(__name__)
+
+    def read(self, *, source_url: str) -> frozenset[str] | None:
+        """
+        Read the titles of the snapshot.
+
+        :param source_url: URL that the titles must have been retrieved from
+        :return the titles, or None if there is no usable snapshot because it is missing, stale, from another source
+        or in another format
+        """
+
+        try:
+            with self.__snapshot_file_path.open(encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.__logger.warning(
+                f"Ignoring unreadable title set snapshot {self.__snapshot_file_path}",
+                exc_info=True,
+            )
+            return None
+
+        if (
+            not isinstance(snapshot, dict)
+            or snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("source_url") != source_url
+        ):
+            return None
+
+        if (
+            self.__max_age_s is not None
+            and time() - snapshot.get("created_at", 0) > self.__max_age_s
+        ):
+            return None
+
+        return frozenset(snapshot.get("titles", ()))
+
+    def write(self, titles: Iterable[str], *, source_url: str) -> None:
+        """
+        Atomically replace the snapshot with `titles`.
+
+        :param titles: titles to persist
+        :param source_url: URL that the titles were retrieved from
+        """
+
+        self.__snapshot_file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file_path = self.__snapshot_file_path.with_name(
+            f"{self.__snapshot_file_path.name}.{os.getpid()}.tmp"
+        )
+        with temporary_file_path.open("w", encoding="utf-8") as temporary_file:
+            json.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "created_at": time(),
+                    "source_url": source_url,
+                    "titles": sorted(titles),
+                },
+                temporary_file,
+            )
+        temporary_file_path.replace(self.__snapshot_file_path)
@@ -0,0 +1,44 @@
+import re
+from itertools import product
+
+# A brace group of a URL pattern: a numeric range such as `{1..27}`, or alternatives such as `{en,de,fr}`.
+BRACE_GROUP_PATTERN = re.compile(r"\{([^{}]*)\}")
+
+# The contents of a numeric range brace group.
+NUMERIC_RANGE_PATTERN = re.compile(r"(\d+)\.\.(\d+)")
+
+
+def _expand_brace_group(brace_group: str) -> tuple[str, ...]:
+    numeric_range = NUMERIC_RANGE_PATTERN.fullmatch(brace_group)
+    if numeric_range is None:
+        return tuple(brace_group.split(","))
+
+    start, end = numeric_range.groups()
+    # A range written with leading zeros, such as `{01..27}`, is zero-padded.
+    width = len(start) if start.startswith("0") else 0
+    step = 1 if int(start) <= int(end) else -1
+    return tuple(
+        str(number).zfill(width) for number in range(int(start), int(end) + step, step)
+    )
+
+
+def expand_url_pattern(url_pattern: str) -> tuple[str, ...]:
+    """
+    Expand the brace groups of a URL pattern the way a shell does, and return the URLs in order.
+
+    For example, `enwiki-latest-abstract{1..3}.xml.gz` expands to `enwiki-latest-abstract1.xml.gz`,
+    `enwiki-latest-abstract2.xml.gz` and `enwiki-latest-abstract3.xml.gz`, and `{en,de}wiki` to `enwiki` and
+    `dewiki`. A URL without brace groups expands to itself.
+    """
+
+    literals = BRACE_GROUP_PATTERN.split(url_pattern)[::2]
+    brace_groups = BRACE_GROUP_PATTERN.findall(url_pattern)
+    return tuple(
+        "".join(
+            literal + expansion
+            for literal, expansion in zip(literals, (*expansions, ""), strict=True)
+        )
+        for expansions in product(
+            *(_expand_brace_group(brace_group) for brace_group in brace_groups)
+        )
+    )
@@ -1,21 +1,59 @@
-from typing import Any
+from collections import deque
+from collections.abc import Container, Iterator
+from typing import Any, BinaryIO
 from xml import sax
+from xml.parsers import expat
 
-from pydantic import AnyUrl
-
-from tap_wikipedia.constants import WikipediaUrl
 from tap_wikipedia.models import wikipedia
+from tap_wikipedia.utils.wikipedia_titles import wikipedia_title_from_url
+
+# Number of bytes read from the abstracts file per parser feed.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+FEED_START_TAG = b"<feed>"
+
+DOC_END_TAG = b"</doc>"
 
 
 class WikipediaAbstractsParser(sax.ContentHandler):
     """SAX Handler for Wikipedia Abstracts."""
 
-    def __init__(self):
-        self.__records: list[wikipedia.Record] = []
-        self.__abstract_info: wikipedia.AbstractInfo | None = None
+    def __init__(
+        self,
+        *,
+        title_allowlist: Container[str] | None = None,
+        resume_offset: int = 0,
+        parse_sublinks: bool = True,
+    ):
+        """
+        :param title_allowlist: normalized titles of the articles to parse, or None to parse every article;
+            the `<doc>` elements of other articles are skipped as soon as their `<url>` ends
+        :param resume_offset: byte offset in the dump before which `<doc>` elements are skipped
+        :param parse_sublinks: build the sublinks of records; otherwise the text of their `<anchor>` and `<link>`
+            elements is skipped and records are left without sublinks
+        """
+        self.__records: deque[wikipedia.CompactRecord] = deque()
+        self.__title_allowlist = title_allowlist
+        self.__record: wikipedia.CompactRecord | None = None
         self.__char_buffer: list[str] = []
-        self.__current_data: str
-        self.__sublinks: list[wikipedia.Sublink]
+        self.__current_data = ""
+        self.__base_offset = 0
+        self.__doc_offset = 0
+        self.__expat_parser: Any = None
+        self.__has_sublinks = False
+        self.__parse_sublinks = parse_sublinks
+        self.__parsed_text_tags = frozenset(
+            (
+                "title",
+                "url",
+                "abstract",
+                *(("anchor", "link") if parse_sublinks else ()),
+            )
+        )
+        self.__resume_offset = resume_offset
+        self.__skipping_doc = False
+        self.__sublinks: list[wikipedia.CompactSublink] = []
+        self.__title = ""
 
     # reset character buffer and return all its contents as a string
     def __flush_char_buffer(self) -> str:
@@ -25,50 +63,122 @@ class WikipediaAbstractsParser(sax.ContentHandler):
 
     # store individual records and reset abstracts dictionary
     def __store_record(self) -> None:
-        if self.__abstract_info and self.__sublinks:
-            self.__records.append(
-                wikipedia.Record(
-                    abstract_info=self.__abstract_info, sublinks=tuple(self.__sublinks)
-                )
-            )
-            self.__abstract_info = None
+        if self.__record and self.__has_sublinks:
+            if self.__parse_sublinks:
+                self.__record.sublinks = tuple(self.__sublinks)
+            self.__records.append(self.__record)
+            self.__record = None
             self.__sublinks = []
 
     # Call when an element starts
     def startElement(self, tag: str, attributes: Any) -> None:  # noqa: ARG002, ANN401
         self.__current_data = tag
         if tag == "doc":
-            self.__abstract_info = wikipedia.AbstractInfo(
-                title="",
-                url=AnyUrl(WikipediaUrl.BASE_URL),
-                abstract="",
+            self.__doc_offset = (
+                self.__base_offset + self.__expat_parser.CurrentByteIndex
             )
+            self.__record = None
+            self.__has_sublinks = False
+            self.__skipping_doc = self.__doc_offset < self.__resume_offset
             self.__sublinks = []
+            self.__title = ""
+
+    # add the anchor or link that ends to the sublinks of the record, unless sublinks are skipped
+    def __end_sublink_element(self, tag: str) -> None:
+        self.__has_sublinks = True
+        if not self.__parse_sublinks:
+            return
+        if tag == "anchor":
+            self.__sublinks.append(
+                wikipedia.CompactSublink(anchor=self.__flush_char_buffer(), link=None)
+            )
+        else:
+            self.__sublinks[-1] = self.__sublinks[-1]._replace(
+                link=self.__flush_char_buffer()
+            )
 
     # Call when an elements ends
     def endElement(self, tag: str) -> None:
-        if self.__abstract_info:
-            if tag == "title":
-                self.__abstract_info.title = self.__flush_char_buffer()
-            elif tag == "url":
-                self.__abstract_info.url = AnyUrl(self.__flush_char_buffer())
-            elif tag == "abstract":
-                self.__abstract_info.abstract = self.__flush_char_buffer()
-            elif tag == "anchor":
-                sublink = wikipedia.Sublink()
-                sublink.anchor = self.__flush_char_buffer()
-                self.__sublinks.append(sublink)
-            elif tag == "link":
-                self.__sublinks[-1].link = self.__flush_char_buffer()
+        if self.__skipping_doc:
+            return
+
+        if tag == "title":
+            self.__title = self.__flush_char_buffer()
+        elif tag == "url":
+            url = self.__flush_char_buffer()
+            if not self.__is_allowed(url):
+                # Skip the rest of the doc without building its models.
+                self.__skipping_doc = True
+                return
+            self.__record = wikipedia.CompactRecord(
+                title=self.__title,
+                url=url,
+                abstract="",
+                dump_offset=self.__doc_offset,
+            )
+        elif self.__record:
+            if tag == "abstract":
+                self.__record.abstract = self.__flush_char_buffer()
+            elif tag in ("anchor", "link"):
+                self.__end_sublink_element(tag)
             elif tag == "doc":
+                # The parser is at the start of the `</doc>` tag.
+                self.__record.dump_length = (
+                    self.__base_offset
+                    + self.__expat_parser.CurrentByteIndex
+                    + len(DOC_END_TAG)
+                    - self.__doc_offset
+                )
                 self.__store_record()
 
+    # return whether the doc with the given URL passes the title allowlist
+    def __is_allowed(self, url: str) -> bool:
+        return (
+            self.__title_allowlist is None
+            or wikipedia_title_from_url(url) in self.__title_allowlist
+        )
+
     # store each chunk of character data within character buffer
     def characters(self, content: str) -> None:
-        if self.__current_data in ("title", "url", "abstract", "anchor", "link"):
+        if not self.__skipping_doc and self.__current_data in self.__parsed_text_tags:
             self.__char_buffer.append(content)
 
-    # return a tuple of Wikipedia records
-    @property
-    def records(self) -> tuple[wikipedia.Record, ...]:
-        return tuple(self.__records)
+    # remove and yield the records that have been completed so far
+    def __pop_records(self) -> Iterator[wikipedia.CompactRecord]:
+        while self.__records:
+            yield self.__records.popleft()
+
+    def parse(
+        self,
+        abstracts_file: BinaryIO,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        doc_offset: int | None = None,
+    ) -> Iterator[wikipedia.CompactRecord]:
+        """
+        Incrementally parse an abstracts file and yield each record as soon as its `</doc>` closes.
+
+        Only `chunk_size` bytes of the file and the records completed within that chunk are held in memory.
+
+        :param doc_offset: if set, `abstracts_file` is positioned at a `<doc>` element that starts at this byte offset
+            in the dump, instead of at the start of the dump; the `dump_offset` of records is relative to the dump
+        """
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.startElement
+        parser.EndElementHandler = self.endElement
+        parser.CharacterDataHandler = self.characters
+        self.__expat_parser = parser
+
+        if doc_offset is not None:
+            # Open the root element that precedes the first `<doc>` in the dump.
+            self.__base_offset = doc_offset - len(FEED_START_TAG)
+            parser.Parse(FEED_START_TAG, False)  # noqa: FBT003
+
+        while chunk := abstracts_file.read(chunk_size):
+            parser.Parse(chunk, False)  # noqa: FBT003
+            yield from self.__pop_records()
+
+        parser.Parse(b"", True)  # noqa: FBT003
+        yield from self.__pop_records()
@@ -0,0 +1,271 @@
+from abc import ABC, abstractmethod
+from functools import cached_property
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+from tap_wikipedia.models.types import HtmlParserBackend
+
+# Elements that never have an end tag.
+VOID_ELEMENTS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+
+# Number of characters fed to the streaming tokenizer at a time.
+FEED_SIZE = 4096
+
+
+class ImageLink(NamedTuple):
+    """The first `mw-file-description` link of an article page."""
+
+    href: str | None
+    src: str | None
+
+
+class CategoryLink(NamedTuple):
+    """A link in the categories block of an article page."""
+
+    href: str | None
+    text: str
+
+
+class WikipediaPageExtractor(ABC):
+    """Extract the elements used by enrichments from the HTML of a Wikipedia article page."""
+
+    @property
+    @abstractmethod
+    def category_links(self) -> tuple[CategoryLink, ...]:
+        """Return the links in the element following the `Help:Category` link."""
+
+    @property
+    @abstractmethod
+    def image_link(self) -> ImageLink | None:
+        """Return the href of the first `mw-file-description` link and the src of its first child element."""
+
+
+class BeautifulSoupWikipediaPageExtractor(WikipediaPageExtractor):
+    """Extract elements from a complete BeautifulSoup tree of an article page."""
+
+    def __init__(self, html: str):
+        # BeautifulSoup is imported on first use, since the package imports this module eagerly.
+        from bs4 import BeautifulSoup
+
+        self.__soup = BeautifulSoup(html, "html.parser")
+
+    @cached_property
+    def category_links(self) -> tuple[CategoryLink, ...]:
+        category_help_link = self.__soup.find("a", {"title": "Help:Category"})
+        if category_help_link is None:
+            return ()
+
+        category_links_element = category_help_link.find_next_sibling()
+        if category_links_element is None:
+            return ()
+
+        return tuple(
+            CategoryLink(
+                href=category_link.get("href"), text=category_link.text.strip()
+            )
+            for category_link in category_links_element.find_all("a")  # type: ignore[union-attr]
+        )
+
+    @cached_property
+    def image_link(self) -> ImageLink | None:
+        file_description_link = self.__soup.find("a", {"class": "mw-file-description"})
+        if file_description_link is None:
+            return None
+
+        image_element = file_description_link.find()  # type: ignore[call-arg]
+        return ImageLink(
+            href=file_description_link.get("href"),  # type: ignore[union-attr, arg-type]
+            src=image_element.get("src") if image_element is not None else None,  # type: ignore[union-attr, arg-type]
+        )
+
+
+class _ElementTokenizer(HTMLParser):
+    """
+    Tokenize HTML starting at the start tag of an element and record what the extractors need.
+
+    `done` becomes True once the element (and, if `include_next_sibling` is set, its next sibling element) has ended,
+    so callers can stop feeding the rest of the page.
+    """
+
+    def __init__(self, *, include_next_sibling: bool):
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self.element_attributes: dict[str, str | None] | None = None
+        self.first_child_attributes: dict[str, str | None] | None = None
+        self.sibling_links: list[CategoryLink] = []
+        self.__depth = 0
+        self.__include_next_sibling = include_next_sibling
+        self.__in_sibling = False
+        self.__sibling_link: tuple[str | None, list[str]] | None = None
+
+    def handle_starttag(
+        self, tag: str, attributes: list[tuple[str, str | None]]
+    ) -> None:
+        if self.done:
+            return
+
+        if self.element_attributes is None:
+            self.element_attributes = dict(attributes)
+        elif self.__depth > 0:
+            if not self.__in_sibling and self.first_child_attributes is None:
+                self.first_child_attributes = dict(attributes)
+            if self.__in_sibling and tag == "a":
+                self.__sibling_link = (dict(attributes).get("href"), [])
+        elif self.__include_next_sibling:
+            self.__in_sibling = True
+        else:
+            self.done = True
+            return
+
+        if tag not in VOID_ELEMENTS:
+            self.__depth += 1
+        elif self.__depth == 0:
+            self.__end_element()
+
+    def handle_startendtag(
+        self, tag: str, attributes: list[tuple[str, str | None]]
+    ) -> None:
+        self.handle_starttag(tag, attributes)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done or tag in VOID_ELEMENTS:
+            return
+
+        if self.__in_sibling and tag == "a" and self.__sibling_link is not None:
+            href, text = self.__sibling_link
+            self.sibling_links.append(
+                CategoryLink(href=href, text="".join(text).strip())
+            )
+            self.__sibling_link = None
+
+        self.__depth -= 1
+        if self.__depth == 0:
+            self.__end_element()
+        elif self.__depth < 0:
+            # The parent element ended without a next sibling.
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self.__sibling_link is not None:
+            self.__sibling_link[1].append(data)
+
+    def __end_element(self) -> None:
+        if self.__in_sibling or not self.__include_next_sibling:
+            self.done = True
+
+
+class StreamingWikipediaPageExtractor(WikipediaPageExtractor):
+    """
+    Extract elements by locating them with substring searches and tokenizing only the HTML around them.
+
+    No tree is built, and tokenizing stops as soon as the needed elements have ended.
+    """
+
+    def __init__(self, html: str):
+        self.__html = html
+
+    def __tokenize_element(
+        self,
+        *,
+        marker: str,
+        tag: str,
+        attribute: str,
+        value: str,
+        include_next_sibling: bool,
+    ) -> _ElementTokenizer | None:
+        """Tokenize the first `tag` element whose `attribute` contains `value`, found near occurrences of `marker`."""
+
+        marker_index = self.__html.find(marker)
+        while marker_index != -1:
+            element_start = self.__html.rfind("<", 0, marker_index)
+            tokenizer = _ElementTokenizer(include_next_sibling=include_next_sibling)
+            if element_start != -1 and self.__html.startswith(tag, element_start + 1):
+                position = element_start
+                while not tokenizer.done and position < len(self.__html):
+                    tokenizer.feed(self.__html[position : position + FEED_SIZE])
+                    position += FEED_SIZE
+                    if (
+                        tokenizer.element_attributes is not None
+                        and not _has_attribute_value(
+                            tokenizer.element_attributes, attribute, value
+                        )
+                    ):
+                        break
+                else:
+                    if tokenizer.element_attributes is not None:
+                        return tokenizer
+            marker_index = self.__html.find(marker, marker_index + 1)
+
+        return None
+
+    @cached_property
+    def category_links(self) -> tuple[CategoryLink, ...]:
+        tokenizer = self.__tokenize_element(
+            marker="Help:Category",
+            tag="a",
+            attribute="title",
+            value="Help:Category",
+            include_next_sibling=True,
+        )
+        return tuple(tokenizer.sibling_links) if tokenizer is not None else ()
+
+    @cached_property
+    def image_link(self) -> ImageLink | None:
+        tokenizer = self.__tokenize_element(
+            marker="mw-file-description",
+            tag="a",
+            attribute="class",
+            value="mw-file-description",
+            include_next_sibling=False,
+        )
+        if tokenizer is None or tokenizer.element_attributes is None:
+            return None
+
+        return ImageLink(
+            href=tokenizer.element_attributes.get("href"),
+            src=(
+                tokenizer.first_child_attributes.get("src")
+                if tokenizer.first_child_attributes is not None
+                else None
+            ),
+        )
+
+
+def _has_attribute_value(
+    attributes: dict[str, str | None], attribute: str, value: str
+) -> bool:
+    """Return whether an attribute equals `value`, or, for `class`, lists it."""
+
+    attribute_value = attributes.get(attribute) or ""
+    if attribute == "class":
+        return value in attribute_value.split()
+    return attribute_value == value
+
+
+def wikipedia_page_extractor(
+    html: str, *, backend: HtmlParserBackend
+) -> WikipediaPageExtractor:
+    """Return an extractor for the HTML of an article page, using the given parser backend."""
+
+    if backend == HtmlParserBackend.STREAMING:
+        return StreamingWikipediaPageExtractor(html)
+    return BeautifulSoupWikipediaPageExtractor(html)
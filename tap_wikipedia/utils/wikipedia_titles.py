@@ -0,0 +1,59 @@
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from tap_wikipedia.constants import WIKI_SUBDIRECTORY
+
+
+def normalize_wikipedia_title(wikipedia_title: str) -> str:
+    """
+    Normalize a Wikipedia title the way MediaWiki does, so that equivalent titles compare equal.
+
+    Underscores become spaces, runs of spaces are collapsed, and the first letter is capitalized.
+    """
+
+    normalized_title = " ".join(wikipedia_title.replace("_", " ").split())
+    return normalized_title[:1].upper() + normalized_title[1:]
+
+
+def wikipedia_title_from_url(url: str) -> str | None:
+    """
+    Return the normalized title of the article a `/wiki/` URL (or URL path) points to.
+
+    :return the title, or None if the URL does not point to an article
+    """
+
+    path = urlsplit(url).path
+    if not path.startswith(WIKI_SUBDIRECTORY):
+        return None
+
+    return normalize_wikipedia_title(unquote(path[len(WIKI_SUBDIRECTORY) :])) or None
+
+
+def wikipedia_base_url(url: str) -> str:
+    """Return the scheme and host of a Wikipedia URL, such as `https://de.wikipedia.org` for a German article."""
+
+    split_url = urlsplit(url)
+    return f"{split_url.scheme}://{split_url.netloc}"
+
+
+def read_wikipedia_titles(titles_file_path: Path) -> frozenset[str]:
+    """
+    Read the normalized titles listed in a text file, one title or `/wiki/` URL per line.
+
+    Blank lines and lines starting with `#` are ignored.
+    """
+
+    titles = set()
+    with titles_file_path.open(encoding="utf-8") as titles_file:
+        for line in titles_file:
+            stripped_line = line.strip()
+            if not stripped_line or stripped_line.startswith("#"):
+                continue
+            title = (
+                wikipedia_title_from_url(stripped_line)
+                if WIKI_SUBDIRECTORY in stripped_line
+                else normalize_wikipedia_title(stripped_line)
+            )
+            if title:
+                titles.add(title)
+    return frozenset(titles)
@@ -2,33 +2,154 @@ from __future__ import annotations
 
 import json
 import logging
-from functools import reduce
-from typing import TYPE_CHECKING
-from xml import sax
-
-from bs4 import BeautifulSoup
+from contextlib import AbstractContextManager, nullcontext
+from copy import deepcopy
+from datetime import datetime, timezone
+from functools import partial, reduce
+from hashlib import blake2b
+from http.client import HTTPException
+from itertools import chain
+from math import ceil
+from threading import Lock
+from time import sleep
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar, cast
+from urllib.error import URLError
+from urllib.parse import quote, urlsplit
+
+from pathvalidate import sanitize_filename
 from pydantic import AnyUrl
-from requests import HTTPError
-from requests_cache import CachedSession
+from requests import HTTPError, RequestException
+from singer_sdk.metrics import get_metrics_logger
 
 from tap_wikipedia.constants import (
+    MEDIA_WIKI_API_PATH,
     WIKI_SUBDIRECTORY,
     WIKIPEDIA_TITLE_PREFIX,
     WikipediaUrl,
 )
-from tap_wikipedia.models import Config, wikipedia
-from tap_wikipedia.models.types import EnrichmentType, NonBlankString
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.models.types import (
+    CacheStorageMode,
+    EnrichmentBackend,
+    EnrichmentType,
+    NonBlankString,
+)
 from tap_wikipedia.models.types import StrippedString as Title
 from tap_wikipedia.models.types import SubsetSpecification
-from tap_wikipedia.utils import FileCache, WikipediaAbstractsParser
+from tap_wikipedia.schemas import load_schema
+from tap_wikipedia.utils import (
+    DumpTitleIndex,
+    EnrichmentCache,
+    FileCache,
+    MediaWikiQueryClient,
+    OfflineEnrichmentIndex,
+    ParallelWikipediaAbstractsParser,
+    PartitionPrefetcher,
+    PipelineMetrics,
+    RecordDigestIndex,
+    TitleSetSnapshot,
+    WikipediaAbstractsParser,
+    batched,
+    concurrent_map,
+    read_wikipedia_titles,
+    record_digest,
+    record_enrichments,
+    set_record_enrichments,
+    wikipedia_base_url,
+    wikipedia_title_from_url,
+)
+from tap_wikipedia.utils.dump_title_index import parse_doc_ranges
+from tap_wikipedia.utils.gzip_seek_index import open_at_uncompressed_offset
+from tap_wikipedia.utils.media_wiki_query_client import MAX_TITLES_PER_QUERY
+from tap_wikipedia.utils.offline_enrichment_index import (
+    CATEGORYLINKS_TABLE,
+    DUMPED_TABLES,
+    LINKTARGET_TABLE,
+    PAGELINKS_TABLE,
+    refers_to_link_targets,
+)
 from tap_wikipedia.wikipedia_stream import WikipediaStream
 
+T = TypeVar("T")
+U = TypeVar("U")
+
+# Enrichments extracted from the HTML of an article page.
+PAGE_ENRICHMENTS = (EnrichmentType.IMAGE_URL, EnrichmentType.CATEGORY)
+
+# Enrichments joined from the offline enrichment index.
+OFFLINE_ENRICHMENTS = (EnrichmentType.CATEGORY, EnrichmentType.EXTERNAL_LINK)
+
+# File in the cache directory that holds the index built from the SQL dumps for offline enrichment.
+OFFLINE_ENRICHMENT_INDEX_FILE_NAME = "offline-enrichment-index.sqlite"
+
+# File in the cache directory that holds the enrichments of articles retrieved by previous syncs.
+ENRICHMENT_CACHE_FILE_NAME = "enrichment-cache.sqlite"
+
+# Number of records looked up in the enrichment cache, and of enrichments stored in it, at a time.
+ENRICHMENT_CACHE_BATCH_SIZE = 1000
+
+# Name of the cache in the cache directory that holds the HTTP responses received while enriching records.
+HTTP_CACHE_NAME = "http-cache"
+
+# Directory in the cache directory that holds the snapshots of article subsets.
+SUBSET_SNAPSHOTS_DIRECTORY_NAME = "subsets"
+
+# File in the cache directory that holds the digests of the records emitted in change data capture mode.
+RECORD_DIGEST_INDEX_FILE_NAME = "record-digests.sqlite"
+
+# Directory in the cache directory that holds the files kept per dump when the stream is partitioned.
+PARTITIONS_DIRECTORY_NAME = "partitions"
+
+# Keys of the bookmarks of a dump in the stream or partition state.
+DUMP_BOOKMARKS = ("dump_identity", "doc_offset", "completed")
+
+# Property of the records emitted for articles removed from the dump.
+SDC_DELETED_AT = "_sdc_deleted_at"
+
+# Wikimedia Commons API that describes the available resolutions of a file.
+COMMONS_FILE_API_URL = "https://api.wikimedia.org/core/v1/commons/file/"
+
+# Wikipedia pages that link to every article of a subset.
+SUBSET_ARTICLES_URLS = {
+    SubsetSpecification.FEATURED: WikipediaUrl.FEATURED_ARTICLES_URL,
+    SubsetSpecification.GOOD: WikipediaUrl.GOOD_ARTICLES_URL,
+}
+
+# `prop` values and parameters of the MediaWiki API query for each enrichment.
+QUERY_API_PROPERTIES: dict[EnrichmentType, dict[str, str]] = {
+    EnrichmentType.IMAGE_URL: {"prop": "pageimages", "piprop": "original"},
+    EnrichmentType.CATEGORY: {
+        "prop": "categories",
+        "cllimit": "max",
+        "clshow": "!hidden",
+    },
+    EnrichmentType.EXTERNAL_LINK: {
+        "prop": "links",
+        "pllimit": "max",
+        "plnamespace": "0",
+    },
+}
+
 if TYPE_CHECKING:
-    from collections.abc import Callable, Iterable
+    from collections.abc import Callable, Iterable, Iterator, Sequence
     from pathlib import Path
 
+    from requests_cache import CachedSession
     from singer_sdk import Tap
 
+    from tap_wikipedia.models import Config
+    from tap_wikipedia.utils import HttpClient, WikipediaPageExtractor
+
+
+class _DumpSyncStart(NamedTuple):
+    """The first item produced for a dump, before its records: what the dump is extracted with."""
+
+    # Bookmarks of the dump, reset if they were written for another version of it.
+    bookmarks: dict
+    # In change data capture mode, the digest index of the dump and the digests of the records yet to be emitted.
+    digest_index: RecordDigestIndex | None
+    changed_record_digests: dict[int | None, tuple[str, bytes]]
+
 
 class WikipediaAbstractsStream(WikipediaStream):
     """
@@ -40,76 +161,393 @@ class WikipediaAbstractsStream(WikipediaStream):
     """
 
     def __init__(self, tap: Tap, wikipedia_config: Config):
+        schema = load_schema("abstracts")
+        if wikipedia_config.change_data_capture_tombstones:
+            schema["properties"][SDC_DELETED_AT] = {
+                "anyOf": [{"type": "string", "format": "date-time"}, {"type": "null"}],
+                "default": None,
+                "title": "Deleted At",
+            }
         super().__init__(
-            tap=tap, name="abstracts", schema=wikipedia.Record.model_json_schema()
+            tap=tap, name="abstracts", schema=schema, wikipedia_config=wikipedia_config
         )
-        self.wikipedia_config = wikipedia_config
-        self.__session = CachedSession("tap_wikipedia_cache")
+        self.STATE_MSG_FREQUENCY = wikipedia_config.state_message_frequency
+        # Number of batches of records waiting in the deferred retry queues of the enrichment stages.
+        self.__deferred_batch_count = 0
+        self.__deferred_batch_count_lock = Lock()
+        self.__offline_enrichment_index_lock = Lock()
+        # Sublinks of the emitted records that the sublinks stream has yet to sync.
+        self.__pending_sublinks: list[dict] = []
+        self.__processed_record_count = 0
+        self.__sublinks_sync_interval = self.STATE_MSG_FREQUENCY
+        self.__partition_prefetcher: (
+            PartitionPrefetcher[dict, _DumpSyncStart | wikipedia.CompactRecord] | None
+        ) = None
+        self.__title_allowlist_lock = Lock()
+        # Metrics are opt-in, since timing each record in each stage adds to the time it takes to produce it.
+        self.__pipeline_metrics = (
+            PipelineMetrics()
+            if wikipedia_config.pipeline_metrics
+            or wikipedia_config.pipeline_metrics_text_file_path is not None
+            else None
+        )
+        # The HTTP session and client are created when a sync first needs them, since discovery does not.
+        self.__http_session: CachedSession | None = None
+        self.__http_client: HttpClient | None = None
+        self.__http_client_lock = Lock()
         self.__logger = logging.getLogger(__name__)
 
-    def __add_categories_to_records(
+    def __add_cached_enrichments(
         self,
-        records: Iterable[wikipedia.Record],
-    ) -> Iterable[wikipedia.Record]:
-        """Enrich Wikipedia records with their categories and yield the records."""
+        records: Iterable[wikipedia.CompactRecord],
+        *,
+        dump_url: str,
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Enrich Wikipedia records from the enrichment cache, or with the enrichment callables on a cache miss,
+        and yield the records.
+
+        Records are looked up in batches of `ENRICHMENT_CACHE_BATCH_SIZE` and then all pass through the enrichment
+        callables, which skip the records that hit the cache, so that the records of the whole stream share their
+        thread pools and deferred retries. The enrichments of the other records are then stored in the cache, in a
+        namespace per backend and wiki, since the same title names different articles on different wikis. Updates
+        are committed in batches, so that the partitions enriched concurrently do not lock each other out.
+        """
 
-        for record in records:
+        enrichments = self.wikipedia_config.enrichments or ()
+        enrichment_callables = self.__select_enrichment_callables(dump_url)
+
+        records = iter(records)
+        first_record = next(records, None)
+        if first_record is None:
+            return
+
+        with EnrichmentCache(
+            self.wikipedia_config.cache_directory_path / ENRICHMENT_CACHE_FILE_NAME,
+            namespace=f"{self.wikipedia_config.enrichment_backend.value}:{urlsplit(first_record.url).netloc}",
+            max_age_s=self.wikipedia_config.enrichment_cache_max_age_s,
+            max_size_bytes=self.wikipedia_config.enrichment_cache_max_size_bytes,
+        ) as enrichment_cache:
+            enriched_records = reduce(
+                lambda x, y: y(x),
+                enrichment_callables,
+                self.__look_up_cached_enrichments(
+                    chain((first_record,), records), enrichment_cache=enrichment_cache
+                ),
+            )
+            # Enrichments are stored once a batch of them is ready, rather than left uncommitted while records are
+            # enriched.
+            uncached_enrichments: list[tuple[str, dict[str, Any]]] = []
             try:
-                categories = self.__get_wikipedia_record_categories(
-                    record.abstract_info.url
+                for record in enriched_records:
+                    if not record.enrichment_cached and not record.enrichment_failed:
+                        uncached_enrichments.append(
+                            (
+                                self.__clean_wikipedia_title(record.title),
+                                record_enrichments(record, enrichments),
+                            )
+                        )
+                        if len(uncached_enrichments) == ENRICHMENT_CACHE_BATCH_SIZE:
+                            self.__store_cached_enrichments(
+                                uncached_enrichments, enrichment_cache=enrichment_cache
+                            )
+                    yield record
+            finally:
+                self.__store_cached_enrichments(
+                    uncached_enrichments, enrichment_cache=enrichment_cache
                 )
-            except HTTPError:
+
+    def __add_enrichments_from_offline_index(
+        self,
+        records: Iterable[wikipedia.CompactRecord],
+        *,
+        dump_url: str,
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Enrich Wikipedia records with the categories and external links joined from the offline enrichment index,
+        and yield the records.
+
+        The index is built from the SQL dumps of the Wikipedia the first time it is needed, and rebuilt when the dumps
+        or the configured subsets change. If the dumps could not be downloaded, the records are enriched from the
+        MediaWiki API instead. Records enriched from the enrichment cache are yielded as they are, and the index is
+        not even built while only such records come.
+        """
+
+        enrichments = self.wikipedia_config.enrichments or ()
+
+        records = iter(records)
+        for first_uncached_record in records:
+            if not first_uncached_record.enrichment_cached:
+                break
+            yield first_uncached_record
+        else:
+            return
+        records = chain((first_uncached_record,), records)
+
+        offline_enrichment_index = self.__get_offline_enrichment_index(dump_url)
+        if offline_enrichment_index is None:
+            yield from self.__add_enrichments_from_query_api(
+                records,
+                enrichments=[
+                    enrichment
+                    for enrichment in enrichments
+                    if enrichment in OFFLINE_ENRICHMENTS
+                ],
+            )
+            return
+
+        with offline_enrichment_index:
+            for record in records:
+                if record.enrichment_cached:
+                    yield record
+                    continue
+
+                title = self.__clean_wikipedia_title(record.title)
+
+                if EnrichmentType.CATEGORY in enrichments:
+                    record.categories = tuple(
+                        wikipedia.CompactCategory(
+                            text=WIKI_SUBDIRECTORY
+                            + quote("Category:" + category, safe=";@$!*(),/~:"),
+                            link=category.replace("_", " "),
+                        )
+                        for category in offline_enrichment_index.get_categories(title)
+                        or ()
+                    )
+
+                if EnrichmentType.EXTERNAL_LINK in enrichments:
+                    record.external_links = tuple(
+                        wikipedia.CompactExternalLink(
+                            title=link.replace("_", " ").title(),
+                            link=wikipedia_base_url(record.url)
+                            + WIKI_SUBDIRECTORY
+                            + link,
+                        )
+                        for link in offline_enrichment_index.get_links(title) or ()
+                    )
+
+                yield record
+
+    def __add_enrichments_from_query_api(
+        self,
+        records: Iterable[wikipedia.CompactRecord],
+        *,
+        enrichments: Sequence[EnrichmentType] | None = None,
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Enrich Wikipedia records with all configured enrichments and yield the records.
+
+        Records are grouped into batches of `MAX_TITLES_PER_QUERY` titles, and each batch is enriched with a single
+        MediaWiki API query (plus its continuations) to the API of the wiki of its records.
+
+        :param enrichments: enrichments to query instead of the configured ones
+        """
+
+        if enrichments is None:
+            enrichments = self.wikipedia_config.enrichments or ()
+        parameters = {
+            "prop": "|".join(
+                QUERY_API_PROPERTIES[enrichment]["prop"] for enrichment in enrichments
+            )
+        }
+        for enrichment in enrichments:
+            parameters.update(
+                {
+                    name: value
+                    for name, value in QUERY_API_PROPERTIES[enrichment].items()
+                    if name != "prop"
+                }
+            )
+
+        def add_enrichments_to_batch(
+            batch: tuple[wikipedia.CompactRecord, ...],
+        ) -> tuple[wikipedia.CompactRecord, ...] | None:
+            titles = [self.__clean_wikipedia_title(record.title) for record in batch]
+            base_url = wikipedia_base_url(batch[0].url)
+            try:
+                pages = MediaWikiQueryClient(
+                    http_client=self.__get_http_client(),
+                    api_url=base_url + MEDIA_WIKI_API_PATH,
+                ).query_pages(titles, parameters=parameters)
+            except RequestException:
                 self.__logger.warning(
-                    f"Error while getting the categories of Wikipedia article: {record.abstract_info.title}",
+                    f"Error while querying the enrichments of Wikipedia articles: {', '.join(titles)}",
                     exc_info=True,
                 )
-                continue
-
-            record.categories = categories
-            yield record
+                return None
+
+            for record, title in zip(batch, titles, strict=True):
+                page = pages.get(title, {})
+
+                if EnrichmentType.IMAGE_URL in enrichments:
+                    record.image_url = (
+                        page["original"]["source"] if "original" in page else None
+                    )
+
+                if EnrichmentType.CATEGORY in enrichments:
+                    record.categories = tuple(
+                        wikipedia.CompactCategory(
+                            text=WIKI_SUBDIRECTORY
+                            + quote(
+                                category["title"].replace(" ", "_"), safe=";@$!*(),/~:"
+                            ),
+                            link=category["title"].partition(":")[2],
+                        )
+                        for category in page.get("categories", [])
+                    )
+
+                if EnrichmentType.EXTERNAL_LINK in enrichments:
+                    record.external_links = tuple(
+                        wikipedia.CompactExternalLink(
+                            title=link["title"].title(),
+                            link=base_url
+                            + WIKI_SUBDIRECTORY
+                            + link["title"].replace(" ", "_"),
+                        )
+                        for link in page.get("links", [])
+                    )
+
+            return batch
+
+        return self.__enrich_batches(
+            self.__batch_uncached_records(records, MAX_TITLES_PER_QUERY),
+            add_enrichments_to_batch,
+        )
 
     def __add_external_links_to_records(
         self,
-        records: Iterable[wikipedia.Record],
-    ) -> Iterable[wikipedia.Record]:
+        records: Iterable[wikipedia.CompactRecord],
+    ) -> Iterable[wikipedia.CompactRecord]:
         """Enrich Wikipedia records with their external links and yield the records."""
 
-        for record in records:
+        def add_external_links_to_record(
+            record: wikipedia.CompactRecord,
+        ) -> wikipedia.CompactRecord | None:
             try:
-                external_links = self.__get_wikipedia_record_external_links(
-                    record.abstract_info.title
-                )
-            except HTTPError:
+                external_links = self.__get_wikipedia_record_external_links(record)
+            except RequestException:
                 self.__logger.warning(
-                    f"Error while getting the external links of Wikipedia article: {record.abstract_info.title}",
+                    f"Error while getting the external links of Wikipedia article: {record.title}",
                     exc_info=True,
                 )
-                continue
+                return None
 
             record.external_links = external_links
-            yield record
+            return record
+
+        return self.__enrich_records(records, add_external_links_to_record)
 
-    def __add_image_url_to_records(
+    def __add_page_enrichments_to_records(
         self,
-        records: Iterable[wikipedia.Record],
-    ) -> Iterable[wikipedia.Record]:
-        """Enrich Wikipedia records with their image URLs and yield the records."""
+        records: Iterable[wikipedia.CompactRecord],
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Enrich Wikipedia records with the image URLs and categories found on their article pages and yield the records.
 
-        for record in records:
+        Each article page is downloaded and parsed once, however many enrichments are extracted from it,
+        with the parser selected by `html_parser_backend`.
+        """
+
+        enrichments = self.wikipedia_config.enrichments or ()
+        if self.wikipedia_config.enrichment_backend == EnrichmentBackend.OFFLINE:
+            enrichments = tuple(
+                enrichment
+                for enrichment in enrichments
+                if enrichment not in OFFLINE_ENRICHMENTS
+            )
+
+        from tap_wikipedia.utils import wikipedia_page_extractor
+
+        def add_page_enrichments_to_record(
+            record: wikipedia.CompactRecord,
+        ) -> wikipedia.CompactRecord | None:
             try:
-                img_url = self.__get_wikipedia_record_image_url(
-                    record.abstract_info.url
+                page_extractor = wikipedia_page_extractor(
+                    self.__get_http_client().get(record.url).text,
+                    backend=self.wikipedia_config.html_parser_backend,
                 )
 
-            except HTTPError:
+                if EnrichmentType.IMAGE_URL in enrichments:
+                    record.image_url = self.__get_wikipedia_record_image_url(
+                        page_extractor
+                    )
+
+                if EnrichmentType.CATEGORY in enrichments:
+                    record.categories = self.__get_wikipedia_record_categories(
+                        page_extractor
+                    )
+            except RequestException:
                 self.__logger.warning(
-                    f"Error while getting the image URL of Wikipedia article: {record.abstract_info.title}",
+                    f"Error while getting the page enrichments of Wikipedia article: {record.title}",
                     exc_info=True,
                 )
-                continue
+                return None
+
+            return record
+
+        return self.__enrich_records(records, add_page_enrichments_to_record)
+
+    def __are_sublinks_selected(self) -> bool:
+        """Return whether the sublinks of records are synced by a selected child stream."""
+
+        return any(child_stream.selected for child_stream in self.child_streams)
+
+    def __batch_uncached_records(
+        self, records: Iterable[wikipedia.CompactRecord], batch_size: int
+    ) -> Iterable[tuple[wikipedia.CompactRecord, ...]]:
+        """
+        Group records into batches of up to `batch_size` records that were not enriched from the enrichment cache,
+        together with the cached records among them, and at most `ENRICHMENT_CACHE_BATCH_SIZE` records in all.
+        """
+
+        batch: list[wikipedia.CompactRecord] = []
+        uncached_record_count = 0
+        for record in records:
+            batch.append(record)
+            if not record.enrichment_cached:
+                uncached_record_count += 1
+            if (
+                uncached_record_count == batch_size
+                or len(batch) == ENRICHMENT_CACHE_BATCH_SIZE
+            ):
+                yield tuple(batch)
+                batch = []
+                uncached_record_count = 0
+        if batch:
+            yield tuple(batch)
+
+    def __bookmark_records(
+        self, records: Iterable[wikipedia.CompactRecord], *, bookmarks: dict
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Bookmark the `<doc>` offset of each record in the bookmarks of its dump just before the record is yielded.
 
-            record.abstract_info.imageUrl = img_url
+        Before the last record is yielded, the dump is bookmarked as completed instead, so that the state written
+        after that record marks the end of the sync. Offsets are only bookmarked when records are yielded in dump
+        order and none wait in a deferred retry queue of any partition, since otherwise records before the offset may
+        not have been emitted yet.
+        """
+
+        in_dump_order = self.wikipedia_config.enrichment_in_order and (
+            self.wikipedia_config.parse_worker_count == 1
+            or self.wikipedia_config.parse_in_dump_order
+        )
+        if not in_dump_order:
+            self.__logger.warning(
+                "Records are not emitted in dump order, so an interrupted sync restarts at the first doc"
+            )
+
+        records_iterator = iter(records)
+        record = next(records_iterator, None)
+        while record is not None:
+            next_record = next(records_iterator, None)
+            if next_record is None:
+                bookmarks.pop("doc_offset", None)
+                bookmarks["completed"] = True
+            elif in_dump_order and not self.__deferred_batch_count:
+                bookmarks["doc_offset"] = record.dump_offset
             yield record
+            record = next_record
 
     def __clean_wikipedia_title(self, wikipedia_title: Title) -> Title:
         """Remove `WIKIPEDIA_TITLE_PREFIX` from a Wikipedia title."""
@@ -120,119 +558,574 @@ class WikipediaAbstractsStream(WikipediaStream):
         return wikipedia_title
 
     def __clean_wikipedia_titles(
-        self, records: Iterable[wikipedia.Record]
-    ) -> Iterable[wikipedia.Record]:
+        self, records: Iterable[wikipedia.CompactRecord]
+    ) -> Iterable[wikipedia.CompactRecord]:
         """Remove unwanted text from the titles of Wikipedia articles."""
 
         for record in records:
-            record.abstract_info.title = self.__clean_wikipedia_title(
-                record.abstract_info.title
-            )
+            record.title = self.__clean_wikipedia_title(record.title)
             yield record
 
-    def __get_featured_articles_urls(self) -> tuple[AnyUrl, ...]:
-        """Retrieve URLs of featured Wikipedia articles."""
+    def __close_partition_prefetcher(self) -> None:
+        """Cancel the production of the partitions that were not emitted."""
 
-        featured_articles_urls = [
-            cleaned_url
-            for cleaned_url in (
-                str(url.get("href"))
-                for url in BeautifulSoup(
-                    self.__session.get(WikipediaUrl.FEATURED_ARTICLES_URL).text,
-                    "html.parser",
-                ).findAll("a")
+        if self.__partition_prefetcher is not None:
+            self.__partition_prefetcher.close()
+            self.__partition_prefetcher = None
+
+    def __count_deferred_batches(self, batch_count: int) -> None:
+        """Add to the number of batches waiting in deferred retry queues, which partitions update concurrently."""
+
+        with self.__deferred_batch_count_lock:
+            self.__deferred_batch_count += batch_count
+
+    def __emit_records(
+        self, records: Iterable[wikipedia.CompactRecord], *, bookmarks: dict
+    ) -> Iterable[tuple[dict, wikipedia.CompactRecord]]:
+        """
+        Bookmark transformed records, and yield each as a Singer dict with the record.
+
+        The sublinks of each record, if they were parsed, are left pending for the sublinks stream.
+        """
+
+        sample_rate = self.wikipedia_config.record_validation_sample_rate
+
+        for record_index, record in enumerate(
+            self.__bookmark_records(records, bookmarks=bookmarks)
+        ):
+            # Validate the first record and then one in every 1 / `sample_rate` records against the published schema.
+            if ceil(record_index * sample_rate) < ceil(
+                (record_index + 1) * sample_rate
+            ):
+                record.to_record()
+                record.to_sublink_records()
+            self.__pending_sublinks.extend(record.to_sublink_singer_dicts())
+            yield record.to_singer_dict(), record
+
+    def __enrich_batches(
+        self,
+        batches: Iterable[tuple[wikipedia.CompactRecord, ...]],
+        enrich_batch: Callable[
+            [tuple[wikipedia.CompactRecord, ...]],
+            tuple[wikipedia.CompactRecord, ...] | None,
+        ],
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Apply `enrich_batch` to the records of up to `enrichment_max_concurrency` batches at a time that were not
+        enriched from the enrichment cache, and yield the records of each enriched batch.
+
+        Batches that `enrich_batch` could not enrich are deferred to a retry queue instead of being dropped. The queue
+        is retried once every other batch has been enriched, up to `enrichment_deferred_retries` times,
+        `enrichment_deferred_retry_delay_s` seconds apart. The records of batches that still could not be enriched are
+        yielded without their enrichments, marked with `enrichment_failed`.
+        """
+
+        deferred_batches: list[tuple[wikipedia.CompactRecord, ...]] = []
+
+        def enrich_uncached_records(
+            batch: tuple[wikipedia.CompactRecord, ...],
+        ) -> tuple[
+            tuple[wikipedia.CompactRecord, ...], tuple[wikipedia.CompactRecord, ...]
+        ]:
+            uncached_records = tuple(
+                record for record in batch if not record.enrichment_cached
             )
-            if cleaned_url[: len(WIKI_SUBDIRECTORY)] == WIKI_SUBDIRECTORY
-        ]
+            if uncached_records and enrich_batch(uncached_records) is None:
+                return batch, uncached_records
+            return batch, ()
+
+        def enrich_or_defer_batches(
+            batches: Iterable[tuple[wikipedia.CompactRecord, ...]],
+        ) -> Iterable[wikipedia.CompactRecord]:
+            for batch, failed_records in concurrent_map(
+                enrich_uncached_records,
+                batches,
+                max_concurrency=self.wikipedia_config.enrichment_max_concurrency,
+                ordered=self.wikipedia_config.enrichment_in_order,
+            ):
+                if failed_records:
+                    deferred_batches.append(failed_records)
+                    self.__count_deferred_batches(1)
+                    yield from (record for record in batch if record.enrichment_cached)
+                else:
+                    yield from batch
 
-        featured_articles_urls.sort()
+        yield from enrich_or_defer_batches(batches)
 
-        return tuple(
-            AnyUrl(WikipediaUrl.BASE_URL + featured_article_url)
-            for featured_article_url in featured_articles_urls
+        for retry in range(1, self.wikipedia_config.enrichment_deferred_retries + 1):
+            if not deferred_batches:
+                return
+
+            self.__logger.info(
+                f"Retrying the enrichment of {len(deferred_batches)} deferred batches of Wikipedia records in {self.wikipedia_config.enrichment_deferred_retry_delay_s} seconds (retry {retry} of {self.wikipedia_config.enrichment_deferred_retries})"
+            )
+            sleep(self.wikipedia_config.enrichment_deferred_retry_delay_s)
+            retried_batches = tuple(deferred_batches)
+            deferred_batches.clear()
+            self.__count_deferred_batches(-len(retried_batches))
+            yield from enrich_or_defer_batches(retried_batches)
+
+        for batch in deferred_batches:
+            self.__logger.warning(
+                f"Emitting Wikipedia records without their enrichments after retries failed: {', '.join(record.title for record in batch)}"
+            )
+            self.__count_deferred_batches(-1)
+            for record in batch:
+                record.enrichment_failed = True
+                yield record
+
+    def __enrich_records(
+        self,
+        records: Iterable[wikipedia.CompactRecord],
+        enrich_record: Callable[
+            [wikipedia.CompactRecord], wikipedia.CompactRecord | None
+        ],
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Apply `enrich_record` to up to `enrichment_max_concurrency` records at a time and yield the enriched records.
+
+        Records that `enrich_record` could not enrich are deferred and retried, as by `__enrich_batches`.
+        """
+
+        return self.__enrich_batches(
+            self.__batch_uncached_records(records, 1),
+            lambda batch: batch if enrich_record(batch[0]) is not None else None,
         )
 
-    def __get_featured_records(
+    def __get_changed_records(
         self,
-        records: Iterable[wikipedia.Record],
-    ) -> Iterable[wikipedia.Record]:
-        """Retrieve a list of featured Wikipedia article URLs and yield records that match the URLs."""
+        records: Iterable[wikipedia.CompactRecord],
+        *,
+        digest_index: RecordDigestIndex,
+        changed_record_digests: dict[int | None, tuple[str, bytes]],
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Yield the records that are new or changed since the last sync that emitted them.
 
-        featured_articles_urls = self.__get_featured_articles_urls()
+        The title and digest of each yielded record are kept in `changed_record_digests`, by `dump_offset`, until the
+        record is emitted and its digest can be stored.
+        """
 
         for record in records:
-            if record.abstract_info.url in featured_articles_urls:
+            digest = record_digest(record)
+            if digest_index.mark_seen(
+                title=record.title, url=record.url, digest=digest
+            ):
+                changed_record_digests[record.dump_offset] = (record.title, digest)
                 yield record
 
+    def __get_dump_identity(
+        self, file_cache: FileCache, dump_url: str
+    ) -> dict[str, str | None]:
+        """Return the URL and version of a cached abstracts dump, as reported by the server that served it."""
+
+        headers = file_cache.get_file_headers(dump_url) or {}
+        return {
+            "url": dump_url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+        }
+
+    def __get_dump_records(
+        self,
+        dump_url: str,
+        *,
+        bookmarks: dict,
+        produced_items: Iterable[_DumpSyncStart | wikipedia.CompactRecord],
+    ) -> Iterable[dict]:
+        """
+        Emit the records produced for an abstracts dump by `__produce_dump_records` as Singer dicts, bookmarking them
+        in `bookmarks`.
+
+        In change data capture mode, the digests of the records emitted with their enrichments are stored, and unless
+        the sync of the dump was resumed, a tombstone is emitted for each article removed from it.
+        """
+
+        produced_items_iterator = iter(produced_items)
+        dump_sync_start = next(produced_items_iterator, None)
+        if dump_sync_start is None:
+            return
+
+        assert isinstance(dump_sync_start, _DumpSyncStart)
+        for bookmark in DUMP_BOOKMARKS:
+            bookmarks.pop(bookmark, None)
+            if bookmark in dump_sync_start.bookmarks:
+                bookmarks[bookmark] = dump_sync_start.bookmarks[bookmark]
+        if bookmarks.get("completed"):
+            self.__logger.info(
+                f"Skipping Wikipedia dump {dump_url} because it was completely extracted by a previous sync"
+            )
+            return
+
+        records = cast("Iterator[wikipedia.CompactRecord]", produced_items_iterator)
+        emit_records = self.__instrument_stage(
+            "emit", partial(self.__emit_records, bookmarks=bookmarks)
+        )
+        digest_index = dump_sync_start.digest_index
+        if digest_index is None:
+            yield from (record_dict for record_dict, _ in emit_records(records))
+            return
+
+        with digest_index:
+            for record_dict, record in emit_records(records):
+                yield record_dict
+                title, digest = dump_sync_start.changed_record_digests.pop(
+                    record.dump_offset
+                )
+                # A record emitted without its enrichments is emitted again by the next sync.
+                if not record.enrichment_failed:
+                    digest_index.store_digest(title=title, digest=digest)
+
+            # Titles that an interrupted sync saw before the resumed sync started would look removed.
+            if "doc_offset" not in dump_sync_start.bookmarks:
+                yield from self.__get_tombstones(digest_index)
+
+    def __get_http_client(self) -> HttpClient:
+        """Return the client that enrichment requests are sent with, creating it on first use."""
+
+        from tap_wikipedia.utils import HttpClient
+
+        with self.__http_client_lock:
+            if self.__http_client is None:
+                self.__http_client = HttpClient(
+                    session=self.__get_http_session(),
+                    max_concurrency=self.wikipedia_config.enrichment_max_concurrency,
+                    max_concurrency_per_host=self.wikipedia_config.enrichment_max_concurrency_per_host,
+                    max_requests_per_second_per_host=self.wikipedia_config.enrichment_max_requests_per_second_per_host,
+                    max_attempts=self.wikipedia_config.enrichment_max_request_attempts,
+                    metrics=self.__pipeline_metrics,
+                )
+            return self.__http_client
+
+    def __get_http_session(self) -> CachedSession:
+        """
+        Return the session that caches the responses to enrichment requests, opening its cache on first use.
+
+        It is first used with the HTTP client lock held, or before any partition is produced in another thread.
+        """
+
+        from requests_cache import NEVER_EXPIRE, CachedSession
+
+        if self.__http_session is None:
+            self.__http_session = CachedSession(
+                str(self.wikipedia_config.cache_directory_path / HTTP_CACHE_NAME),
+                expire_after=(
+                    self.wikipedia_config.enrichment_cache_max_age_s
+                    if self.wikipedia_config.enrichment_cache_max_age_s is not None
+                    else NEVER_EXPIRE
+                ),
+            )
+        return self.__http_session
+
+    def __get_offline_enrichment_dumps_url_prefix(self, dump_url: str) -> str:
+        """Return the URL prefix of the SQL dumps of a wiki, published beside its abstracts dump unless configured otherwise."""
+
+        return (
+            self.wikipedia_config.offline_enrichment_dumps_url_prefix
+            or dump_url.rpartition("abstract")[0]
+        )
+
+    def __get_offline_enrichment_index(
+        self, dump_url: str
+    ) -> OfflineEnrichmentIndex | None:
+        """
+        Return the offline enrichment index of the wiki of an abstracts dump, building it if it does not exist or was
+        built from other dumps or subsets, or None if the SQL dumps could not be downloaded.
+
+        The SQL dumps are cached compressed, since the index is built in a single streaming pass over each of them.
+        Partitions of the same wiki share its index, which the first of them builds while the others wait.
+        """
+
+        dumps_url_prefix = self.__get_offline_enrichment_dumps_url_prefix(dump_url)
+        with self.__offline_enrichment_index_lock:
+            return self.__get_offline_enrichment_index_from_dumps(dumps_url_prefix)
+
+    def __get_offline_enrichment_index_from_dumps(
+        self, dumps_url_prefix: str
+    ) -> OfflineEnrichmentIndex | None:
+        """
+        Return the offline enrichment index of the SQL dumps at a URL prefix, building it if it is out of date, or
+        None if the dumps could not be downloaded.
+
+        The `linktarget` dump is only downloaded, and part of the identity of the index, if the `categorylinks` or
+        `pagelinks` dump refers to it.
+        """
+
+        def get_dump_url(table: str) -> str:
+            return f"{dumps_url_prefix}{table}.sql.gz"
+
+        dump_file_paths: dict[str, Path] = {}
+
+        def get_dump_file_path(table: str) -> Path:
+            if table not in dump_file_paths:
+                dump_file_paths[table] = FileCache(
+                    cache_dir_path=self.wikipedia_config.cache_directory_path,
+                    cached_file_stem=table,
+                    max_age_s=self.wikipedia_config.cache_max_age_s,
+                    storage_mode=CacheStorageMode.COMPRESSED,
+                    metrics=self.__pipeline_metrics,
+                ).get_file(get_dump_url(table), file_extension=".sql")
+            return dump_file_paths[table]
+
+        try:
+            for table in DUMPED_TABLES:
+                get_dump_file_path(table)
+            if any(
+                refers_to_link_targets(get_dump_file_path(table))
+                for table in (CATEGORYLINKS_TABLE, PAGELINKS_TABLE)
+            ):
+                get_dump_file_path(LINKTARGET_TABLE)
+        except (HTTPException, URLError):
+            self.__logger.warning(
+                f"Error while downloading the SQL dumps from {dumps_url_prefix}, enriching from the MediaWiki API instead",
+                exc_info=True,
+            )
+            return None
+
+        dump_identities = {}
+        for table in dump_file_paths:
+            headers = (
+                FileCache(
+                    cache_dir_path=self.wikipedia_config.cache_directory_path
+                ).get_file_headers(get_dump_url(table))
+                or {}
+            )
+            dump_identities[table] = {
+                "url": get_dump_url(table),
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+            }
+
+        title_allowlist = self.__get_title_allowlist()
+        source = json.dumps(
+            {
+                "dumps": dump_identities,
+                "title_allowlist": (
+                    blake2b(
+                        "\n".join(sorted(title_allowlist)).encode(), digest_size=16
+                    ).hexdigest()
+                    if title_allowlist is not None
+                    else None
+                ),
+            },
+            sort_keys=True,
+        )
+
+        index_file_path = self.__get_partition_cache_file_path(
+            dumps_url_prefix, OFFLINE_ENRICHMENT_INDEX_FILE_NAME
+        )
+        if OfflineEnrichmentIndex.read_source(index_file_path) != source:
+            self.__logger.info(
+                f"Building the offline enrichment index {index_file_path} from the SQL dumps"
+            )
+            OfflineEnrichmentIndex.build(
+                index_file_path,
+                get_dump_file_path=get_dump_file_path,
+                source=source,
+                title_allowlist=title_allowlist,
+            )
+        return OfflineEnrichmentIndex(index_file_path)
+
+    def __get_partition_cache_file_path(self, url: str, file_name: str) -> Path:
+        """
+        Return the path of a file in the cache directory that is kept per dump, or per wiki of dumps, named by its URL.
+
+        The file is directly in the cache directory when the stream is not partitioned.
+        """
+
+        if self.wikipedia_config.abstracts_dump_urls is None:
+            return self.wikipedia_config.cache_directory_path / file_name
+
+        return (
+            self.wikipedia_config.cache_directory_path
+            / PARTITIONS_DIRECTORY_NAME
+            / sanitize_filename(url)
+            / file_name
+        )
+
+    def __get_subset_article_titles(
+        self, subset_specification: SubsetSpecification
+    ) -> frozenset[str]:
+        """
+        Return the normalized titles of the articles in a subset.
+
+        The titles of the Featured and Good subsets are scraped from their pages of the English Wikipedia, the only
+        wiki the configuration accepts them for, and kept in a snapshot in the cache directory, which is reused until it
+        is older than `subset_snapshot_max_age_s`.
+        """
+
+        if subset_specification == SubsetSpecification.TITLE_ALLOWLIST:
+            return read_wikipedia_titles(
+                self.wikipedia_config.subset_title_allowlist_path  # type: ignore[arg-type]
+            )
+
+        subset_articles_url = SUBSET_ARTICLES_URLS[subset_specification]
+        snapshot = TitleSetSnapshot(
+            self.wikipedia_config.cache_directory_path
+            / SUBSET_SNAPSHOTS_DIRECTORY_NAME
+            / f"{subset_specification.value.lower()}.json",
+            max_age_s=self.wikipedia_config.subset_snapshot_max_age_s,
+        )
+        subset_article_titles = snapshot.read(source_url=subset_articles_url)
+        if subset_article_titles is not None:
+            return subset_article_titles
+
+        from bs4 import BeautifulSoup
+
+        subset_article_titles = frozenset(
+            title
+            for title in (
+                wikipedia_title_from_url(str(url.get("href")))
+                for url in BeautifulSoup(
+                    self.__get_http_client().get(subset_articles_url).text,
+                    "html.parser",
+                ).find_all("a")
+            )
+            if title is not None
+        )
+        snapshot.write(subset_article_titles, source_url=subset_articles_url)
+        return subset_article_titles
+
+    def __get_tombstones(self, digest_index: RecordDigestIndex) -> Iterable[dict]:
+        """
+        Remove the titles that are no longer in the dump from the digest index.
+
+        If `change_data_capture_tombstones` is set, yield a record for each, marked deleted with `_sdc_deleted_at`.
+        """
+
+        deleted_at = datetime.now(tz=timezone.utc).isoformat()  # noqa: UP017
+        for title, url in digest_index.pop_removed_titles():
+            if not self.wikipedia_config.change_data_capture_tombstones:
+                continue
+            yield {
+                **wikipedia.CompactRecord(
+                    title=(
+                        self.__clean_wikipedia_title(title)
+                        if self.wikipedia_config.clean_wikipedia_title
+                        else title
+                    ),
+                    url=url,
+                    abstract="",
+                ).to_singer_dict(),
+                SDC_DELETED_AT: deleted_at,
+            }
+
+    def __get_title_allowlist(self) -> frozenset[str] | None:
+        """
+        Return the normalized titles of the articles in any of the configured subsets.
+
+        :return the titles, or None if no subset is configured and every article is extracted
+        """
+
+        if not self.wikipedia_config.subset_specifications:
+            return None
+
+        # Partitions read the subsets concurrently, and would otherwise scrape and snapshot them concurrently.
+        with self.__title_allowlist_lock:
+            return frozenset().union(
+                *(
+                    self.__get_subset_article_titles(subset_specification)
+                    for subset_specification in self.wikipedia_config.subset_specifications
+                )
+            )
+
     def __get_wikipedia_records(
-        self, cached_file_path: Path
-    ) -> Iterable[wikipedia.Record]:
-        """Parse Wikipedia abstracts and return a tuple of Wikipedia records."""
+        self, cached_file_path: Path, *, bookmarked_doc_offset: int | None = None
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Parse Wikipedia abstracts and yield each Wikipedia record as soon as it is parsed.
 
-        # Setup parser
-        parser = sax.make_parser()  # noqa: S317
-        parser.setFeature(sax.handler.feature_namespaces, 0)
+        Articles outside the configured subsets are skipped by the parser before their records are built, and so are
+        sublinks unless the sublinks stream is selected. If the dump has a title index, only the `<doc>` elements of
+        the articles in the subsets are read and parsed; otherwise a parse of the whole dump builds its title index.
+        If `bookmarked_doc_offset` is set, parsing starts right after the `<doc>` element at that offset.
+        """
+
+        title_allowlist = self.__get_title_allowlist()
+        parse_sublinks = self.__are_sublinks_selected()
+        has_title_index = (
+            self.wikipedia_config.dump_title_index
+            and DumpTitleIndex.exists(cached_file_path)
+        )
 
-        # Instantiate SAX Handler and run parser
-        handler = WikipediaAbstractsParser()
-        parser.setContentHandler(handler)
-        parser.parse(cached_file_path)
+        if has_title_index and title_allowlist is not None:
+            with DumpTitleIndex(cached_file_path) as dump_title_index:
+                doc_ranges = [
+                    doc_range
+                    for doc_range in dump_title_index.get_doc_ranges(title_allowlist)
+                    if bookmarked_doc_offset is None
+                    or doc_range.offset > bookmarked_doc_offset
+                ]
+            self.__logger.info(
+                f"Parsing {len(doc_ranges)} articles of {cached_file_path} found in its title index"
+            )
+            yield from parse_doc_ranges(
+                cached_file_path, doc_ranges, parse_sublinks=parse_sublinks
+            )
+            return
 
-        return handler.records
+        records = self.__parse_wikipedia_records(
+            cached_file_path,
+            title_allowlist=title_allowlist,
+            bookmarked_doc_offset=bookmarked_doc_offset,
+            parse_sublinks=parse_sublinks,
+        )
+        if (
+            self.wikipedia_config.dump_title_index
+            and not has_title_index
+            and title_allowlist is None
+            and bookmarked_doc_offset is None
+        ):
+            records = DumpTitleIndex.build(cached_file_path, records)
+        yield from records
 
     def __get_wikipedia_record_categories(
-        self, wikipedia_article_url: AnyUrl
-    ) -> tuple[wikipedia.Category, ...]:
-        """Return a tuple of a Wikipedia article's categories."""
+        self, page_extractor: WikipediaPageExtractor
+    ) -> tuple[wikipedia.CompactCategory, ...]:
+        """Return a tuple of a Wikipedia article's categories, given an extractor of its article page."""
 
         return tuple(
-            wikipedia.Category(
-                text=category_item.get("href"), link=category_item.text.strip()
-            )
-            for category_item in BeautifulSoup(  # type: ignore[union-attr]
-                self.__session.get(str(wikipedia_article_url)).text, "html.parser"
-            )
-            .find("a", {"title": "Help:Category"})
-            .find_next_sibling()
-            .findAll("a")
+            wikipedia.CompactCategory(text=category_link.href, link=category_link.text)
+            for category_link in page_extractor.category_links
         )
 
     def __get_wikipedia_record_external_links(
-        self, wikipedia_title: Title
-    ) -> tuple[wikipedia.ExternalLink, ...]:
-        """Return a tuple of external Wikipedia article links on a Wikipedia page."""
+        self, record: wikipedia.CompactRecord
+    ) -> tuple[wikipedia.CompactExternalLink, ...]:
+        """Return a tuple of external Wikipedia article links on the Wikipedia page of a record, from the API of its wiki."""
 
+        base_url = wikipedia_base_url(record.url)
         return tuple(
-            wikipedia.ExternalLink(
+            wikipedia.CompactExternalLink(
                 title=wikipedia_json["*"].title(),
-                link=WikipediaUrl.WIKI_SUBDIRECTORY_URL
+                link=base_url
+                + WIKI_SUBDIRECTORY
                 + wikipedia_json["*"].replace(" ", "_"),
             )
-            for wikipedia_json in self.__session.get(
-                url=WikipediaUrl.MEDIA_WIKI_API,
+            for wikipedia_json in self.__get_http_client()
+            .get(
+                url=base_url + MEDIA_WIKI_API_PATH,
                 params={
                     "action": "parse",
-                    "page": self.__clean_wikipedia_title(wikipedia_title),
+                    "page": self.__clean_wikipedia_title(record.title),
                     "format": "json",
                 },
-            ).json()["parse"]["links"]
+            )
+            .json()["parse"]["links"]
             if wikipedia_json["ns"] == 0
         )
 
     def __get_wikipedia_record_image_url(
-        self, wikipedia_article_url: AnyUrl
-    ) -> AnyUrl | None:
-        """Retrieve the ImageURL of a Wikipedia record."""
+        self, page_extractor: WikipediaPageExtractor
+    ) -> str | None:
+        """Retrieve the ImageURL of a Wikipedia record, given an extractor of its article page."""
 
         img_url = None
-        soup = BeautifulSoup(
-            self.__session.get(str(wikipedia_article_url)).text, "html.parser"
-        )
-
-        file_description_element = soup.find("a", {"class": "mw-file-description"})
+        file_description = None
+        image_link = page_extractor.image_link
 
-        if file_description_element:
-            file_description = file_description_element["href"][len(WIKI_SUBDIRECTORY) :]  # type: ignore[index]
+        if image_link:
+            file_description = image_link.href[len(WIKI_SUBDIRECTORY) :]  # type: ignore[index]
 
         # Get a better resolution of the Wikipedia image.
         if file_description:
@@ -242,50 +1135,306 @@ class WikipediaAbstractsStream(WikipediaStream):
             )
 
         # If no better resolution is found, use existing image url on Wikipedia page.
-        if img_url is None:
-            image_url = str(
-                soup.find(  # type: ignore[union-attr, assignment]
-                    "a", {"class": "mw-file-description"}
+        if img_url is None and image_link:
+            img_url = AnyUrl("https://" + str(image_link.src))
+
+        return str(img_url) if img_url is not None else None
+
+    def __instrument_stage(
+        self,
+        stage: str,
+        transform: Callable[[Iterable[T]], Iterable[U]],
+    ) -> Callable[[Iterable[T]], Iterable[U]]:
+        """Return a stage of the pipeline that counts its records and time in the pipeline metrics, if they are enabled."""
+
+        if self.__pipeline_metrics is None:
+            return transform
+        return self.__pipeline_metrics.instrument_stage(stage, transform)
+
+    def __look_up_cached_enrichments(
+        self,
+        records: Iterable[wikipedia.CompactRecord],
+        *,
+        enrichment_cache: EnrichmentCache,
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """
+        Look up records in the enrichment cache in batches of `ENRICHMENT_CACHE_BATCH_SIZE`, set the enrichments of
+        the records that have every configured enrichment in it and mark them with `enrichment_cached`, and yield the
+        records.
+        """
+
+        enrichments = self.wikipedia_config.enrichments or ()
+        for batch in batched(records, ENRICHMENT_CACHE_BATCH_SIZE):
+            titles = [self.__clean_wikipedia_title(record.title) for record in batch]
+            cached_enrichments = enrichment_cache.get(titles)
+            enrichment_cache.commit()
+
+            for record, title in zip(batch, titles, strict=True):
+                record_cached_enrichments = cached_enrichments.get(title)
+                if record_cached_enrichments is not None and all(
+                    enrichment.value in record_cached_enrichments
+                    for enrichment in enrichments
+                ):
+                    set_record_enrichments(record, record_cached_enrichments)
+                    record.enrichment_cached = True
+                yield record
+
+    def __parse_wikipedia_records(
+        self,
+        cached_file_path: Path,
+        *,
+        title_allowlist: frozenset[str] | None,
+        bookmarked_doc_offset: int | None,
+        parse_sublinks: bool,
+    ) -> Iterable[wikipedia.CompactRecord]:
+        """Parse the whole of a cached abstracts dump, or the part after `bookmarked_doc_offset`, and yield its records."""
+
+        resume_offset = (
+            bookmarked_doc_offset + 1 if bookmarked_doc_offset is not None else 0
+        )
+
+        if self.wikipedia_config.parse_worker_count > 1:
+            if ParallelWikipediaAbstractsParser.can_parse(cached_file_path):
+                yield from ParallelWikipediaAbstractsParser(
+                    worker_count=self.wikipedia_config.parse_worker_count,
+                    ordered=self.wikipedia_config.parse_in_dump_order,
+                    title_allowlist=title_allowlist,
+                    resume_offset=resume_offset,
+                    parse_sublinks=parse_sublinks,
+                ).parse(cached_file_path)
+                return
+
+            self.__logger.warning(
+                f"Parsing {cached_file_path} in a single process because it is compressed without a seek index"
+            )
+
+        if cached_file_path.suffix == ".gz":
+            abstracts_file = open_at_uncompressed_offset(
+                cached_file_path, bookmarked_doc_offset or 0
+            )
+        else:
+            abstracts_file = cached_file_path.open("rb")
+            abstracts_file.seek(bookmarked_doc_offset or 0)
+
+        with abstracts_file:
+            yield from WikipediaAbstractsParser(
+                title_allowlist=title_allowlist,
+                resume_offset=resume_offset,
+                parse_sublinks=parse_sublinks,
+            ).parse(abstracts_file, doc_offset=bookmarked_doc_offset)
+
+    def __produce_dump_records(
+        self, dump_url: str, *, bookmarks: dict
+    ) -> Iterable[_DumpSyncStart | wikipedia.CompactRecord]:
+        """
+        Download an abstracts dump, and yield what it is extracted with, followed by its records, parsed and
+        transformed by the enhancer callables.
+
+        The records may be produced in another thread than the one that emits them, so `bookmarks` is a copy of the
+        bookmarks of the dump. Nothing is yielded if the dump could not be downloaded.
+        """
+
+        file_cache = FileCache(
+            cache_dir_path=self.wikipedia_config.cache_directory_path,
+            max_age_s=self.wikipedia_config.cache_max_age_s,
+            storage_mode=self.wikipedia_config.cache_storage_mode,
+            metrics=self.__pipeline_metrics,
+        )
+        try:
+            with self.__time_stage("download"):
+                cached_file_path = file_cache.get_file(dump_url)
+        except (HTTPException, URLError):
+            self.__logger.warning(
+                f"Error while downloading Wikipedia dump from {dump_url}",
+                exc_info=True,
+            )
+            return
+
+        bookmarks = self.__read_bookmarks(
+            bookmarks,
+            dump_url=dump_url,
+            dump_identity=self.__get_dump_identity(file_cache, dump_url),
+        )
+        if bookmarks.get("completed"):
+            yield _DumpSyncStart(bookmarks, None, {})
+            return
+
+        digest_index = (
+            RecordDigestIndex(
+                self.__get_partition_cache_file_path(
+                    dump_url, RECORD_DIGEST_INDEX_FILE_NAME
                 )
-                .findChild()
-                .get("src", None)
+            )
+            if self.wikipedia_config.change_data_capture
+            else None
+        )
+        changed_record_digests: dict[int | None, tuple[str, bytes]] = {}
+        # The records are emitted with a reference to the digest index of their own, so that the index stays open
+        # until both the records are produced, or their production is cancelled, and they are emitted.
+        with digest_index or nullcontext():
+            yield _DumpSyncStart(
+                bookmarks,
+                digest_index.share() if digest_index is not None else None,
+                changed_record_digests,
             )
 
-            img_url = AnyUrl("https://" + image_url)
+            records = self.__get_wikipedia_records(
+                cached_file_path, bookmarked_doc_offset=bookmarks.get("doc_offset")
+            )
+            if self.__pipeline_metrics is not None:
+                records = self.__pipeline_metrics.instrument_source("parse", records)
+            if digest_index is not None:
+                records = self.__instrument_stage(
+                    "change_data_capture",
+                    partial(
+                        self.__get_changed_records,
+                        digest_index=digest_index,
+                        changed_record_digests=changed_record_digests,
+                    ),
+                )(records)
+            yield from reduce(
+                lambda x, y: y(x), self.__select_enhancer_callables(dump_url), records
+            )
 
-        return img_url
+    def __read_bookmarks(
+        self,
+        bookmarks: dict,
+        *,
+        dump_url: str,
+        dump_identity: dict[str, str | None],
+    ) -> dict:
+        """
+        Return the bookmarks of a dump, resetting them if they were written for another version of it.
+
+        The bookmarks hold the identity of the dump, and either the offset of the `<doc>` element of the last record
+        emitted (`doc_offset`) or whether all of the dump's records were emitted (`completed`).
+        """
+
+        if bookmarks.get("dump_identity") != dump_identity:
+            if "dump_identity" in bookmarks:
+                self.__logger.info(
+                    f"Extracting Wikipedia dump {dump_url} from the start because it changed since the previous sync"
+                )
+            for bookmark in ("doc_offset", "completed"):
+                bookmarks.pop(bookmark, None)
+            bookmarks["dump_identity"] = dump_identity
+        return bookmarks
+
+    def __report_pipeline_metrics(self) -> None:
+        """
+        Log the pipeline metrics of the sync as Singer METRIC messages, and write them to
+        `pipeline_metrics_text_file_path` if it is configured.
+        """
+
+        if self.__pipeline_metrics is None:
+            return
+
+        self.__pipeline_metrics.log(get_metrics_logger(), stream=self.name)
+        if self.wikipedia_config.pipeline_metrics_text_file_path is not None:
+            self.__pipeline_metrics.write_prometheus_text_file(
+                self.wikipedia_config.pipeline_metrics_text_file_path,
+                stream=self.name,
+            )
 
     def __select_enhancer_callables(
-        self,
-    ) -> tuple[Callable[[Iterable[wikipedia.Record]], Iterable[wikipedia.Record]], ...]:
+        self, dump_url: str
+    ) -> tuple[
+        Callable[
+            [Iterable[wikipedia.CompactRecord]], Iterable[wikipedia.CompactRecord]
+        ],
+        ...,
+    ]:
         """
         Return a tuple of callables that will be used to transform records.
 
-        Callables are selected based on values in `wikipedia_config`.
+        Callables are selected based on values in `wikipedia_config`, for the records of the dump at `dump_url`.
         """
 
         callables: list[
-            Callable[[Iterable[wikipedia.Record]], Iterable[wikipedia.Record]]
+            Callable[
+                [Iterable[wikipedia.CompactRecord]], Iterable[wikipedia.CompactRecord]
+            ]
         ] = []
 
-        if self.wikipedia_config.subset_specifications:
-            for specification in self.wikipedia_config.subset_specifications:
-                if specification == SubsetSpecification.FEATURED:
-                    callables.extend([self.__get_featured_records])
+        enrichment_callables = self.__select_enrichment_callables(dump_url)
+        if enrichment_callables and self.wikipedia_config.enrichment_cache:
+            callables.append(
+                self.__instrument_stage(
+                    "enrichment_cache",
+                    partial(self.__add_cached_enrichments, dump_url=dump_url),
+                )
+            )
+        else:
+            callables.extend(enrichment_callables)
 
-        if self.wikipedia_config.enrichments:
-            for enrichment in self.wikipedia_config.enrichments:
-                if enrichment == EnrichmentType.IMAGE_URL:
-                    callables.append(self.__add_image_url_to_records)
+        if self.wikipedia_config.clean_wikipedia_title:
+            callables.append(
+                self.__instrument_stage("title_cleaning", self.__clean_wikipedia_titles)
+            )
 
-                if enrichment == EnrichmentType.CATEGORY:
-                    callables.append(self.__add_categories_to_records)
+        return tuple(callables)
 
-                if enrichment == EnrichmentType.EXTERNAL_LINK:
-                    callables.append(self.__add_external_links_to_records)
+    def __select_enrichment_callables(
+        self, dump_url: str
+    ) -> tuple[
+        Callable[
+            [Iterable[wikipedia.CompactRecord]], Iterable[wikipedia.CompactRecord]
+        ],
+        ...,
+    ]:
+        """Return a tuple of callables that will be used to enrich records, based on `enrichments` and `enrichment_backend`."""
+
+        if not self.wikipedia_config.enrichments:
+            return ()
+
+        if self.wikipedia_config.enrichment_backend == EnrichmentBackend.QUERY_API:
+            return (
+                self.__instrument_stage(
+                    "query_api_enrichment", self.__add_enrichments_from_query_api
+                ),
+            )
 
-        if self.wikipedia_config.clean_wikipedia_title:
-            callables.append(self.__clean_wikipedia_titles)
+        callables: list[
+            Callable[
+                [Iterable[wikipedia.CompactRecord]], Iterable[wikipedia.CompactRecord]
+            ]
+        ] = []
+
+        if self.wikipedia_config.enrichment_backend == EnrichmentBackend.OFFLINE:
+            callables.append(
+                self.__instrument_stage(
+                    "offline_enrichment",
+                    partial(
+                        self.__add_enrichments_from_offline_index, dump_url=dump_url
+                    ),
+                )
+            )
+            # Image URLs are not in the SQL dumps, so they are still found on the article pages.
+            if EnrichmentType.IMAGE_URL in self.wikipedia_config.enrichments:
+                callables.append(
+                    self.__instrument_stage(
+                        "page_enrichment", self.__add_page_enrichments_to_records
+                    )
+                )
+            return tuple(callables)
+
+        page_enrichment_stage_added = False
+        for enrichment in self.wikipedia_config.enrichments:
+            # Enrichments found on the article page share a single stage, added at the first of them.
+            if enrichment in PAGE_ENRICHMENTS and not page_enrichment_stage_added:
+                page_enrichment_stage_added = True
+                callables.append(
+                    self.__instrument_stage(
+                        "page_enrichment", self.__add_page_enrichments_to_records
+                    )
+                )
+
+            if enrichment == EnrichmentType.EXTERNAL_LINK:
+                callables.append(
+                    self.__instrument_stage(
+                        "external_link_enrichment", self.__add_external_links_to_records
+                    )
+                )
 
         return tuple(callables)
 
@@ -298,11 +1447,14 @@ class WikipediaAbstractsStream(WikipediaStream):
         `minimum_image_width` is used as a guide to select the best image from the API.
         """
 
-        base_url = "https://api.wikimedia.org/core/v1/commons/file/"
-        url = base_url + file_description
+        url = COMMONS_FILE_API_URL + file_description
 
         response = dict(
-            json.loads(self.__session.get(url, headers={"User-agent": "Imlapps"}).text)
+            json.loads(
+                self.__get_http_client()
+                .get(url, headers={"User-agent": "Imlapps"})
+                .text
+            )
         )
 
         display_title = response.get("title", "")
@@ -334,23 +1486,141 @@ class WikipediaAbstractsStream(WikipediaStream):
             )
         return selected_image_url
 
-    def get_records(self, context: dict | None) -> Iterable[dict]:  # noqa: ARG002
-        """Generate a stream of Wikipedia records."""
+    def __store_cached_enrichments(
+        self,
+        uncached_enrichments: list[tuple[str, dict[str, Any]]],
+        *,
+        enrichment_cache: EnrichmentCache,
+    ) -> None:
+        """Store the enrichments of records by title in the enrichment cache, commit them, and clear the list."""
+
+        for title, title_enrichments in uncached_enrichments:
+            enrichment_cache.put(title, title_enrichments)
+        enrichment_cache.commit()
+        uncached_enrichments.clear()
+
+    def __time_stage(self, stage: str) -> AbstractContextManager:
+        """Return a context manager that adds the time spent in it to a stage of the pipeline metrics, if enabled."""
+
+        if self.__pipeline_metrics is None:
+            return nullcontext()
+        return self.__pipeline_metrics.time_stage(stage)
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """Return a partition for each of the `abstracts_dump_urls`, or None if they are not configured."""
+
+        if self.wikipedia_config.abstracts_dump_urls is None:
+            return None
+
+        return [
+            {"dump_url": dump_url}
+            for dump_url in self.wikipedia_config.abstracts_dump_urls
+        ]
+
+    def get_child_context(
+        self,
+        record: dict,  # noqa: ARG002
+        context: dict | None,
+    ) -> dict | None:
+        """
+        Return the context the sublinks stream syncs the pending sublinks with, or None to leave them pending.
+
+        Pending sublinks are synced after each record the Singer SDK writes a STATE message after, and after the last
+        record of a dump, so that the sublinks of the records a STATE message bookmarks are emitted before it.
+
+        The SDK exposes neither when it writes STATE messages nor a way to sync child streams after only some records,
+        so this counts records as `Stream._sync_records` of the Singer SDK 0.31 that the tap is pinned to does, and
+        `_sync_children` is overridden. The test suite checks the SDK version and that the two stay in step.
+        """
+
+        self.__processed_record_count += 1
+        if not self.__pending_sublinks:
+            return None
+        if (
+            self.__processed_record_count % self.__sublinks_sync_interval
+            and not self.get_context_state(context).get("completed")
+        ):
+            return None
+        return context or {"dump_url": self.wikipedia_config.abstracts_dump_url}
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:
+        """
+        Generate a stream of Wikipedia records, from the dump of a partition if the stream is partitioned.
+
+        A sync of the same dump as the previous, interrupted sync resumes after the last record that sync emitted.
+        Partitions are emitted one after the other, but the records of up to `partition_max_concurrency` partitions,
+        starting with the one emitted, are downloaded, parsed and enriched concurrently in background threads. The
+        records of a partition beyond the first `partition_max_buffered_records` that wait to be emitted are spilled to
+        a temporary file in the cache directory.
+        """
+
+        if self.__partition_prefetcher is None:
+            # Count records from the start of the sync, as the Singer SDK 0.31 does to write a STATE message every
+            # `state_message_frequency` records, or once per batch.
+            batch_config = self.get_batch_config(self.config)
+            self.__processed_record_count = 0
+            self.__sublinks_sync_interval = (
+                batch_config.batch_size if batch_config else self.STATE_MSG_FREQUENCY
+            )
+            if self.wikipedia_config.enrichments:
+                # Keep the HTTP cache from growing with responses older than the enrichment cache's entries.
+                self.__get_http_session().cache.delete(expired=True)
+
+        if context is None:
+            dump_url = self.wikipedia_config.abstracts_dump_url
+            yield from self.__get_dump_records(
+                dump_url,
+                bookmarks=self.stream_state,
+                produced_items=self.__produce_dump_records(
+                    dump_url, bookmarks=deepcopy(self.stream_state)
+                ),
+            )
+            self.__report_pipeline_metrics()
+            return
+
+        partitions = self.partitions or []
+        if self.__partition_prefetcher is None:
+            self.__partition_prefetcher = PartitionPrefetcher(
+                partitions,
+                lambda partition: self.__produce_dump_records(
+                    partition["dump_url"],
+                    bookmarks=deepcopy(self.get_context_state(partition)),
+                ),
+                max_concurrency=self.wikipedia_config.partition_max_concurrency,
+                max_buffered_items=self.wikipedia_config.partition_max_buffered_records,
+                spill_directory_path=self.wikipedia_config.cache_directory_path
+                / PARTITIONS_DIRECTORY_NAME,
+            )
 
         try:
-            cached_file_path = FileCache(
-                cache_dir_path=self.wikipedia_config.cache_directory_path
-            ).get_file(self.wikipedia_config.abstracts_dump_url)
-        except HTTPError:
-            self.__logger.warning(
-                f"Error while downloading Wikipedia dump from {self.wikipedia_config.abstracts_dump_url}",
-                exc_info=True,
+            yield from self.__get_dump_records(
+                context["dump_url"],
+                bookmarks=self.get_context_state(context),
+                produced_items=self.__partition_prefetcher.consume(context),
             )
+        except BaseException:
+            self.__close_partition_prefetcher()
+            raise
 
-        # Apply callables to records and yield.
-        for record in reduce(
-            lambda x, y: y(x),
-            self.__select_enhancer_callables(),
-            self.__get_wikipedia_records(cached_file_path),
-        ):
-            yield record.model_dump()
+        if context == partitions[-1]:
+            self.__close_partition_prefetcher()
+            self.__report_pipeline_metrics()
+
+    def pop_pending_sublinks(self) -> list[dict]:
+        """Return the sublinks of the emitted records that the sublinks stream has yet to sync, and clear them."""
+
+        pending_sublinks, self.__pending_sublinks = self.__pending_sublinks, []
+        return pending_sublinks
+
+    def _sync_children(self, child_context: dict | None) -> None:
+        """
+        Sync the child streams after the records that `get_child_context` returns a context for, and only then.
+
+        The Singer SDK 0.31 that the tap is pinned to calls this hook after every record with the context that
+        `get_child_context` returned, and has no public way to sync child streams after only some records: it logs a
+        warning for each record it is given no context for. The test suite checks this behavior of the SDK.
+        """
+
+        if child_context is not None:
+            super()._sync_children(child_context)
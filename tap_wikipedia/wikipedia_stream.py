@@ -1,10 +1,73 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from singer_sdk import Stream
+from singer_sdk.helpers._batch import BatchConfig, JSONLinesEncoding, StorageTarget
+
+from tap_wikipedia.models.types import BatchFormat
+from tap_wikipedia.utils import ParquetBatcher, ParquetEncoding
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from singer_sdk import Tap
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding
+
+    from tap_wikipedia.models import Config
+
+# Directory in the cache directory that holds the batch files, unless `batch_directory_path` is configured.
+BATCH_DIRECTORY_NAME = "batches"
 
 
 class WikipediaStream(Stream):
     """Tap stream for Wikipedia data."""
 
-    def __init__(self, *args, **kwargs):  # noqa: ANN002, ANN003
-        super().__init__(*args, **kwargs)
+    def __init__(self, *, tap: Tap, name: str, schema: dict, wikipedia_config: Config):
+        super().__init__(tap=tap, name=name, schema=schema)
+        self.wikipedia_config = wikipedia_config
+
+    def get_batch_config(self, config: Mapping) -> BatchConfig | None:
+        """
+        Return the configuration of the BATCH messages of the stream, or None for it to emit RECORD messages.
+
+        With `batch_format`, records are written to gzipped JSON Lines or Parquet files of `batch_size` records in
+        `batch_directory_path`. Otherwise the Singer SDK's own `batch_config`, if any, is used.
+        """
+
+        if self.wikipedia_config.batch_format is None:
+            return super().get_batch_config(config)
+
+        batch_directory_path = (
+            self.wikipedia_config.batch_directory_path
+            or self.wikipedia_config.cache_directory_path / BATCH_DIRECTORY_NAME
+        )
+        return BatchConfig(
+            encoding=(
+                ParquetEncoding(compression="snappy")
+                if self.wikipedia_config.batch_format == BatchFormat.PARQUET
+                else JSONLinesEncoding(compression="gzip")
+            ),
+            storage=StorageTarget(root=batch_directory_path.absolute().as_uri()),
+            batch_size=self.wikipedia_config.batch_size,
+        )
+
+    def get_batches(
+        self, batch_config: BatchConfig, context: dict | None = None
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write the records of the stream to batch files, and yield the encoding and manifest of each batch."""
+
+        if not isinstance(batch_config.encoding, ParquetEncoding):
+            yield from super().get_batches(batch_config, context)
+            return
+
+        batcher = ParquetBatcher(
+            tap_name=self.tap_name,
+            stream_name=self.name,
+            batch_config=batch_config,
+            json_schema=self.schema,
+        )
+        for manifest in batcher.get_batches(
+            records=self._sync_records(context, write_messages=False)
+        ):
+            yield batch_config.encoding, manifest
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from tap_wikipedia.schemas import load_schema
+from tap_wikipedia.wikipedia_abstracts_stream import WikipediaAbstractsStream
+from tap_wikipedia.wikipedia_stream import WikipediaStream
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from singer_sdk import Tap
+
+    from tap_wikipedia.models import Config
+
+
+class WikipediaSublinksStream(WikipediaStream):
+    """
+    A child stream of the abstracts stream, with a record for each sublink of an article, keyed by the article's URL.
+
+    Sublinks are only parsed when this stream is selected. The abstracts stream keeps the sublinks of the records it
+    emits pending, and syncs this stream to emit them at each of its STATE messages.
+    """
+
+    parent_stream_type = WikipediaAbstractsStream
+
+    def __init__(
+        self,
+        tap: Tap,
+        wikipedia_config: Config,
+        abstracts_stream: WikipediaAbstractsStream,
+    ):
+        super().__init__(
+            tap=tap,
+            name="sublinks",
+            schema=load_schema("sublinks"),
+            wikipedia_config=wikipedia_config,
+        )
+        self.__abstracts_stream = abstracts_stream
+        self.primary_keys = ["url", "anchor"]
+        # Keep a single bookmark, instead of one per context the abstracts stream syncs this stream with.
+        self.state_partitioning_keys = []
+
+    def get_records(self, context: dict | None) -> Iterable[dict]:  # noqa: ARG002
+        """Yield the sublinks of the records emitted by the abstracts stream since this stream was last synced."""
+
+        yield from self.__abstracts_stream.pop_pending_sublinks()
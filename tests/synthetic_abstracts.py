@@ -0,0 +1,19 @@
+"""Synthetic Wikipedia abstracts dumps for tests."""
+
+
+def abstracts_xml(doc_count: int, *, language: str = "en") -> bytes:
+    """Return a synthetic abstracts dump of the Wikipedia in `language`, with `doc_count` documents."""
+
+    docs = "".join(
+        f"""<doc>
+<title>Wikipedia: Article {doc_index}</title>
+<url>https://{language}.wikipedia.org/wiki/Article_{doc_index}</url>
+<abstract>Abstract of article {doc_index}.</abstract>
+<links>
+<sublink linktype="nav"><anchor>Section {doc_index}</anchor><link>https://{language}.wikipedia.org/wiki/Article_{doc_index}#Section</link></sublink>
+</links>
+</doc>
+"""
+        for doc_index in range(doc_count)
+    )
+    return f"<feed>\n{docs}</feed>\n".encode()
@@ -0,0 +1,44 @@
+"""Synthetic Wikimedia SQL dumps for tests."""
+
+from collections.abc import Iterable
+
+SqlValue = str | int | None
+
+
+def _sql_literal(value: SqlValue) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, int):
+        return str(value)
+    escaped_value = value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
+    return f"'{escaped_value}'"
+
+
+def sql_dump(
+    table: str,
+    columns: tuple[str, ...],
+    rows: Iterable[tuple[SqlValue, ...]],
+    *,
+    rows_per_insert: int = 3,
+) -> bytes:
+    """Return a synthetic MySQL dump of a table, laid out like the dumps of the Wikimedia Foundation."""
+
+    column_definitions = "".join(
+        f"  `{column}` varbinary(255) NOT NULL,\n" for column in columns
+    )
+    lines = [
+        "-- MySQL dump 10.19",
+        f"DROP TABLE IF EXISTS `{table}`;",
+        f"CREATE TABLE `{table}` (\n{column_definitions}  PRIMARY KEY (`{columns[0]}`)\n) ENGINE=InnoDB;",
+        f"LOCK TABLES `{table}` WRITE;",
+    ]
+    row_list = list(rows)
+    for insert_start in range(0, len(row_list), rows_per_insert):
+        values = ",".join(
+            "(" + ",".join(_sql_literal(value) for value in row) + ")"
+            for row in row_list[insert_start : insert_start + rows_per_insert]
+        )
+        # The statement is written to a dump file for the reader under test, and never run.
+        lines.append(f"INSERT INTO `{table}` VALUES {values};")  # noqa: S608
+    lines.append("UNLOCK TABLES;")
+    return ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,102 @@
+"""Tests for converting compact Wikipedia records to the published schema."""
+
+import json
+
+import pytest
+from pydantic import AnyUrl
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.models.wikipedia.compact_record import (
+    NORMALIZED_URL_PATTERN,
+    normalize_url,
+)
+
+COMPACT_RECORD = wikipedia.CompactRecord(
+    title="Wikipedia: Café",
+    url="https://en.wikipedia.org/wiki/Café",
+    abstract="A café is an establishment.",
+    sublinks=(
+        wikipedia.CompactSublink(
+            anchor="History", link="https://en.wikipedia.org/wiki/Café#History"
+        ),
+    ),
+    image_url="https://upload.wikimedia.org/wikipedia/commons/cafe.jpg",
+    categories=(
+        wikipedia.CompactCategory(text="/wiki/Category:Caf%C3%A9s", link="Cafés"),
+    ),
+)
+
+
+def test_to_singer_dict_matches_model_dump() -> None:
+    record = wikipedia.Record(
+        abstract_info=wikipedia.AbstractInfo(
+            title=COMPACT_RECORD.title,
+            url=AnyUrl(COMPACT_RECORD.url),
+            abstract=COMPACT_RECORD.abstract,
+            imageUrl=AnyUrl(str(COMPACT_RECORD.image_url)),
+        ),
+        categories=(
+            wikipedia.Category(text="/wiki/Category:Caf%C3%A9s", link="Cafés"),
+        ),
+    )
+
+    assert json.dumps(COMPACT_RECORD.to_singer_dict(), default=str) == json.dumps(
+        record.model_dump(), default=str
+    )
+    assert COMPACT_RECORD.to_record() == record
+
+
+def test_to_sublink_singer_dicts_match_model_dump() -> None:
+    sublink_record = wikipedia.SublinkRecord(
+        url=AnyUrl(COMPACT_RECORD.url),
+        anchor="History",
+        link="https://en.wikipedia.org/wiki/Café#History",
+    )
+
+    assert json.dumps(
+        COMPACT_RECORD.to_sublink_singer_dicts(), default=str
+    ) == json.dumps([sublink_record.model_dump()], default=str)
+    assert COMPACT_RECORD.to_sublink_records() == (sublink_record,)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://en.wikipedia.org/wiki/Ant",
+        "https://en.wikipedia.org/wiki/A_(b)!$&'*+,;=:@~|^%20",
+        "https://en.wikipedia.org/wiki/Café",
+        "https://en.wikipedia.org/wiki/A b#Sec tion",
+        "https://EN.wikipedia.org:443/wiki/Ant",
+        "https://en.wikipedia.org",
+        "https://en.wikipedia.org/wiki/a/../b",
+        "https://en.wikipedia.org/wiki/./b",
+        "https://en.wikipedia.org/wiki/a/%2E%2e",
+        "https://en.wikipedia.org/wiki/..b",
+        "https://en.wikipedia.org/w/index.php?title=Bee's_knees#Bee's",
+        "https://en.wikipedia.org/wiki/a?b/../c#d/../e",
+        "https://0x7f.0.0.1/wiki/Ant",
+        "https://1.2.3/wiki/Ant",
+    ],
+)
+def test_normalize_url_matches_any_url(url: str) -> None:
+    assert normalize_url(url) == str(AnyUrl(url))
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "https://en.wikipedia.org/wiki/a{}b",
+        "https://en.wikipedia.org/wiki/a/{}",
+        "https://en.wikipedia.org/w/index.php?a{}b",
+        "https://en.wikipedia.org/wiki/a#b{}c",
+        "https://en.wikipedia.org{}/wiki/a",
+    ],
+)
+def test_normalized_url_pattern_only_matches_urls_any_url_leaves_unchanged(
+    url_template: str,
+) -> None:
+    for character in map(chr, range(0x21, 0x7F)):
+        for fragment in (character, character * 2, f"{character}/"):
+            url = url_template.format(fragment)
+            if NORMALIZED_URL_PATTERN.fullmatch(url):
+                assert str(AnyUrl(url)) == url
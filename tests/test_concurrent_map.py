@@ -0,0 +1,56 @@
+"""Tests for the bounded concurrent map used by the enrichment stages."""
+
+from collections.abc import Iterator
+from threading import Lock
+from time import sleep
+
+from tap_wikipedia.utils import concurrent_map
+
+MAX_CONCURRENCY = 4
+
+
+def test_concurrent_map_preserves_order() -> None:
+    def slow_square(number: int) -> int:
+        sleep((10 - number) / 1000)
+        return number * number
+
+    assert list(
+        concurrent_map(slow_square, range(10), max_concurrency=MAX_CONCURRENCY)
+    ) == [number * number for number in range(10)]
+    assert sorted(
+        concurrent_map(
+            slow_square, range(10), max_concurrency=MAX_CONCURRENCY, ordered=False
+        )
+    ) == [number * number for number in range(10)]
+
+
+def test_concurrent_map_bounds_calls_in_flight() -> None:
+    calls_in_flight = 0
+    max_calls_in_flight = 0
+    consumed_item_count = 0
+    lock = Lock()
+
+    def items() -> Iterator[int]:
+        nonlocal consumed_item_count
+        for item in range(100):
+            consumed_item_count += 1
+            yield item
+
+    def track_calls_in_flight(item: int) -> int:
+        nonlocal calls_in_flight, max_calls_in_flight
+        with lock:
+            calls_in_flight += 1
+            max_calls_in_flight = max(max_calls_in_flight, calls_in_flight)
+        sleep(0.001)
+        with lock:
+            calls_in_flight -= 1
+        return item
+
+    results = concurrent_map(
+        track_calls_in_flight, items(), max_concurrency=MAX_CONCURRENCY
+    )
+    assert next(results) == 0
+    assert consumed_item_count <= MAX_CONCURRENCY + 1
+
+    assert list(results) == list(range(1, 100))
+    assert max_calls_in_flight <= MAX_CONCURRENCY
@@ -0,0 +1,33 @@
+"""Tests for the validation of the tap configuration."""
+
+import pytest
+from pydantic import ValidationError
+
+from tap_wikipedia.models import Config
+from tap_wikipedia.models.types import SubsetSpecification
+
+
+def test_scraped_subsets_are_accepted_for_english_wikipedia_dumps() -> None:
+    config = Config.model_validate(
+        {
+            "abstracts-dump-url": "https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz",
+            "subset-specifications": ["Featured", "Good"],
+        }
+    )
+
+    assert config.subset_specifications == (
+        SubsetSpecification.FEATURED,
+        SubsetSpecification.GOOD,
+    )
+
+
+def test_scraped_subsets_are_rejected_for_other_wikis_dumps() -> None:
+    with pytest.raises(ValidationError, match="not dewiki dumps"):
+        Config.model_validate(
+            {
+                "abstracts-dump-urls": [
+                    "https://dumps.wikimedia.org/{en,de}wiki/latest/{en,de}wiki-latest-abstract.xml.gz"
+                ],
+                "subset-specifications": ["Featured"],
+            }
+        )
@@ -1,6 +1,5 @@
 """Tests standard tap features using the built-in SDK tests library."""
 
-
 from singer_sdk.testing import get_tap_test_class
 
 from tap_wikipedia.tap import TapWikipedia
@@ -0,0 +1,93 @@
+"""Tests for the title index of cached abstracts dumps."""
+
+import gzip
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, cast
+
+import pytest
+
+from tap_wikipedia.utils import DumpTitleIndex, WikipediaAbstractsParser
+from tap_wikipedia.utils.dump_title_index import parse_doc_ranges, title_index_path
+from tap_wikipedia.utils.gzip_seek_index import write_seek_index, write_seekable_gzip
+from tests.synthetic_abstracts import abstracts_xml
+
+DOC_COUNT = 100
+# Number of records consumed before the index of a partial parse is discarded.
+PARTIAL_PARSE_RECORD_COUNT = 10
+
+
+def _write_dump(dump_file_path: Path) -> None:
+    if dump_file_path.name.endswith(".seekable.gz"):
+        seek_points = write_seekable_gzip(
+            BytesIO(abstracts_xml(DOC_COUNT)), dump_file_path, seek_point_spacing=1000
+        )
+        write_seek_index(dump_file_path, seek_points)
+    elif dump_file_path.suffix == ".gz":
+        dump_file_path.write_bytes(gzip.compress(abstracts_xml(DOC_COUNT)))
+    else:
+        dump_file_path.write_bytes(abstracts_xml(DOC_COUNT))
+
+
+def test_parser_sets_byte_range_of_doc_elements() -> None:
+    dump = abstracts_xml(DOC_COUNT)
+
+    records = list(WikipediaAbstractsParser().parse(BytesIO(dump), chunk_size=1000))
+
+    assert len(records) == DOC_COUNT
+    for record in records:
+        assert record.dump_offset is not None
+        assert record.dump_length is not None
+        doc = dump[record.dump_offset : record.dump_offset + record.dump_length]
+        assert doc.startswith(b"<doc>")
+        assert doc.endswith(b"</doc>")
+        assert record.url.encode() in doc
+
+
+@pytest.mark.parametrize(
+    "dump_file_name", ["abstracts.xml", "abstracts.xml.gz", "abstracts.xml.seekable.gz"]
+)
+def test_indexed_docs_parse_to_the_records_of_a_full_parse(
+    tmp_path: Path, dump_file_name: str
+) -> None:
+    dump_file_path = tmp_path / dump_file_name
+    _write_dump(dump_file_path)
+    dump_file = cast(
+        "BinaryIO",
+        gzip.open(dump_file_path)
+        if dump_file_path.suffix == ".gz"
+        else dump_file_path.open("rb"),
+    )
+    with dump_file:
+        expected_records = list(
+            DumpTitleIndex.build(
+                dump_file_path, WikipediaAbstractsParser().parse(dump_file)
+            )
+        )
+
+    titles = ("Article 97", "Article 3", "Article 42", "Missing article")
+    with DumpTitleIndex(dump_file_path) as dump_title_index:
+        doc_ranges = dump_title_index.get_doc_ranges(titles)
+    records = list(parse_doc_ranges(dump_file_path, doc_ranges))
+
+    assert records == [expected_records[doc_index] for doc_index in (3, 42, 97)]
+
+
+def test_index_of_a_partial_parse_is_discarded(tmp_path: Path) -> None:
+    dump_file_path = tmp_path / "abstracts.xml"
+    _write_dump(dump_file_path)
+
+    with dump_file_path.open("rb") as dump_file:
+        records = DumpTitleIndex.build(
+            dump_file_path, WikipediaAbstractsParser().parse(dump_file)
+        )
+        assert (
+            len(list(islice(records, PARTIAL_PARSE_RECORD_COUNT)))
+            == PARTIAL_PARSE_RECORD_COUNT
+        )
+        records.close()
+
+    assert not DumpTitleIndex.exists(dump_file_path)
+    assert list(tmp_path.iterdir()) == [dump_file_path]
+    assert not title_index_path(dump_file_path).exists()
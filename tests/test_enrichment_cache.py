@@ -0,0 +1,109 @@
+"""Tests for the persistent cache of Wikipedia article enrichments."""
+
+from pathlib import Path
+
+import pytest
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.models.types import EnrichmentType
+from tap_wikipedia.utils import (
+    EnrichmentCache,
+    record_enrichments,
+    set_record_enrichments,
+)
+from tap_wikipedia.utils import enrichment_cache as enrichment_cache_module
+
+
+def test_record_enrichments_round_trip(tmp_path: Path) -> None:
+    record = wikipedia.CompactRecord(
+        title="Ant",
+        url="https://en.wikipedia.org/wiki/Ant",
+        abstract="",
+        categories=(
+            wikipedia.CompactCategory(text="/wiki/Category:Insects", link="Insects"),
+        ),
+        external_links=(),
+    )
+    enrichments = (EnrichmentType.CATEGORY, EnrichmentType.EXTERNAL_LINK)
+
+    with EnrichmentCache(tmp_path / "cache.sqlite", namespace="Page") as cache:
+        cache.put("Ant", record_enrichments(record, enrichments))
+    with EnrichmentCache(tmp_path / "cache.sqlite", namespace="Page") as cache:
+        cached_enrichments = cache.get(["Ant", "Bee"])
+    with EnrichmentCache(tmp_path / "cache.sqlite", namespace="QueryApi") as cache:
+        assert cache.get(["Ant"]) == {}
+
+    cached_record = wikipedia.CompactRecord(title="Ant", url=record.url, abstract="")
+    set_record_enrichments(cached_record, cached_enrichments["Ant"])
+    assert cached_enrichments.keys() == {"Ant"}
+    assert cached_record == record
+
+
+def test_entries_expire(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(enrichment_cache_module, "time", lambda: now)
+
+    with EnrichmentCache(
+        tmp_path / "cache.sqlite", namespace="Page", max_age_s=60
+    ) as cache:
+        cache.put("Ant", {"ImageURL": None})
+        now += 30
+        assert cache.get(["Ant"]) == {"Ant": {"ImageURL": None}}
+        now += 31
+        assert cache.get(["Ant"]) == {}
+
+
+def test_least_recently_used_entries_are_evicted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = 1000.0
+    monkeypatch.setattr(enrichment_cache_module, "time", lambda: now)
+    entry = {"ImageURL": "https://upload.wikimedia.org/ant.jpg"}
+    entry_size = len('{"ImageURL":"https://upload.wikimedia.org/ant.jpg"}')
+
+    with EnrichmentCache(
+        tmp_path / "cache.sqlite", namespace="Page", max_size_bytes=3 * entry_size
+    ) as cache:
+        for title in ("Ant", "Bee", "Cicada"):
+            now += 1
+            cache.put(title, entry)
+        now += 1
+        cache.get(["Ant"])
+        now += 1
+        cache.put("Dragonfly", entry)
+
+        # Eviction makes room for more than one entry, so Bee and Cicada are both evicted.
+        assert cache.get(["Ant", "Bee", "Cicada", "Dragonfly"]).keys() == {
+            "Ant",
+            "Dragonfly",
+        }
+
+
+def test_eviction_counts_entries_stored_through_other_connections(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = 1000.0
+    monkeypatch.setattr(enrichment_cache_module, "time", lambda: now)
+    entry = {"ImageURL": "https://upload.wikimedia.org/ant.jpg"}
+    entry_size = len('{"ImageURL":"https://upload.wikimedia.org/ant.jpg"}')
+
+    with (
+        EnrichmentCache(
+            tmp_path / "cache.sqlite", namespace="Page", max_size_bytes=3 * entry_size
+        ) as cache,
+        EnrichmentCache(
+            tmp_path / "cache.sqlite", namespace="Page", max_size_bytes=3 * entry_size
+        ) as other_cache,
+    ):
+        for title in ("Ant", "Bee"):
+            now += 1
+            other_cache.put(title, entry)
+        other_cache.commit()
+        for title in ("Cicada", "Dragonfly"):
+            now += 1
+            cache.put(title, entry)
+
+        assert cache.get(["Ant", "Bee", "Cicada", "Dragonfly"]).keys() == {
+            "Cicada",
+            "Dragonfly",
+        }
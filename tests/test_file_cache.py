@@ -0,0 +1,210 @@
+"""Tests for downloading Wikipedia dumps into the file cache."""
+
+import gc
+import gzip
+import json
+import os
+import sys
+import warnings
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.client import HTTPException
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from typing import ClassVar
+
+import pytest
+
+from tap_wikipedia.models.types import CacheStorageMode
+from tap_wikipedia.utils import FileCache
+from tap_wikipedia.utils.gzip_seek_index import open_at_seek_point, read_seek_index
+from tests.synthetic_abstracts import abstracts_xml
+
+ABSTRACTS_XML = abstracts_xml(1000)
+ABSTRACTS_XML_GZ = gzip.compress(ABSTRACTS_XML)
+ETAG = '"abstracts-v1"'
+
+# The first request is dropped halfway and the second one resumes it.
+EXPECTED_REQUEST_COUNT = 2
+
+
+class DumpRequestHandler(BaseHTTPRequestHandler):
+    """Serve a gzipped abstracts dump, supporting Range requests and dropping the first connection halfway."""
+
+    requests_headers: ClassVar[list[dict[str, str]]] = []
+    drop_first_connection: ClassVar[bool] = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        DumpRequestHandler.requests_headers.append(dict(self.headers.items()))
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == ETAG:
+            start = int(range_header.removeprefix("bytes=").removesuffix("-"))
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header(
+                "Content-Range",
+                f"bytes {start}-{len(ABSTRACTS_XML_GZ) - 1}/{len(ABSTRACTS_XML_GZ)}",
+            )
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(ABSTRACTS_XML_GZ) - start))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+
+        if DumpRequestHandler.drop_first_connection:
+            DumpRequestHandler.drop_first_connection = False
+            self.wfile.write(ABSTRACTS_XML_GZ[start : len(ABSTRACTS_XML_GZ) // 2])
+            self.close_connection = True
+            return
+
+        self.wfile.write(ABSTRACTS_XML_GZ[start:])
+
+    def log_message(self, *args) -> None:  # noqa: ANN002
+        pass
+
+
+@pytest.fixture
+def dump_url() -> Iterator[str]:
+    DumpRequestHandler.requests_headers = []
+    DumpRequestHandler.drop_first_connection = True
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DumpRequestHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/enwiki-latest-abstract1.xml.gz"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_file_resumes_interrupted_download(dump_url: str, tmp_path: Path) -> None:
+    cached_file_path = FileCache(cache_dir_path=tmp_path).get_file(dump_url)
+
+    assert cached_file_path.stem == "abstracts"
+    assert cached_file_path.read_bytes() == ABSTRACTS_XML
+    assert len(DumpRequestHandler.requests_headers) == EXPECTED_REQUEST_COUNT
+    assert "Range" not in DumpRequestHandler.requests_headers[0]
+    assert DumpRequestHandler.requests_headers[1]["Range"] == (
+        f"bytes={len(ABSTRACTS_XML_GZ) // 2}-"
+    )
+    assert DumpRequestHandler.requests_headers[1]["If-Range"] == ETAG
+    assert sorted(path.name for path in cached_file_path.parent.iterdir()) == [
+        cached_file_path.name,
+        "headers.json",
+    ]
+
+
+def test_get_file_uses_cached_file(dump_url: str, tmp_path: Path) -> None:
+    file_cache = FileCache(cache_dir_path=tmp_path)
+
+    first_cached_file_path = file_cache.get_file(dump_url)
+    second_cached_file_path = file_cache.get_file(dump_url)
+
+    assert first_cached_file_path == second_cached_file_path
+    assert len(DumpRequestHandler.requests_headers) == EXPECTED_REQUEST_COUNT
+
+
+def test_get_file_keeps_compressed_file(dump_url: str, tmp_path: Path) -> None:
+    cached_file_path = FileCache(
+        cache_dir_path=tmp_path, storage_mode=CacheStorageMode.COMPRESSED
+    ).get_file(dump_url)
+
+    assert cached_file_path.suffix == ".gz"
+    assert cached_file_path.read_bytes() == ABSTRACTS_XML_GZ
+    assert read_seek_index(cached_file_path) is None
+
+
+def test_get_file_builds_seek_index(dump_url: str, tmp_path: Path) -> None:
+    FileCache(cache_dir_path=tmp_path).get_file(dump_url)
+
+    cached_file_path = FileCache(
+        cache_dir_path=tmp_path,
+        storage_mode=CacheStorageMode.COMPRESSED_WITH_SEEK_INDEX,
+    ).get_file(dump_url)
+
+    seek_points = read_seek_index(cached_file_path)
+    assert seek_points is not None
+    assert gzip.decompress(cached_file_path.read_bytes()) == ABSTRACTS_XML
+    for seek_point in seek_points:
+        with open_at_seek_point(cached_file_path, seek_point) as uncompressed_file:
+            assert (
+                uncompressed_file.read()
+                == ABSTRACTS_XML[seek_point.uncompressed_offset :]
+            )
+    assert sorted(
+        path.suffix for path in cached_file_path.parent.glob("abstracts*")
+    ) == [".gz", ".json"]
+
+
+def test_closing_file_opened_at_seek_point_closes_gzip_file(
+    dump_url: str, tmp_path: Path
+) -> None:
+    cached_file_path = FileCache(
+        cache_dir_path=tmp_path,
+        storage_mode=CacheStorageMode.COMPRESSED_WITH_SEEK_INDEX,
+    ).get_file(dump_url)
+    seek_points = read_seek_index(cached_file_path)
+    assert seek_points
+
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always", ResourceWarning)
+        with open_at_seek_point(cached_file_path, seek_points[-1]) as uncompressed_file:
+            uncompressed_file.read()
+        del uncompressed_file
+        gc.collect()
+
+    assert not [
+        caught_warning
+        for caught_warning in caught_warnings
+        if issubclass(caught_warning.category, ResourceWarning)
+    ]
+
+
+def test_get_file_revalidates_stale_file(dump_url: str, tmp_path: Path) -> None:
+    file_cache = FileCache(cache_dir_path=tmp_path, max_age_s=0)
+
+    first_cached_file_path = file_cache.get_file(dump_url)
+    headers_json_file_path = first_cached_file_path.parent / "headers.json"
+    os.utime(headers_json_file_path, (0, 0))
+    second_cached_file_path = file_cache.get_file(dump_url)
+
+    assert first_cached_file_path == second_cached_file_path
+    assert second_cached_file_path.read_bytes() == ABSTRACTS_XML
+    assert DumpRequestHandler.requests_headers[-1]["If-None-Match"] == ETAG
+    assert headers_json_file_path.stat().st_mtime > 0
+
+
+def test_get_file_keeps_headers_of_cached_file_until_download_completes(
+    dump_url: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    file_cache = FileCache(
+        cache_dir_path=tmp_path, max_age_s=0, max_download_attempts=1
+    )
+    DumpRequestHandler.drop_first_connection = False
+    cached_file_path = file_cache.get_file(dump_url)
+    headers_json_file_path = cached_file_path.parent / "headers.json"
+    os.utime(headers_json_file_path, (0, 0))
+
+    # A new version of the dump is published, and its download is dropped halfway.
+    new_etag = '"abstracts-v2"'
+    monkeypatch.setattr(sys.modules[__name__], "ETAG", new_etag)
+    DumpRequestHandler.drop_first_connection = True
+    with pytest.raises(HTTPException):
+        file_cache.get_file(dump_url)
+
+    assert json.loads(headers_json_file_path.read_text())["ETag"] == '"abstracts-v1"'
+    assert headers_json_file_path.stat().st_mtime == 0
+
+    assert file_cache.get_file(dump_url) == cached_file_path
+    assert DumpRequestHandler.requests_headers[-1]["If-Range"] == new_etag
+    assert json.loads(headers_json_file_path.read_text())["ETag"] == new_etag
+    assert sorted(path.name for path in cached_file_path.parent.iterdir()) == [
+        cached_file_path.name,
+        "headers.json",
+    ]
@@ -0,0 +1,125 @@
+"""Tests for the rate-limited, retrying HTTP client used by the enrichment stages."""
+
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from typing import ClassVar
+
+import pytest
+from requests import HTTPError
+from requests_cache import CachedSession
+
+from tap_wikipedia.utils import HttpClient, PipelineMetrics
+
+MAX_CONCURRENCY = 8
+
+MAX_ATTEMPTS = 2
+
+
+class ThrottlingRequestHandler(BaseHTTPRequestHandler):
+    """Respond to each request with the next status of `statuses`, then with 200."""
+
+    statuses: ClassVar[list[int]] = []
+    request_count: ClassVar[int] = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        status = (
+            ThrottlingRequestHandler.statuses.pop(0)
+            if ThrottlingRequestHandler.statuses
+            else HTTPStatus.OK
+        )
+        ThrottlingRequestHandler.request_count += 1
+        self.send_response(status)
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    ThrottlingRequestHandler.statuses = []
+    ThrottlingRequestHandler.request_count = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingRequestHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def _http_client(**kwargs: object) -> HttpClient:
+    return HttpClient(
+        session=CachedSession(backend="memory"),
+        initial_backoff_s=0,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def test_throttled_requests_are_retried_with_decreased_concurrency(
+    server_url: str,
+) -> None:
+    ThrottlingRequestHandler.statuses = [HTTPStatus.TOO_MANY_REQUESTS] * 2
+    throttled_request_count = len(ThrottlingRequestHandler.statuses)
+    http_client = _http_client(max_concurrency=MAX_CONCURRENCY)
+
+    response = http_client.get(server_url + "/page")
+
+    assert response.status_code == HTTPStatus.OK
+    assert ThrottlingRequestHandler.request_count == throttled_request_count + 1
+    # Each throttling response halves the limit.
+    decreased_limit = MAX_CONCURRENCY // 2**throttled_request_count
+    assert http_client.concurrency_limit(server_url) == decreased_limit
+
+    # Successful responses raise the limit back by one for every limit's worth of them.
+    for page_index in range(decreased_limit + (decreased_limit + 1)):
+        http_client.get(f"{server_url}/page-{page_index}")
+    assert http_client.concurrency_limit(server_url) == decreased_limit + 2
+
+
+def test_cached_responses_bypass_retries_and_limits(server_url: str) -> None:
+    http_client = _http_client()
+    http_client.get(server_url + "/page")
+    ThrottlingRequestHandler.statuses = [HTTPStatus.SERVICE_UNAVAILABLE]
+
+    assert http_client.get(server_url + "/page").status_code == HTTPStatus.OK
+    assert ThrottlingRequestHandler.request_count == 1
+
+
+def test_error_is_raised_after_last_attempt(server_url: str) -> None:
+    ThrottlingRequestHandler.statuses = [HTTPStatus.BAD_GATEWAY] * (MAX_ATTEMPTS + 1)
+    http_client = _http_client(max_attempts=MAX_ATTEMPTS)
+
+    with pytest.raises(HTTPError):
+        http_client.get(server_url + "/page")
+    assert ThrottlingRequestHandler.request_count == MAX_ATTEMPTS
+
+    # The next request fails its first attempt with the status left, and succeeds.
+    assert http_client.get(server_url + "/page").status_code == HTTPStatus.OK
+    assert ThrottlingRequestHandler.request_count == MAX_ATTEMPTS + 2
+
+
+def test_requests_and_cache_lookups_are_counted_in_metrics(
+    server_url: str, tmp_path: Path
+) -> None:
+    ThrottlingRequestHandler.statuses = [HTTPStatus.BAD_GATEWAY]
+    metrics = PipelineMetrics()
+    http_client = _http_client(metrics=metrics)
+
+    http_client.get(server_url + "/page")
+    http_client.get(server_url + "/page")
+
+    metrics.write_prometheus_text_file(tmp_path / "metrics.prom")
+    lines = (tmp_path / "metrics.prom").read_text().splitlines()
+    host = server_url.removeprefix("http://")
+    assert f'tap_wikipedia_http_requests_total{{host="{host}",status="502"}} 1' in lines
+    assert f'tap_wikipedia_http_requests_total{{host="{host}",status="200"}} 1' in lines
+    assert (
+        f'tap_wikipedia_http_request_duration_seconds_count{{host="{host}"}} 2' in lines
+    )
+    assert 'tap_wikipedia_cache_lookups_total{cache="http",result="miss"} 1' in lines
+    assert 'tap_wikipedia_cache_lookups_total{cache="http",result="hit"} 1' in lines
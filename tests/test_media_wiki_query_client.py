@@ -0,0 +1,102 @@
+"""Tests for batched MediaWiki API queries."""
+
+from typing import Any
+
+import pytest
+from requests import RequestException
+
+from tap_wikipedia.utils import MediaWikiQueryClient
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+
+RESPONSES = [
+    {
+        "continue": {"clcontinue": "1|B", "continue": "||"},
+        "query": {
+            "normalized": [{"fromencoded": False, "from": "ant", "to": "Ant"}],
+            "pages": [
+                {
+                    "pageid": 1,
+                    "ns": 0,
+                    "title": "Ant",
+                    "categories": [{"ns": 14, "title": "Category:A"}],
+                },
+                {"ns": 0, "title": "Missing article", "missing": True},
+            ],
+        },
+    },
+    {
+        "batchcomplete": True,
+        "query": {
+            "normalized": [{"fromencoded": False, "from": "ant", "to": "Ant"}],
+            "pages": [
+                {
+                    "pageid": 1,
+                    "ns": 0,
+                    "title": "Ant",
+                    "categories": [{"ns": 14, "title": "Category:B"}],
+                },
+                {"ns": 0, "title": "Missing article", "missing": True},
+            ],
+        },
+    },
+]
+
+
+class FakeResponse:
+    def __init__(self, response_json: dict[str, Any]):
+        self.__response_json = response_json
+
+    def json(self) -> dict[str, Any]:
+        return self.__response_json
+
+
+class FakeHttpClient:
+    def __init__(self, responses: list[dict[str, Any]] = RESPONSES) -> None:
+        self.requests_parameters: list[dict[str, str]] = []
+        self.__responses = responses
+
+    def get(self, url: str, **kwargs: Any) -> FakeResponse:  # noqa: ANN401
+        assert url == API_URL
+        self.requests_parameters.append(kwargs["params"])
+        return FakeResponse(self.__responses[len(self.requests_parameters) - 1])
+
+
+def test_query_pages_follows_continuations() -> None:
+    http_client = FakeHttpClient()
+
+    pages = MediaWikiQueryClient(
+        http_client=http_client,  # type: ignore[arg-type]
+        api_url=API_URL,
+    ).query_pages(
+        ["ant", "Missing article"],
+        parameters={"prop": "categories", "cllimit": "max"},
+    )
+
+    assert list(pages) == ["ant"]
+    assert pages["ant"]["categories"] == [
+        {"ns": 14, "title": "Category:A"},
+        {"ns": 14, "title": "Category:B"},
+    ]
+    assert http_client.requests_parameters[0]["titles"] == "ant|Missing article"
+    assert http_client.requests_parameters[0]["cllimit"] == "max"
+    assert http_client.requests_parameters[1]["clcontinue"] == "1|B"
+
+
+def test_query_pages_raises_api_errors() -> None:
+    http_client = FakeHttpClient(
+        [
+            {
+                "error": {
+                    "code": "maxlag",
+                    "info": "Waiting for a database server: 7 seconds lagged.",
+                }
+            }
+        ]
+    )
+
+    with pytest.raises(RequestException, match="maxlag"):
+        MediaWikiQueryClient(
+            http_client=http_client,  # type: ignore[arg-type]
+            api_url=API_URL,
+        ).query_pages(["Ant"], parameters={"prop": "categories"})
@@ -0,0 +1,144 @@
+"""Tests for the index built from Wikimedia SQL dumps for offline enrichment."""
+
+import gzip
+import io
+from pathlib import Path
+
+import pytest
+
+from tap_wikipedia.utils import OfflineEnrichmentIndex, SqlDumpReader
+from tests.synthetic_sql_dumps import sql_dump
+
+PAGE_DUMP = sql_dump(
+    "page",
+    ("page_id", "page_namespace", "page_title", "page_is_redirect"),
+    [
+        (1, 0, "Ant", 0),
+        (2, 0, "Bee's_knees", 0),
+        (3, 14, "Insects", 0),
+        (4, 14, "Hidden_maintenance", 0),
+        (5, 2, "Some_user", 0),
+    ],
+)
+PAGE_PROPS_DUMP = sql_dump(
+    "page_props",
+    ("pp_page", "pp_propname", "pp_value", "pp_sortkey"),
+    [(4, "hiddencat", "", None), (1, "wikibase_item", "Q7386", None)],
+)
+CLASSIC_DUMPS = {
+    "page": PAGE_DUMP,
+    "page_props": PAGE_PROPS_DUMP,
+    "categorylinks": sql_dump(
+        "categorylinks",
+        ("cl_from", "cl_to", "cl_sortkey", "cl_type"),
+        [
+            (1, "Insects", "ANT", "page"),
+            (1, "Hidden_maintenance", "ANT", "page"),
+            (2, "Insects", "BEE'S KNEES", "page"),
+            (5, "Insects", "SOME USER", "page"),
+        ],
+    ),
+    "pagelinks": sql_dump(
+        "pagelinks",
+        ("pl_from", "pl_namespace", "pl_title", "pl_from_namespace"),
+        [
+            (1, 0, "Bee's_knees", 0),
+            (1, 0, "Colony_(biology)", 0),
+            (1, 14, "Insects", 0),
+            (5, 0, "Ant", 2),
+        ],
+    ),
+}
+LINKTARGET_DUMPS = {
+    "page": PAGE_DUMP,
+    "page_props": PAGE_PROPS_DUMP,
+    "linktarget": sql_dump(
+        "linktarget",
+        ("lt_id", "lt_namespace", "lt_title"),
+        [
+            (10, 14, "Insects"),
+            (11, 14, "Hidden_maintenance"),
+            (12, 0, "Bee's_knees"),
+            (13, 0, "Colony_(biology)"),
+        ],
+    ),
+    "categorylinks": sql_dump(
+        "categorylinks",
+        ("cl_from", "cl_sortkey", "cl_type", "cl_target_id"),
+        [(1, "ANT", "page", 10), (1, "ANT", "page", 11), (2, "BEE", "page", 10)],
+    ),
+    "pagelinks": sql_dump(
+        "pagelinks",
+        ("pl_from", "pl_from_namespace", "pl_target_id"),
+        [(1, 0, 12), (1, 0, 13), (1, 0, 10)],
+    ),
+}
+
+
+def _build_index(
+    tmp_path: Path, dumps: dict[str, bytes], **kwargs: object
+) -> tuple[Path, list[str]]:
+    requested_tables = []
+
+    def get_dump_file_path(table: str) -> Path:
+        requested_tables.append(table)
+        dump_file_path = tmp_path / f"{table}.sql.gz"
+        dump_file_path.write_bytes(gzip.compress(dumps[table]))
+        return dump_file_path
+
+    index_file_path = tmp_path / "index.sqlite"
+    OfflineEnrichmentIndex.build(
+        index_file_path,
+        get_dump_file_path=get_dump_file_path,
+        source="dumps-v1",
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return index_file_path, requested_tables
+
+
+@pytest.mark.parametrize("dumps", [CLASSIC_DUMPS, LINKTARGET_DUMPS])
+def test_index_joins_categories_and_links_by_title(
+    tmp_path: Path, dumps: dict[str, bytes]
+) -> None:
+    index_file_path, requested_tables = _build_index(tmp_path, dumps)
+
+    assert ("linktarget" in requested_tables) == ("linktarget" in dumps)
+    assert OfflineEnrichmentIndex.read_source(index_file_path) == "dumps-v1"
+    with OfflineEnrichmentIndex(index_file_path) as index:
+        assert index.get_categories("Ant") == ("Insects",)
+        assert index.get_links("ant") == ("Bee's_knees", "Colony_(biology)")
+        assert index.get_categories("Bee's knees") == ("Insects",)
+        assert index.get_links("Bee's knees") == ()
+        assert index.get_categories("Insects") is None
+        assert index.get_links("Some user") is None
+
+
+def test_index_only_holds_allowlisted_articles(tmp_path: Path) -> None:
+    index_file_path, _ = _build_index(
+        tmp_path, CLASSIC_DUMPS, title_allowlist=frozenset({"Bee's knees"})
+    )
+
+    with OfflineEnrichmentIndex(index_file_path) as index:
+        assert index.get_categories("Ant") is None
+        assert index.get_categories("Bee's knees") == ("Insects",)
+
+
+def test_missing_or_incomplete_index_has_no_source(tmp_path: Path) -> None:
+    assert OfflineEnrichmentIndex.read_source(tmp_path / "missing.sqlite") is None
+
+    (tmp_path / "incomplete.sqlite").write_bytes(b"")
+    assert OfflineEnrichmentIndex.read_source(tmp_path / "incomplete.sqlite") is None
+
+
+def test_sql_dump_reader_unescapes_values() -> None:
+    dump = SqlDumpReader(
+        io.StringIO(
+            "CREATE TABLE `t` (\n  `a` int,\n  `b` varbinary(255),\n  `c` double,\n  PRIMARY KEY (`a`)\n);\n"
+            "INSERT INTO `t` VALUES (1,'it\\'s (a), \\\\ test\\n',0.5),(-2,'',NULL);\n"
+        )
+    )
+
+    assert dump.columns == ("a", "b", "c")
+    assert list(dump.rows()) == [(1, "it's (a), \\ test\n", 0.5), (-2, "", None)]
+    with pytest.raises(ValueError, match="no column d"):
+        dump.column_index("d")
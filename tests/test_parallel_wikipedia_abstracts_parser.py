@@ -0,0 +1,110 @@
+"""Tests for the parallel Wikipedia abstracts parser."""
+
+from io import BytesIO
+from pathlib import Path
+
+from tap_wikipedia.utils import (
+    ParallelWikipediaAbstractsParser,
+    WikipediaAbstractsParser,
+)
+from tap_wikipedia.utils.gzip_seek_index import write_seek_index, write_seekable_gzip
+from tap_wikipedia.utils.parallel_wikipedia_abstracts_parser import (
+    shard_byte_ranges,
+)
+from tests.synthetic_abstracts import abstracts_xml
+
+
+def test_shard_byte_ranges_start_at_doc_tags(tmp_path: Path) -> None:
+    abstracts_file_path = tmp_path / "abstracts.xml"
+    abstracts_file_path.write_bytes(abstracts_xml(100))
+    abstracts_file_content = abstracts_file_path.read_bytes()
+
+    byte_ranges = shard_byte_ranges(abstracts_file_path, shard_size=1000)
+
+    assert len(byte_ranges) > 1
+    for start, end in byte_ranges:
+        assert abstracts_file_content[start:].startswith(b"<doc>")
+        assert abstracts_file_content[:end].rstrip().endswith(b"</doc>")
+
+
+def test_parse_matches_single_process_parser(tmp_path: Path) -> None:
+    abstracts_file_path = tmp_path / "abstracts.xml"
+    abstracts_file_path.write_bytes(abstracts_xml(100))
+
+    with abstracts_file_path.open("rb") as abstracts_file:
+        expected_records = list(WikipediaAbstractsParser().parse(abstracts_file))
+
+    ordered_records = list(
+        ParallelWikipediaAbstractsParser(worker_count=2, shard_size=1000).parse(
+            abstracts_file_path
+        )
+    )
+    unordered_records = list(
+        ParallelWikipediaAbstractsParser(
+            worker_count=2, ordered=False, shard_size=1000
+        ).parse(abstracts_file_path)
+    )
+
+    assert ordered_records == expected_records
+    assert sorted(record.title for record in unordered_records) == sorted(
+        record.title for record in expected_records
+    )
+
+
+def test_parse_seekable_gzip_file(tmp_path: Path) -> None:
+    gzip_file_path = tmp_path / "abstracts.xml.gz"
+    seek_points = write_seekable_gzip(
+        BytesIO(abstracts_xml(100)), gzip_file_path, seek_point_spacing=1000
+    )
+    write_seek_index(gzip_file_path, seek_points)
+
+    records = list(
+        ParallelWikipediaAbstractsParser(worker_count=2, shard_size=2000).parse(
+            gzip_file_path
+        )
+    )
+
+    assert len(seek_points) > 1
+    assert [record.title for record in records] == [
+        f"Wikipedia: Article {doc_index}" for doc_index in range(100)
+    ]
+
+
+def test_parse_skips_articles_outside_title_allowlist(tmp_path: Path) -> None:
+    abstracts_file_path = tmp_path / "abstracts.xml"
+    abstracts_file_path.write_bytes(abstracts_xml(100))
+
+    records = list(
+        ParallelWikipediaAbstractsParser(
+            worker_count=2,
+            shard_size=1000,
+            title_allowlist=frozenset({"Article 3", "Article 97"}),
+        ).parse(abstracts_file_path)
+    )
+
+    assert [record.title for record in records] == [
+        "Wikipedia: Article 3",
+        "Wikipedia: Article 97",
+    ]
+
+
+def test_parse_resumes_at_offset_of_single_process_parser(tmp_path: Path) -> None:
+    gzip_file_path = tmp_path / "abstracts.xml.gz"
+    write_seek_index(
+        gzip_file_path,
+        write_seekable_gzip(
+            BytesIO(abstracts_xml(100)), gzip_file_path, seek_point_spacing=1000
+        ),
+    )
+    with BytesIO(abstracts_xml(100)) as abstracts_file:
+        expected_records = list(WikipediaAbstractsParser().parse(abstracts_file))
+    resume_offset = expected_records[60].dump_offset
+    assert resume_offset is not None
+
+    records = list(
+        ParallelWikipediaAbstractsParser(
+            worker_count=2, shard_size=2000, resume_offset=resume_offset
+        ).parse(gzip_file_path)
+    )
+
+    assert records == expected_records[60:]
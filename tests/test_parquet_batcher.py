@@ -0,0 +1,62 @@
+"""Tests for writing batches of records to Parquet files."""
+
+from pathlib import Path
+
+import pytest
+from singer_sdk.helpers._batch import BatchConfig, StorageTarget
+
+from tap_wikipedia.models import wikipedia
+from tap_wikipedia.utils import ParquetBatcher, ParquetEncoding, arrow_schema
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+BATCH_SIZE = 2
+
+RECORD_COUNT = 3
+
+
+def test_arrow_schema_resolves_definitions_and_nullable_types() -> None:
+    schema = arrow_schema(wikipedia.Record.model_json_schema())
+
+    assert schema.field("abstract_info").type.field("imageUrl").type == pa.string()
+    assert schema.field("categories").type == pa.list_(
+        pa.struct([("text", pa.string()), ("link", pa.string())])
+    )
+
+
+def test_records_are_written_in_batches(tmp_path: Path) -> None:
+    json_schema = {
+        "properties": {
+            "title": {"type": "string"},
+            "links": {"type": "array", "items": {"type": "string"}},
+        }
+    }
+    batcher = ParquetBatcher(
+        tap_name="tap-wikipedia",
+        stream_name="abstracts",
+        batch_config=BatchConfig(
+            encoding=ParquetEncoding(compression="snappy"),
+            storage=StorageTarget(root=tmp_path.as_uri()),
+            batch_size=BATCH_SIZE,
+        ),
+        json_schema=json_schema,
+    )
+
+    manifests = list(
+        batcher.get_batches(
+            iter(
+                {"title": f"Article {index}", "links": ("Ant",) * index}
+                for index in range(RECORD_COUNT)
+            )
+        )
+    )
+
+    tables = [
+        pq.read_table(manifest[0].removeprefix("file://")) for manifest in manifests
+    ]
+    assert [table.num_rows for table in tables] == [
+        BATCH_SIZE,
+        RECORD_COUNT - BATCH_SIZE,
+    ]
+    assert tables[1].to_pylist() == [{"title": "Article 2", "links": ["Ant", "Ant"]}]
@@ -0,0 +1,127 @@
+"""Tests for the prefetcher that produces the records of stream partitions concurrently."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from threading import Event, Lock
+from time import monotonic, sleep
+
+import pytest
+
+from tap_wikipedia.utils import PartitionPrefetcher
+
+ITEM_COUNT = 20
+
+MAX_CONCURRENCY = 2
+
+
+def test_partitions_are_produced_ahead_of_their_consumption(tmp_path: Path) -> None:
+    produced_partitions = []
+    producers_running = 0
+    max_producers_running = 0
+    lock = Lock()
+    all_produced = Event()
+
+    def produce(partition: str) -> Iterator[str]:
+        nonlocal producers_running, max_producers_running
+        with lock:
+            producers_running += 1
+            max_producers_running = max(max_producers_running, producers_running)
+        for item_index in range(ITEM_COUNT):
+            yield f"{partition}{item_index}"
+        with lock:
+            producers_running -= 1
+            produced_partitions.append(partition)
+            if len(produced_partitions) == MAX_CONCURRENCY:
+                all_produced.set()
+
+    partitions = ["a", "b", "c"]
+    prefetcher = PartitionPrefetcher(
+        partitions,
+        produce,
+        max_concurrency=MAX_CONCURRENCY,
+        max_buffered_items=ITEM_COUNT,
+        spill_directory_path=tmp_path,
+    )
+
+    # While the first item of "a" is consumed, "b" is produced too.
+    items = prefetcher.consume("a")
+    assert next(items) == "a0"
+    assert all_produced.wait(timeout=10)
+    assert sorted(produced_partitions) == ["a", "b"]
+
+    assert list(items) == [f"a{item_index}" for item_index in range(1, ITEM_COUNT)]
+    for partition in partitions[1:]:
+        assert list(prefetcher.consume(partition)) == [
+            f"{partition}{item_index}" for item_index in range(ITEM_COUNT)
+        ]
+    assert max_producers_running <= MAX_CONCURRENCY
+    prefetcher.close()
+
+
+def test_slow_partitions_are_produced_concurrently_beyond_their_buffers(
+    tmp_path: Path,
+) -> None:
+    production_times: dict[str, tuple[float, float]] = {}
+    all_produced = Event()
+
+    def produce(partition: str) -> Iterator[str]:
+        start_time = monotonic()
+        for item_index in range(ITEM_COUNT):
+            # An enrichment that waits for a response.
+            sleep(0.01)
+            yield f"{partition}{item_index}"
+        production_times[partition] = (start_time, monotonic())
+        if len(production_times) == MAX_CONCURRENCY:
+            all_produced.set()
+
+    partitions = ["a", "b"]
+    prefetcher = PartitionPrefetcher(
+        partitions,
+        produce,
+        max_concurrency=MAX_CONCURRENCY,
+        max_buffered_items=1,
+        spill_directory_path=tmp_path,
+    )
+
+    # Both partitions are produced to the end although only one item of each fits in memory and none is consumed.
+    items = prefetcher.consume("a")
+    assert next(items) == "a0"
+    assert all_produced.wait(timeout=10)
+    (a_start_time, a_end_time), (b_start_time, b_end_time) = (
+        production_times[partition] for partition in partitions
+    )
+    assert a_start_time < b_end_time
+    assert b_start_time < a_end_time
+
+    # The spilled items are consumed in order.
+    assert list(items) == [f"a{item_index}" for item_index in range(1, ITEM_COUNT)]
+    assert list(prefetcher.consume("b")) == [
+        f"b{item_index}" for item_index in range(ITEM_COUNT)
+    ]
+    prefetcher.close()
+
+
+@pytest.mark.parametrize("max_buffered_items", [1, 2])
+def test_producer_errors_are_raised_to_the_consumer(
+    tmp_path: Path, max_buffered_items: int
+) -> None:
+    def produce(partition: str) -> Iterator[str]:
+        yield partition
+        yield partition
+        msg = f"cannot produce {partition}"
+        raise ValueError(msg)
+
+    prefetcher = PartitionPrefetcher(
+        ["a", "b"],
+        produce,
+        max_concurrency=MAX_CONCURRENCY,
+        max_buffered_items=max_buffered_items,
+        spill_directory_path=tmp_path,
+    )
+
+    items = prefetcher.consume("a")
+    assert next(items) == "a"
+    assert next(items) == "a"
+    with pytest.raises(ValueError, match="cannot produce a"):
+        next(items)
+    prefetcher.close()
@@ -0,0 +1,105 @@
+"""Tests for the per-stage metrics of the abstracts pipeline."""
+
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from time import sleep
+
+import pytest
+
+from tap_wikipedia.utils import PipelineMetrics
+
+STAGE_SLEEP_S = 0.05
+
+SOURCE_RECORD_COUNT = 4
+
+
+def _metric_points(caplog: pytest.LogCaptureFixture) -> list[dict]:
+    return [
+        json.loads(record.getMessage().removeprefix("METRIC: "))
+        for record in caplog.records
+    ]
+
+
+def test_stage_counts_records_and_excludes_upstream_time(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    metrics = PipelineMetrics()
+
+    def slow_source() -> Iterator[int]:
+        for record in range(SOURCE_RECORD_COUNT):
+            sleep(STAGE_SLEEP_S)
+            yield record
+
+    def keep_even_records(records: Iterable[int]) -> Iterator[int]:
+        return (record for record in records if record % 2 == 0)
+
+    records = metrics.instrument_stage("filter", keep_even_records)(
+        metrics.instrument_source("parse", slow_source())
+    )
+    kept_records = list(records)
+    assert kept_records == [0, 2]
+
+    with caplog.at_level(logging.INFO):
+        metrics.log(logging.getLogger("test"), stream="abstracts")
+    points = {
+        (point["metric"], point["tags"]["stage"]): point
+        for point in _metric_points(caplog)
+    }
+
+    kept_record_count = len(kept_records)
+    assert points["stage_records_out_total", "parse"]["value"] == SOURCE_RECORD_COUNT
+    assert points["stage_records_in_total", "filter"]["value"] == SOURCE_RECORD_COUNT
+    assert points["stage_records_out_total", "filter"]["value"] == kept_record_count
+    assert (
+        points["stage_records_dropped_total", "filter"]["value"]
+        == SOURCE_RECORD_COUNT - kept_record_count
+    )
+    assert points["stage_records_in_total", "filter"]["tags"]["stream"] == "abstracts"
+    assert points["stage_duration_seconds_total", "parse"]["type"] == "timer"
+    assert (
+        points["stage_duration_seconds_total", "parse"]["value"]
+        >= SOURCE_RECORD_COUNT * STAGE_SLEEP_S
+    )
+    assert points["stage_duration_seconds_total", "filter"]["value"] < STAGE_SLEEP_S
+
+
+def test_prometheus_text_file_has_latency_histograms_and_hit_ratios(
+    tmp_path: Path,
+) -> None:
+    metrics = PipelineMetrics()
+    for duration_s in (0.001, 0.2, 20.0):
+        metrics.count_http_request(
+            host="en.wikipedia.org", status="200", duration_s=duration_s
+        )
+    for result in ("hit", "hit", "revalidated", "miss"):
+        metrics.count_cache_lookup("http", result)
+
+    metrics_file_path = tmp_path / "tap-wikipedia.prom"
+    metrics.write_prometheus_text_file(metrics_file_path, stream="abstracts")
+    lines = metrics_file_path.read_text().splitlines()
+
+    assert "# TYPE tap_wikipedia_http_request_duration_seconds histogram" in lines
+    assert (
+        'tap_wikipedia_http_requests_total{stream="abstracts",host="en.wikipedia.org",status="200"} 3'
+        in lines
+    )
+    assert (
+        'tap_wikipedia_http_request_duration_seconds_bucket{stream="abstracts",host="en.wikipedia.org",le="0.005"} 1'
+        in lines
+    )
+    assert (
+        'tap_wikipedia_http_request_duration_seconds_bucket{stream="abstracts",host="en.wikipedia.org",le="0.25"} 2'
+        in lines
+    )
+    assert (
+        'tap_wikipedia_http_request_duration_seconds_bucket{stream="abstracts",host="en.wikipedia.org",le="+Inf"} 3'
+        in lines
+    )
+    assert (
+        'tap_wikipedia_cache_hit_ratio{stream="abstracts",cache="http"} 0.75' in lines
+    )
+    # Stages without records are left out rather than written as empty families.
+    assert not any("stage_" in line for line in lines)
+    assert not (tmp_path / "tap-wikipedia.prom.tmp").exists()
@@ -0,0 +1,21 @@
+"""Tests for the index of the digests of the records emitted by previous syncs."""
+
+from pathlib import Path
+
+from tap_wikipedia.utils.record_digest_index import RecordDigestIndex
+
+
+def test_index_is_closed_once_every_reference_is_closed(tmp_path: Path) -> None:
+    index = RecordDigestIndex(tmp_path / "record_digest.sqlite")
+    shared_index = index.share()
+    index.close()
+
+    # The shared reference can still use the index after the one that created it is closed.
+    assert shared_index.mark_seen(title="Article", url="https://a.b/c", digest=b"d")
+    shared_index.store_digest(title="Article", digest=b"d")
+    shared_index.close()
+
+    with RecordDigestIndex(tmp_path / "record_digest.sqlite") as next_index:
+        assert not next_index.mark_seen(
+            title="Article", url="https://a.b/c", digest=b"d"
+        )
@@ -0,0 +1,74 @@
+"""Tests that discovery stays fast: it imports none of the sync's heavy dependencies and uses the shipped schemas."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from tap_wikipedia.schemas import generate_schemas, load_schema
+
+# Prints the modules of a list that a discovery imports, run in a fresh process.
+DISCOVERY_IMPORTS_SCRIPT = """
+import json, sys
+from tap_wikipedia.tap import TapWikipedia
+
+TapWikipedia(config=json.loads(sys.argv[1])).run_discovery()
+print(json.dumps([module for module in json.loads(sys.argv[2]) if module in sys.modules]))
+"""
+
+
+def test_shipped_schemas_match_models() -> None:
+    for name, schema in generate_schemas().items():
+        assert (
+            load_schema(name) == schema
+        ), f"the {name} schema is out of date, regenerate it with `python -m tap_wikipedia.schemas`"
+
+
+def test_discovery_skips_sync_dependencies(tmp_path: Path) -> None:
+    config = {
+        "abstracts-dump-url": "https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz",
+        "cache-directory-path": str(tmp_path / "cache"),
+        "enrichments": ["ImageURL", "Category"],
+    }
+
+    completed_process = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            DISCOVERY_IMPORTS_SCRIPT,
+            json.dumps(config),
+            json.dumps(["bs4", "lxml", "pyarrow", "requests_cache"]),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert json.loads(completed_process.stdout.splitlines()[-1]) == []
+    assert not (tmp_path / "cache" / "http-cache.sqlite").exists()
+
+
+@pytest.mark.parametrize(
+    "first_import",
+    [
+        "import tap_wikipedia.utils.wikipedia_page_extractor",
+        "from tap_wikipedia.utils import WikipediaPageExtractor",
+    ],
+)
+def test_utilities_named_after_their_module_are_not_shadowed(
+    first_import: str,
+) -> None:
+    # Run in a fresh process, since this one may already have imported the utilities.
+    subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            f"""{first_import}
+from tap_wikipedia.utils import batched, concurrent_map, wikipedia_page_extractor
+assert all(callable(utility) for utility in (batched, concurrent_map, wikipedia_page_extractor))
+""",
+        ],
+        check=True,
+    )
@@ -0,0 +1,75 @@
+"""Tests for the profilers and `tracemalloc` snapshots that a sync can be run under."""
+
+import pstats
+import tracemalloc
+from pathlib import Path
+from threading import Thread
+from time import perf_counter
+
+from tap_wikipedia.models.types import Profiler
+from tap_wikipedia.utils import SyncProfiler
+from tap_wikipedia.utils.sync_profiler import (
+    COLLAPSED_STACKS_FILE_NAME,
+    PSTATS_FILE_NAME,
+)
+
+BUSY_S = 0.2
+# Fewest `tracemalloc` snapshots expected from a busy stage that runs for four snapshot intervals.
+MIN_SNAPSHOT_COUNT = 2
+
+
+def busy_parser_stage() -> list[str]:
+    allocations = []
+    started_at = perf_counter()
+    while perf_counter() - started_at < BUSY_S:
+        allocations.append("x" * 100)
+    return allocations
+
+
+def _run_in_thread() -> None:
+    thread = Thread(target=busy_parser_stage)
+    thread.start()
+    thread.join()
+
+
+def test_deterministic_profiler_profiles_every_thread(tmp_path: Path) -> None:
+    with SyncProfiler(profile_directory_path=tmp_path, profiler=Profiler.DETERMINISTIC):
+        _run_in_thread()
+
+    function_names = {
+        function_name
+        for _, _, function_name in pstats.Stats(str(tmp_path / PSTATS_FILE_NAME)).stats  # type: ignore[attr-defined]
+    }
+    assert {"_run_in_thread", "busy_parser_stage"} <= function_names
+
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path: Path) -> None:
+    with SyncProfiler(
+        profile_directory_path=tmp_path,
+        profiler=Profiler.SAMPLING,
+        sampling_interval_s=0.001,
+    ):
+        _run_in_thread()
+
+    lines = (tmp_path / COLLAPSED_STACKS_FILE_NAME).read_text().splitlines()
+    stack, sample_count = lines[0].rsplit(" ", 1)
+    assert stack.endswith("tests.test_sync_profiler:busy_parser_stage")
+    assert int(sample_count) > 1
+
+
+def test_tracemalloc_snapshots_are_dumped(tmp_path: Path) -> None:
+    with SyncProfiler(
+        profile_directory_path=tmp_path, tracemalloc_snapshot_interval_s=BUSY_S / 4
+    ):
+        allocations = busy_parser_stage()
+
+    snapshot_file_paths = sorted(tmp_path.glob("tracemalloc-*.snapshot"))
+    assert len(snapshot_file_paths) >= MIN_SNAPSHOT_COUNT
+    assert any(
+        statistic.traceback[0].filename == __file__
+        for statistic in tracemalloc.Snapshot.load(
+            str(snapshot_file_paths[-1])
+        ).statistics("lineno")
+    )
+    assert not tracemalloc.is_tracing()
+    assert allocations
@@ -0,0 +1,41 @@
+"""Tests for persisting sets of Wikipedia titles."""
+
+import json
+from pathlib import Path
+
+from tap_wikipedia.utils import TitleSetSnapshot
+
+SOURCE_URL = "https://en.wikipedia.org/wiki/Wikipedia:Featured_articles"
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    snapshot_file_path = tmp_path / "subsets" / "featured.json"
+    snapshot = TitleSetSnapshot(snapshot_file_path, max_age_s=60)
+
+    assert snapshot.read(source_url=SOURCE_URL) is None
+
+    snapshot.write({"Ant", "Bee"}, source_url=SOURCE_URL)
+
+    assert snapshot.read(source_url=SOURCE_URL) == frozenset({"Ant", "Bee"})
+    assert snapshot.read(source_url=SOURCE_URL + "/other") is None
+
+
+def test_stale_and_unversioned_snapshots_are_ignored(tmp_path: Path) -> None:
+    snapshot_file_path = tmp_path / "featured.json"
+    TitleSetSnapshot(snapshot_file_path).write({"Ant"}, source_url=SOURCE_URL)
+
+    snapshot = json.loads(snapshot_file_path.read_text())
+    snapshot["created_at"] -= 120
+    snapshot_file_path.write_text(json.dumps(snapshot))
+
+    assert (
+        TitleSetSnapshot(snapshot_file_path, max_age_s=60).read(source_url=SOURCE_URL)
+        is None
+    )
+    assert TitleSetSnapshot(snapshot_file_path).read(source_url=SOURCE_URL) == {"Ant"}
+
+    snapshot_file_path.write_text(json.dumps({**snapshot, "version": 0}))
+    assert TitleSetSnapshot(snapshot_file_path).read(source_url=SOURCE_URL) is None
+
+    snapshot_file_path.write_text("{")
+    assert TitleSetSnapshot(snapshot_file_path).read(source_url=SOURCE_URL) is None
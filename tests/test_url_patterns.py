@@ -0,0 +1,22 @@
+"""Tests for the expansion of the brace groups of dump URL patterns."""
+
+from tap_wikipedia.utils import expand_url_pattern
+
+
+def test_numeric_ranges_and_alternatives_are_expanded_in_order() -> None:
+    assert expand_url_pattern("https://dumps/{en,de}wiki-abstract{1..2}.xml.gz") == (
+        "https://dumps/enwiki-abstract1.xml.gz",
+        "https://dumps/enwiki-abstract2.xml.gz",
+        "https://dumps/dewiki-abstract1.xml.gz",
+        "https://dumps/dewiki-abstract2.xml.gz",
+    )
+
+
+def test_zero_padded_ranges_keep_their_width() -> None:
+    assert expand_url_pattern("part{08..10}") == ("part08", "part09", "part10")
+
+
+def test_urls_without_brace_groups_expand_to_themselves() -> None:
+    assert expand_url_pattern("https://dumps/abstract.xml.gz") == (
+        "https://dumps/abstract.xml.gz",
+    )
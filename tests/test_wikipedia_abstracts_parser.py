@@ -0,0 +1,82 @@
+"""Tests for the streaming Wikipedia abstracts parser."""
+
+from io import BytesIO
+
+from tap_wikipedia.utils import WikipediaAbstractsParser
+
+ABSTRACTS_XML = b"""<feed>
+<doc>
+<title>Wikipedia: Anarchism</title>
+<url>https://en.wikipedia.org/wiki/Anarchism</url>
+<abstract>Anarchism is a political philosophy.</abstract>
+<links>
+<sublink linktype="nav"><anchor>Etymology</anchor><link>https://en.wikipedia.org/wiki/Anarchism#Etymology</link></sublink>
+<sublink linktype="nav"><anchor>History</anchor><link>https://en.wikipedia.org/wiki/Anarchism#History</link></sublink>
+</links>
+</doc>
+<doc>
+<title>Wikipedia: Autism</title>
+<url>https://en.wikipedia.org/wiki/Autism</url>
+<abstract>Autism is a neurodevelopmental condition.</abstract>
+<links>
+<sublink linktype="nav"><anchor>Causes</anchor><link>https://en.wikipedia.org/wiki/Autism#Causes</link></sublink>
+</links>
+</doc>
+</feed>
+"""
+
+
+def test_parse_yields_records() -> None:
+    records = tuple(
+        WikipediaAbstractsParser().parse(BytesIO(ABSTRACTS_XML), chunk_size=7)
+    )
+
+    assert [record.title for record in records] == [
+        "Wikipedia: Anarchism",
+        "Wikipedia: Autism",
+    ]
+    assert records[1].url == "https://en.wikipedia.org/wiki/Autism"
+    assert records[0].abstract == "Anarchism is a political philosophy."
+    assert records[0].sublinks is not None
+    assert [(sublink.anchor, sublink.link) for sublink in records[0].sublinks] == [
+        ("Etymology", "https://en.wikipedia.org/wiki/Anarchism#Etymology"),
+        ("History", "https://en.wikipedia.org/wiki/Anarchism#History"),
+    ]
+
+
+def test_parse_yields_records_before_end_of_file() -> None:
+    first_doc_end = ABSTRACTS_XML.index(b"</doc>") + len(b"</doc>")
+    abstracts_file = BytesIO(ABSTRACTS_XML)
+
+    records = WikipediaAbstractsParser().parse(abstracts_file, chunk_size=first_doc_end)
+    first_record = next(records)
+
+    assert first_record.title == "Wikipedia: Anarchism"
+    assert abstracts_file.tell() == first_doc_end
+
+
+def test_parse_skips_articles_outside_title_allowlist() -> None:
+    records = tuple(
+        WikipediaAbstractsParser(title_allowlist=frozenset({"Autism"})).parse(
+            BytesIO(ABSTRACTS_XML), chunk_size=7
+        )
+    )
+
+    assert [record.title for record in records] == ["Wikipedia: Autism"]
+    assert records[0].sublinks is not None
+    assert [sublink.anchor for sublink in records[0].sublinks] == ["Causes"]
+
+
+def test_parse_can_skip_sublinks() -> None:
+    records = tuple(
+        WikipediaAbstractsParser(parse_sublinks=False).parse(
+            BytesIO(ABSTRACTS_XML), chunk_size=7
+        )
+    )
+
+    assert [record.title for record in records] == [
+        "Wikipedia: Anarchism",
+        "Wikipedia: Autism",
+    ]
+    assert records[0].abstract == "Anarchism is a political philosophy."
+    assert all(record.sublinks is None for record in records)
@@ -0,0 +1,66 @@
+"""Tests for extracting enrichments from the HTML of Wikipedia article pages."""
+
+import pytest
+
+from tap_wikipedia.models.types import HtmlParserBackend
+from tap_wikipedia.utils import wikipedia_page_extractor
+from tap_wikipedia.utils.wikipedia_page_extractor import CategoryLink, ImageLink
+
+ARTICLE_HTML = """<!DOCTYPE html>
+<html><head><title>Ant</title><meta charset="UTF-8"></head>
+<body>
+<p>Not a <a class="mw-redirect" href="/wiki/Insect">file link</a>, nor is <span data-x="mw-file-description">this</span>.</p>
+<figure typeof="mw:File/Thumb"><a href="/wiki/File:Ant.jpg" class="mw-file-description"><img src="//upload.wikimedia.org/ant.jpg" width="220"><br></a>
+<figcaption>An ant</figcaption></figure>
+<a href="/wiki/File:Second.jpg" class="mw-file-description"><img src="//upload.wikimedia.org/second.jpg"></a>
+<div id="catlinks" class="catlinks">
+<div id="mw-normal-catlinks" class="mw-normal-catlinks"><a href="/wiki/Help:Category" title="Help:Category">Categories</a>: <ul>
+<li><a href="/wiki/Category:Ants" title="Category:Ants"> Ants </a></li>
+<li><a href="/wiki/Category:Insects_%26_kin" title="Category:Insects &amp; kin">Insects &amp; <b>kin</b></a></li>
+</ul></div>
+</div>
+</body></html>
+"""
+
+ARTICLE_WITHOUT_ENRICHMENTS_HTML = """<html><body>
+<p>Mentions mw-file-description and Help:Category only in text.</p>
+<div><a title="Help:Category" href="/wiki/Help:Category">Categories</a></div>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize(
+    "html",
+    [ARTICLE_HTML, ARTICLE_WITHOUT_ENRICHMENTS_HTML],
+    ids=["article", "article-without-enrichments"],
+)
+def test_backends_extract_the_same_elements(html: str) -> None:
+    beautiful_soup_extractor = wikipedia_page_extractor(
+        html, backend=HtmlParserBackend.BEAUTIFUL_SOUP
+    )
+    streaming_extractor = wikipedia_page_extractor(
+        html, backend=HtmlParserBackend.STREAMING
+    )
+
+    assert streaming_extractor.image_link == beautiful_soup_extractor.image_link
+    assert streaming_extractor.category_links == beautiful_soup_extractor.category_links
+
+
+def test_streaming_extractor() -> None:
+    extractor = wikipedia_page_extractor(
+        ARTICLE_HTML, backend=HtmlParserBackend.STREAMING
+    )
+
+    assert extractor.image_link == ImageLink(
+        href="/wiki/File:Ant.jpg", src="//upload.wikimedia.org/ant.jpg"
+    )
+    assert extractor.category_links == (
+        CategoryLink(href="/wiki/Category:Ants", text="Ants"),
+        CategoryLink(href="/wiki/Category:Insects_%26_kin", text="Insects & kin"),
+    )
+
+    extractor = wikipedia_page_extractor(
+        ARTICLE_WITHOUT_ENRICHMENTS_HTML, backend=HtmlParserBackend.STREAMING
+    )
+    assert extractor.image_link is None
+    assert extractor.category_links == ()
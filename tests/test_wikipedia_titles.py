@@ -0,0 +1,36 @@
+"""Tests for normalizing Wikipedia titles."""
+
+from pathlib import Path
+
+from tap_wikipedia.utils import (
+    normalize_wikipedia_title,
+    read_wikipedia_titles,
+    wikipedia_title_from_url,
+)
+
+
+def test_normalize_wikipedia_title() -> None:
+    assert normalize_wikipedia_title("ant_colony") == "Ant colony"
+    assert normalize_wikipedia_title("  Ant   colony ") == "Ant colony"
+
+
+def test_wikipedia_title_from_url() -> None:
+    assert (
+        wikipedia_title_from_url("https://en.wikipedia.org/wiki/Ant_colony")
+        == "Ant colony"
+    )
+    assert wikipedia_title_from_url("/wiki/Caf%C3%A9_society") == "Café society"
+    assert wikipedia_title_from_url("/wiki/Ant") == wikipedia_title_from_url(
+        "https://en.wikipedia.org/wiki/ant"
+    )
+    assert wikipedia_title_from_url("https://en.wikipedia.org/w/index.php") is None
+    assert wikipedia_title_from_url("/wiki/") is None
+
+
+def test_read_wikipedia_titles(tmp_path: Path) -> None:
+    titles_file_path = tmp_path / "titles.txt"
+    titles_file_path.write_text(
+        "# Articles to extract\nant_colony\n\nhttps://en.wikipedia.org/wiki/Bee\n"
+    )
+
+    assert read_wikipedia_titles(titles_file_path) == {"Ant colony", "Bee"}